@@ -15,6 +15,7 @@ class SubClass:
 from .src.callback import callback, callbacks
 from .src.keys import Keys
 from .src.curse import Curse
+from .src.headless import HeadlessCurse
 from .src.module import Module
 from .src.backend import Backend
 
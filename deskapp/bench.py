@@ -0,0 +1,595 @@
+"""
+Benchmark suite for DeskApp.
+
+Runs rendering and data scenarios against the headless front end and
+prints machine-readable JSON:
+
+    python -m deskapp.bench                      # every scenario
+    python -m deskapp.bench -s fire -s events    # a subset
+    python -m deskapp.bench --scale 0.01 -o out.json
+    python -m deskapp.bench --list
+    python -m deskapp.bench --trace session.trace.gz   # replay a trace
+
+Frame scenarios report frames/sec and ms per frame (p50/p95/p99 from
+the backend profiler); data scenarios report their own rates. Every
+scenario reports the process peak RSS after it ran; use --isolate to
+run each scenario in a fresh interpreter so peaks do not carry over.
+--trace replays an input trace recorded with App(record_trace=...)
+flat out and reports it like a frame scenario.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from deskapp import App, Module, Keys, ScrollList, ResultGrid, callback
+from deskapp.mods import Fire
+from deskapp.mods.apt import APT, VIEW_LIST
+from deskapp.src.events import EventBus, LineBatcher
+from deskapp.src.store import DataStore
+from deskapp.src.trace import replay_trace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENARIOS: Dict[str, Callable[[argparse.Namespace], Dict[str, Any]]] = {}
+
+
+def scenario(name: str):
+    """Register a benchmark function under name."""
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+# ------------------------------------------------------------------ #
+# Measurement helpers                                                  #
+# ------------------------------------------------------------------ #
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def scaled(args: argparse.Namespace, count: int) -> int:
+    return max(1, int(count * args.scale))
+
+
+def headless_app(args: argparse.Namespace, modules: List,
+                 **kwargs) -> App:
+    """Build an App on the headless front end without starting it."""
+    return App(modules=modules, demo_mode=False, headless=True,
+               headless_size=(args.height, args.width),
+               autostart=False, **kwargs)
+
+
+def run_frames(app: App, frames: int, keys: Optional[List] = None,
+               setup: Optional[Callable[[], None]] = None
+               ) -> Dict[str, Any]:
+    """Run an app for a fixed number of frames and time it.
+
+    Args:
+        app: App built by headless_app()
+        frames: Frames to render after setup
+        keys: Key codes cycled one per frame; idle frames if None
+        setup: Called on the first frame, after modules exist
+
+    Returns:
+        Frame rate and per-frame percentiles in milliseconds
+    """
+    front = app.front
+    app.back.profiler.window = frames
+    if setup is not None:
+        front.feed_call(setup)
+    # The setup frame and the closing frame are not measured
+    front.feed_call(app.back.profiler.reset)
+    for index in range(frames):
+        if keys:
+            front.feed_keys(keys[index % len(keys)])
+        # Ends the frame; queued keys would otherwise share one
+        front.feed_idle()
+    front.feed_call(app.close)
+    return time_run(app)
+
+
+def time_run(app: App) -> Dict[str, Any]:
+    """Start a headless app whose input is already queued; time it."""
+    start = time.perf_counter()
+    try:
+        app.start()
+    except Exception:
+        # Stop module threads (Fire) so a failed run cannot hang
+        for active in app.logic.available_panels.values():
+            active[0].end_safely()
+        app.close()
+        raise
+    elapsed = time.perf_counter() - start
+
+    stats = app.back.frame_stats('frame') or {}
+    samples = app.back.profiler.samples.get('frame', ())
+    measured = len(samples)
+    total_ms = sum(samples) * 1000
+    slowest = [
+        {'phase': phase, 'p95_ms': round(phase_stats['p95'], 3)}
+        for phase, phase_stats in app.back.frame_stats()[:5]
+        if phase not in ('frame', 'sleep')
+    ]
+    return {
+        'frames': measured,
+        'wall_seconds': round(elapsed, 4),
+        'fps': round(measured / (total_ms / 1000), 1) if total_ms else None,
+        'ms_per_frame': round(total_ms / max(1, measured), 3),
+        'ms_p50': round(stats.get('p50', 0.0), 3),
+        'ms_p95': round(stats.get('p95', 0.0), 3),
+        'ms_p99': round(stats.get('p99', 0.0), 3),
+        'slowest_phases': slowest,
+    }
+
+
+# ------------------------------------------------------------------ #
+# Frame scenarios                                                      #
+# ------------------------------------------------------------------ #
+
+@scenario("fire")
+def bench_fire(args: argparse.Namespace) -> Dict[str, Any]:
+    """Fire module animating across the whole main panel."""
+    app = headless_app(args, [Fire], show_menu=False,
+                       show_messages=False)
+
+    def start_fire():
+        app.logic.decider(Keys.ENTER)
+
+    result = run_frames(app, args.frames, setup=start_fire)
+    result['size'] = [args.height, args.width]
+    return result
+
+
+class BenchAPT(APT):
+    """APT fed a synthetic package list instead of dpkg output."""
+
+    def OnInstalledLoaded(self, Event):
+        if Event.get("source") == "bench":
+            super().OnInstalledLoaded(Event)
+
+
+@scenario("apt")
+def bench_apt(args: argparse.Namespace) -> Dict[str, Any]:
+    """APT list view over 100k packages, scrolling every frame."""
+    count = scaled(args, 100_000)
+    packages = [f"package-{index:06d}" for index in range(count)]
+    app = headless_app(args, [BenchAPT])
+
+    def load():
+        mod = app.logic.current_mod()
+        mod.OnInstalledLoaded({
+            'type': 'apt.packages.installed', 'source': 'bench',
+            'data': {'packages': packages},
+        })
+        mod.CurrentView = VIEW_LIST
+
+    result = run_frames(app, args.frames,
+                        keys=[Keys.DOWN] * 9 + [Keys.END], setup=load)
+    result['packages'] = count
+    return result
+
+
+Grid_ID = random.random()
+
+
+class GridBench(Module):
+    name = "GridBench"
+
+    def __init__(self, app):
+        super().__init__(app, Grid_ID)
+        self.Grid = ResultGrid()
+
+    def page(self, panel):
+        self.Grid.Render(self, panel, Row=1, Col=1,
+                         Height=self.h - 2, Width=self.w - 2)
+
+    @callback(Grid_ID, Keys.DOWN)
+    def OnDown(self, *args, **kwargs):
+        self.Grid.MoveDown()
+
+    @callback(Grid_ID, Keys.RIGHT)
+    def OnRight(self, *args, **kwargs):
+        self.Grid.ScrollRight()
+
+
+@scenario("result_grid")
+def bench_result_grid(args: argparse.Namespace) -> Dict[str, Any]:
+    """ResultGrid over 1M rows: SetData cost plus scrolling frames."""
+    count = scaled(args, 1_000_000)
+    cols = ["id", "name", "value", "status", "owner", "updated"]
+    rows = [
+        (index, f"row-{index}", index * 0.5, "ok" if index % 7 else "warn",
+         f"user{index % 97}", "2025-01-01")
+        for index in range(count)
+    ]
+    app = headless_app(args, [GridBench])
+    timings = {}
+
+    def load():
+        start = time.perf_counter()
+        app.logic.current_mod().Grid.SetData(cols, rows)
+        timings['set_data_ms'] = (time.perf_counter() - start) * 1000
+
+    result = run_frames(app, args.frames,
+                        keys=[Keys.DOWN] * 19 + [Keys.RIGHT], setup=load)
+    result['rows'] = count
+    result['set_data_ms'] = round(timings.get('set_data_ms', 0.0), 1)
+    return result
+
+
+List_ID = random.random()
+
+
+class ListBench(Module):
+    name = "ListBench"
+
+    def __init__(self, app):
+        super().__init__(app, List_ID)
+        self.Items = []
+        self.List = ScrollList()
+        self.Queries = ["1", "12", "123", "9", "99", "", "42", "7"]
+        self.QueryIndex = 0
+        self.FilterSeconds = 0.0
+        self.Filters = 0
+
+    def page(self, panel):
+        self.List.Render(self, panel, Row=1, Col=1,
+                         Height=self.h - 2, Width=self.w - 2)
+
+    @callback(List_ID, Keys.F)
+    def OnF(self, *args, **kwargs):
+        """Apply the next filter query."""
+        Query = self.Queries[self.QueryIndex % len(self.Queries)]
+        self.QueryIndex += 1
+        start = time.perf_counter()
+        self.List.SetItems(
+            [Item for Item in self.Items if Query in Item]
+        )
+        self.FilterSeconds += time.perf_counter() - start
+        self.Filters += 1
+
+    @callback(List_ID, Keys.DOWN)
+    def OnDown(self, *args, **kwargs):
+        self.List.MoveDown()
+
+
+@scenario("scroll_list")
+def bench_scroll_list(args: argparse.Namespace) -> Dict[str, Any]:
+    """ScrollList over 100k items, re-filtering every other frame."""
+    count = scaled(args, 100_000)
+    items = [f"item-{index:06d}-{index * 7919 % 10007}"
+             for index in range(count)]
+    app = headless_app(args, [ListBench])
+
+    def load():
+        mod = app.logic.current_mod()
+        mod.Items = items
+        mod.List.SetItems(items)
+
+    result = run_frames(app, args.frames, keys=[Keys.F, Keys.DOWN],
+                        setup=load)
+    mod = app.logic.current_mod()
+    result['items'] = count
+    result['filters'] = mod.Filters
+    result['ms_per_filter'] = round(
+        mod.FilterSeconds / max(1, mod.Filters) * 1000, 3
+    )
+    return result
+
+
+# ------------------------------------------------------------------ #
+# Data scenarios                                                       #
+# ------------------------------------------------------------------ #
+
+@scenario("events")
+def bench_events(args: argparse.Namespace) -> Dict[str, Any]:
+    """EventBus storm: worker threads emit while the main thread drains."""
+    producers = 4
+    per_producer = scaled(args, 50_000)
+    bus = EventBus()
+    delivered = [0]
+
+    def make_handler():
+        def handler(event):
+            delivered[0] += 1
+        return handler
+
+    for _ in range(3):
+        bus.on('bench.tick', make_handler())
+    bus.on('bench.other', make_handler())
+
+    def produce():
+        for index in range(per_producer):
+            while not bus.emit('bench.tick', {'n': index},
+                               source='bench'):
+                time.sleep(0)
+
+    threads = [threading.Thread(target=produce, daemon=True)
+               for _ in range(producers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    processed = 0
+    while (any(thread.is_alive() for thread in threads)
+           or bus.queue_size()):
+        processed += bus.process_events(max_events=1000,
+                                        max_time_ms=50.0)
+    elapsed = time.perf_counter() - start
+    metrics = bus.get_metrics()
+    return {
+        'producers': producers,
+        'events': producers * per_producer,
+        'processed': processed,
+        'handler_calls': delivered[0],
+        'dropped_attempts': metrics['events_dropped'],
+        'seconds': round(elapsed, 4),
+        'events_per_sec': round(processed / elapsed, 1),
+    }
+
+
+@scenario("lines")
+def bench_lines(args: argparse.Namespace) -> Dict[str, Any]:
+    """Stream output lines through the bus, one event each vs batched."""
+    count = scaled(args, 200_000)
+    results = {'lines': count}
+
+    def stream(mode: str) -> float:
+        bus = EventBus()
+        received = [0]
+
+        def on_line(event):
+            received[0] += 1
+
+        def on_lines(event):
+            received[0] += len(event['data']['items'])
+
+        bus.on('bench.out.line', on_line)
+        bus.on('bench.out.lines', on_lines)
+
+        def produce():
+            if mode == 'single':
+                for index in range(count):
+                    while not bus.emit('bench.out.line', {'line': index},
+                                       source='bench'):
+                        time.sleep(0)
+                return
+
+            def send(items):
+                while not bus.emit_batch('bench.out.lines', items,
+                                         source='bench'):
+                    time.sleep(0)
+            with LineBatcher(send) as batcher:
+                for index in range(count):
+                    batcher.add(index)
+
+        thread = threading.Thread(target=produce, daemon=True)
+        start = time.perf_counter()
+        thread.start()
+        while thread.is_alive() or bus.queue_size():
+            bus.process_events(max_events=1000, max_time_ms=50.0)
+        elapsed = time.perf_counter() - start
+        assert received[0] == count
+        results[f'{mode}_events'] = bus.events_processed
+        results[f'{mode}_seconds'] = round(elapsed, 4)
+        results[f'{mode}_lines_per_sec'] = round(count / elapsed, 1)
+        return elapsed
+
+    single = stream('single')
+    batched = stream('batched')
+    results['speedup'] = round(single / batched, 2)
+    return results
+
+
+@scenario("lanes")
+def bench_lanes(args: argparse.Namespace) -> Dict[str, Any]:
+    """Input latency while a worker floods the bulk lane."""
+    frames = max(10, scaled(args, 300))
+    frame_ms = 1000 / 60
+    bus = EventBus()
+    input_latency = []
+    bulk = [0]
+
+    def on_bulk(event):
+        bulk[0] += 1
+        # A handler with some real work, e.g. parsing an output line
+        sum(range(200))
+
+    bus.on('bench.out.line', on_bulk)
+    bus.on('input.key', lambda event: input_latency.append(
+        (time.perf_counter() - event['data']['at']) * 1000))
+    done = threading.Event()
+
+    def flood():
+        while not done.is_set():
+            if not bus.emit('bench.out.line', {}, source='worker.bench'):
+                time.sleep(0.0005)
+
+    thread = threading.Thread(target=flood, daemon=True)
+    thread.start()
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        bus.emit('input.key', {'at': frame_start}, source='bench')
+        bus.process_adaptive(frame_ms)
+        left = frame_ms / 1000 - (time.perf_counter() - frame_start)
+        if left > 0:
+            time.sleep(left)
+    elapsed = time.perf_counter() - start
+    done.set()
+    thread.join(1.0)
+    input_latency.sort()
+    lanes = bus.get_metrics()['lanes']
+    return {
+        'frames': frames,
+        'input_events': len(input_latency),
+        'input_latency_p50_ms': round(
+            input_latency[len(input_latency) // 2], 3),
+        'input_latency_max_ms': round(input_latency[-1], 3),
+        'bulk_processed': bulk[0],
+        'bulk_dropped_attempts': lanes['bulk']['dropped'],
+        'bulk_per_sec': round(bulk[0] / elapsed, 1),
+    }
+
+
+@scenario("store")
+def bench_store(args: argparse.Namespace) -> Dict[str, Any]:
+    """DataStore bulk insert and read back."""
+    count = scaled(args, 200_000)
+    rows = [(index, f"name-{index}", index * 0.25)
+            for index in range(count)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DataStore(os.path.join(tmp, "bench.db"))
+        store.ensure_table(
+            "bench_rows", "id INTEGER PRIMARY KEY, name TEXT, value REAL"
+        )
+        start = time.perf_counter()
+        store.executemany(
+            "INSERT INTO bench_rows (id, name, value) VALUES (?, ?, ?)",
+            rows,
+        )
+        insert_s = time.perf_counter() - start
+        start = time.perf_counter()
+        fetched = store.fetch("SELECT id, name, value FROM bench_rows")
+        fetch_s = time.perf_counter() - start
+        store.close()
+    return {
+        'rows': count,
+        'insert_seconds': round(insert_s, 4),
+        'inserts_per_sec': round(count / insert_s, 1),
+        'fetch_seconds': round(fetch_s, 4),
+        'rows_fetched': len(fetched),
+    }
+
+
+# ------------------------------------------------------------------ #
+# Runner                                                               #
+# ------------------------------------------------------------------ #
+
+def bench_trace(args: argparse.Namespace) -> Dict[str, Any]:
+    """Replay a recorded input trace as fast as possible."""
+    app = replay_trace(args.trace)
+    app.back.profiler.window = max(1, app.front.pending_input())
+    result = time_run(app)
+    result['trace'] = args.trace
+    return result
+
+
+def run_isolated(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario in a child interpreter and return its result."""
+    cmd = [sys.executable, "-m", "deskapp.bench", "-s", name,
+           "--frames", str(args.frames), "--scale", str(args.scale),
+           "--size", f"{args.height}x{args.width}"]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1:]}
+    return json.loads(proc.stdout)['scenarios'][name]
+
+
+def deskapp_version() -> Optional[str]:
+    try:
+        from importlib.metadata import version
+        return version("Deskapp")
+    except Exception:
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the selected scenarios and build the JSON report."""
+    names = args.scenario or ([] if args.trace else list(SCENARIOS))
+    results = {}
+    if args.trace:
+        names = names + ['trace']
+    for name in names:
+        if args.isolate and name in SCENARIOS:
+            results[name] = run_isolated(name, args)
+            continue
+        start = time.perf_counter()
+        try:
+            result = SCENARIOS.get(name, bench_trace)(args)
+        except Exception as E:
+            result = {'error': f"{type(E).__name__}: {E}"}
+        result['scenario_seconds'] = round(time.perf_counter() - start, 3)
+        result['peak_rss_mb'] = peak_rss_mb()
+        results[name] = result
+    return {
+        'deskapp': deskapp_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'settings': {
+            'frames': args.frames,
+            'scale': args.scale,
+            'size': [args.height, args.width],
+        },
+        'scenarios': results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m deskapp.bench",
+        description="Headless DeskApp benchmarks with JSON output.",
+    )
+    parser.add_argument("-s", "--scenario", action="append",
+                        choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default all)")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="frames per rendering scenario")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply dataset sizes (e.g. 0.01 for CI)")
+    parser.add_argument("--size", default="50x200",
+                        help="headless screen size as ROWSxCOLS")
+    parser.add_argument("--isolate", action="store_true",
+                        help="run each scenario in its own process")
+    parser.add_argument("-o", "--output",
+                        help="write JSON here instead of stdout")
+    parser.add_argument("--trace",
+                        help="replay this input trace (see deskapp.src.trace)")
+    parser.add_argument("--list", action="store_true",
+                        help="list scenarios and exit")
+    args = parser.parse_args(argv)
+    try:
+        args.height, args.width = (int(n) for n in args.size.split("x"))
+    except ValueError:
+        parser.error("--size must look like 50x200")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        for name, func in SCENARIOS.items():
+            print(f"{name:<12} {func.__doc__}")
+        return 0
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,3 +4,5 @@ from .buttons import Buttons
 from .fire import Fire
 from .apt import APT
 from .memory_viewer import MemoryViewer  # Added Session 2 Step 5
+from .profiler import Profiler
+from .event_viewer import EventViewer
@@ -4,6 +4,7 @@ from deskapp import Module, callback, Keys
 About_ID = random.random()
 class About(Module):
     name = "About"
+    animated = False
     def __init__(self, app):
         super().__init__(app, About_ID)
 
@@ -40,11 +40,14 @@ LOG_MAX = 500
 # ------------------------------------------------------------------ #
 
 class AptWorker(BaseWorker):
-    """Stream a shell command line-by-line into the event bus.
+    """Stream a shell command's output into the event bus.
+
+    Lines are batched: one event per 256 lines or per 50 ms of output,
+    whichever comes first, so a noisy command does not flood the queue.
 
     Emits:
         <prefix>.out.start  — command started
-        <prefix>.out.line   — one output line
+        <prefix>.out.lines  — output lines, in data["items"]
         <prefix>.out.done   — finished, includes rc
         <prefix>.out.error  — error during setup or read
     """
@@ -76,6 +79,9 @@ class AptWorker(BaseWorker):
                 {"id": self.TaskId, "error": str(E)},
             )
             return
+        Lines = self.line_batcher(
+            f"{self.Prefix}.out.lines", {"id": self.TaskId}
+        )
         try:
             for Line in self.Process.stdout:
                 if self.should_stop:
@@ -84,16 +90,16 @@ class AptWorker(BaseWorker):
                     except Exception:
                         pass
                     break
-                self.emit(
-                    f"{self.Prefix}.out.line",
-                    {"id": self.TaskId, "line": Line.rstrip("\n")},
-                )
+                Lines.add(Line.rstrip("\n"))
         except Exception as E:
+            Lines.close()
             self.emit(
                 f"{self.Prefix}.out.error",
                 {"id": self.TaskId, "error": str(E)},
             )
         finally:
+            # Output first, then the done event
+            Lines.close()
             Rc = None
             try:
                 Rc = self.Process.wait(timeout=2)
@@ -223,6 +229,7 @@ class UpgradableWorker(BaseWorker):
 
 class APT(Module):
     name = "APT"
+    animated = False
 
     def __init__(self, app):
         super().__init__(app, APT_ID)
@@ -279,14 +286,14 @@ class APT(Module):
 
         # Wire events
         self.on_event("apt.out.start",  self.OnCmdStart)
-        self.on_event("apt.out.line",   self.OnCmdLine)
+        self.on_event("apt.out.lines",  self.OnCmdLines)
         self.on_event("apt.out.done",   self.OnCmdDone)
         self.on_event("apt.out.error",  self.OnCmdError)
         self.on_event(
             "apt.detail.out.start", self.OnDetailStart
         )
         self.on_event(
-            "apt.detail.out.line",  self.OnDetailLine
+            "apt.detail.out.lines", self.OnDetailLines
         )
         self.on_event(
             "apt.detail.out.done",  self.OnDetailDone
@@ -364,14 +371,15 @@ class APT(Module):
     def OnCmdStart(self, Event):
         self.SetStatus(f"Running: {self.ActiveCommand}", "yellow")
 
-    def OnCmdLine(self, Event):
-        Line = Event["data"].get("line", "")
-        self.LogLines.append(Line)
+    def OnCmdLines(self, Event):
         ViewH  = max(1, self.h - 3)
         Bottom = max(0, len(self.LogLines) - ViewH)
-        # Auto-scroll only when the user is already at or near the bottom
-        if self.LogScroll >= Bottom - 1:
-            self.LogScroll = Bottom
+        # Auto-scroll only when the user was at or near the bottom
+        # before this batch arrived
+        Follow = self.LogScroll >= Bottom - 1
+        self.LogLines.extend(Event["data"].get("items", []))
+        if Follow:
+            self.LogScroll = max(0, len(self.LogLines) - ViewH)
 
     def OnCmdDone(self, Event):
         Rc = Event["data"].get("rc", -1)
@@ -393,9 +401,8 @@ class APT(Module):
         self.RawDetailLines = []
         self.DetailLines    = []
 
-    def OnDetailLine(self, Event):
-        Line = Event["data"].get("line", "")
-        self.RawDetailLines.append(Line)
+    def OnDetailLines(self, Event):
+        self.RawDetailLines.extend(Event["data"].get("items", []))
 
     def OnDetailDone(self, Event):
         Data = self.ParseAptShow(self.RawDetailLines)
@@ -900,40 +907,39 @@ class APT(Module):
     # Key callbacks                                                    #
     # -------------------------------------------------------------- #
 
-    @callback(APT_ID, Keys.UP)
+    @callback(APT_ID, Keys.UP, coalesce=True)
     def OnUp(self, *args, **kwargs):
         if self.ConfirmAction is not None:
             return
+        Steps = kwargs.get("repeat", 1)
         if self.CurrentView == VIEW_LOG:
-            if self.LogScroll > 0:
-                self.LogScroll -= 1
+            self.LogScroll = max(0, self.LogScroll - Steps)
             return
         if self.CurrentView == VIEW_DETAIL:
-            if self.DetailScroll > 0:
-                self.DetailScroll -= 1
+            self.DetailScroll = max(0, self.DetailScroll - Steps)
             return
-        if self.PkgIndex > 0:
-            self.PkgIndex -= 1
+        self.PkgIndex = max(0, self.PkgIndex - Steps)
 
-    @callback(APT_ID, Keys.DOWN)
+    @callback(APT_ID, Keys.DOWN, coalesce=True)
     def OnDown(self, *args, **kwargs):
         if self.ConfirmAction is not None:
             return
+        Steps = kwargs.get("repeat", 1)
         if self.CurrentView == VIEW_LOG:
             ViewH = max(1, self.h - 3)
             MaxScr = max(0, len(self.LogLines) - ViewH)
             if self.LogScroll < MaxScr:
-                self.LogScroll += 1
+                self.LogScroll = min(MaxScr, self.LogScroll + Steps)
             return
         if self.CurrentView == VIEW_DETAIL:
             ViewH = max(1, self.h - 3)
             MaxScr = max(0, len(self.DetailLines) - ViewH)
             if self.DetailScroll < MaxScr:
-                self.DetailScroll += 1
+                self.DetailScroll = min(MaxScr, self.DetailScroll + Steps)
             return
         Lst = self.CurrentList()
         if self.PkgIndex < len(Lst) - 1:
-            self.PkgIndex += 1
+            self.PkgIndex = min(len(Lst) - 1, self.PkgIndex + Steps)
 
     @callback(APT_ID, Keys.LEFT)
     def OnLeft(self, *args, **kwargs):
@@ -4,6 +4,7 @@ from deskapp import Module, callback, Keys
 Buttons_ID = random.random()
 class Buttons(Module):
     name = "Buttons"
+    animated = False
     def __init__(self, app):
         super().__init__(app, Buttons_ID)
         self.elements = ['this', 'that', 'other']
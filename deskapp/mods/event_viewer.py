@@ -0,0 +1,116 @@
+"""
+Event Viewer Module for DeskApp.
+Live EventBus trace: hottest event types and slowest handlers, from
+EventBus.enable_tracing(). High latency over cheap handlers means a
+flooded queue; a handler near the top of the second table is the lag.
+"""
+
+import random
+from deskapp import Module, callback, Keys
+
+EventViewer_ID = random.random()
+
+# Sort keys for the event type table (see EventTracer.hottest_types)
+SORT_KEYS = ['total_ms', 'count', 'latency_p95_ms', 'dropped']
+
+
+class EventViewer(Module):
+    """Show where event time goes, per event type and per handler."""
+
+    name = "Event Viewer"
+    # Four repaints a second is plenty for aggregate numbers
+    refresh_rate = 4
+
+    def __init__(self, app):
+        super().__init__(app, EventViewer_ID)
+        self.sort_index = 0
+        self.app.events.enable_tracing()
+
+    @property
+    def sort_by(self):
+        return SORT_KEYS[self.sort_index]
+
+    def page(self, panel):
+        """Render the event type and handler tables."""
+        h, w = panel.dims[0], panel.dims[1]
+        tracer = self.app.events.tracer
+
+        y = 1
+        if tracer is None:
+            self.write(panel, y, 2, "Event tracing is off.", color="cyan")
+            self.write(panel, y + 2, 2, "'T' start tracing")
+            return
+
+        metrics = self.app.events.get_metrics()
+        title = (f"EVENT TRACE  queue {metrics['queue_size']}  "
+                 f"dropped {metrics['events_dropped']}  "
+                 f"p95 latency {metrics['latency_p95_ms']:.2f}ms")
+        self.write(panel, y, 2, title[:w - 4], color="cyan")
+        y += 2
+
+        # Split what is left between the two tables
+        rows_left = max(0, h - y - 6)
+        type_rows = (rows_left + 1) // 2
+        handler_rows = rows_left - type_rows
+
+        name_w = max(8, min(32, w - 50))
+        header = (f"{'event type':<{name_w}} {'count':>7} {'drop':>5} "
+                  f"{'lat p95':>8} {'hdl p95':>8} {'total':>9}")
+        self.write(panel, y, 2, header[:w - 4], color="yellow")
+        y += 1
+        types = tracer.hottest_types(self.sort_by)
+        for event_type, stats in types[:type_rows]:
+            line = (f"{event_type[:name_w]:<{name_w}} {stats['count']:7d} "
+                    f"{stats['dropped']:5d} "
+                    f"{stats['latency_p95_ms']:8.2f} "
+                    f"{stats['handler_p95_ms']:8.2f} "
+                    f"{stats['total_ms']:9.1f}")
+            color = "red" if stats['dropped'] else None
+            self.write(panel, y, 2, line[:w - 4], color=color)
+            y += 1
+        if not types:
+            self.write(panel, y, 2, "No events yet.")
+            y += 1
+        y += 1
+
+        header = (f"{'handler':<{name_w}} {'calls':>7} {'p50':>8} "
+                  f"{'p95':>8} {'max':>9}")
+        self.write(panel, y, 2, header[:w - 4], color="yellow")
+        y += 1
+        for name, stats in tracer.slowest_handlers()[:handler_rows]:
+            line = (f"{name[-name_w:]:<{name_w}} {stats['count']:7d} "
+                    f"{stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} "
+                    f"{stats['max_ms']:9.2f}")
+            self.write(panel, y, 2, line[:w - 4])
+            y += 1
+
+        if y < h - 1:
+            self.write(panel, h - 2, 2,
+                       f"'S' sort ({self.sort_by})  'T' tracing on/off  "
+                       f"'R' reset"[:w - 4],
+                       color="cyan")
+
+    @callback(EventViewer_ID, Keys.S)
+    def cycle_sort(self, *args, **kwargs):
+        """Cycle the event type sort column on 'S' key."""
+        self.sort_index = (self.sort_index + 1) % len(SORT_KEYS)
+        self.invalidate()
+
+    @callback(EventViewer_ID, Keys.T)
+    def toggle_tracing(self, *args, **kwargs):
+        """Turn event tracing on or off on 'T' key."""
+        if self.app.events.tracer is None:
+            self.app.events.enable_tracing()
+            self.print("Event tracing on")
+        else:
+            self.app.events.disable_tracing()
+            self.print("Event tracing off")
+        self.invalidate()
+
+    @callback(EventViewer_ID, Keys.R)
+    def reset_trace(self, *args, **kwargs):
+        """Clear the trace on 'R' key."""
+        if self.app.events.tracer is not None:
+            self.app.events.tracer.reset()
+        self.print("Event trace reset")
+        self.invalidate()
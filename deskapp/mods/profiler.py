@@ -0,0 +1,79 @@
+"""
+Profiler Module for DeskApp.
+Live per-phase frame timings from Backend.frame_stats().
+"""
+
+import random
+from deskapp import Module, callback, Keys
+
+Profiler_ID = random.random()
+
+SORT_KEYS = ['p95', 'p99', 'p50', 'mean', 'max']
+
+
+class Profiler(Module):
+    """Show where frame time goes, slowest phase first."""
+
+    name = "Profiler"
+
+    def __init__(self, app):
+        super().__init__(app, Profiler_ID)
+        self.sort_index = 0
+
+    @property
+    def sort_by(self):
+        return SORT_KEYS[self.sort_index]
+
+    def page(self, panel):
+        """Render the per-phase timing table."""
+        h, w = panel.dims[0], panel.dims[1]
+        rows = self.app.back.frame_stats(sort_by=self.sort_by)
+
+        y = 1
+        title = f"FRAME PROFILE (ms, sorted by {self.sort_by})"
+        self.write(panel, y, 2, title[:w - 4], color="cyan")
+        y += 2
+        if not rows:
+            self.write(panel, y, 2, "No samples yet.")
+            return
+
+        name_w = max(8, min(24, w - 48))
+        header = (f"{'phase':<{name_w}} {'last':>7} {'p50':>7} "
+                  f"{'p95':>7} {'p99':>7} {'max':>7}")
+        self.write(panel, y, 2, header[:w - 4], color="yellow")
+        y += 1
+
+        frame = self.app.back.frame_stats('frame')
+        budget = frame['p95'] if frame else 0.0
+        for phase, stats in rows:
+            if y >= h - 2:
+                break
+            line = (f"{phase[:name_w]:<{name_w}} {stats['last']:7.2f} "
+                    f"{stats['p50']:7.2f} {stats['p95']:7.2f} "
+                    f"{stats['p99']:7.2f} {stats['max']:7.2f}")
+            if phase in ('frame', 'sleep'):
+                color = "cyan"
+            elif budget and stats['p95'] > budget * 0.5:
+                color = "red"
+            elif budget and stats['p95'] > budget * 0.2:
+                color = "yellow"
+            else:
+                color = None
+            self.write(panel, y, 2, line[:w - 4], color=color)
+            y += 1
+
+        if y < h - 1:
+            self.write(panel, h - 2, 2,
+                       "'S' cycle sort  'R' reset samples",
+                       color="cyan")
+
+    @callback(Profiler_ID, Keys.S)
+    def cycle_sort(self, *args, **kwargs):
+        """Cycle the sort column on 'S' key."""
+        self.sort_index = (self.sort_index + 1) % len(SORT_KEYS)
+
+    @callback(Profiler_ID, Keys.R)
+    def reset_samples(self, *args, **kwargs):
+        """Clear all samples on 'R' key."""
+        self.app.back.profiler.reset()
+        self.print("Profiler samples reset")
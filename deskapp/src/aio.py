@@ -0,0 +1,246 @@
+"""
+asyncio integration for DeskApp.
+
+AsyncRunner owns an asyncio event loop that the backend steps once per
+frame, right after event processing. Coroutines started with
+App.spawn() therefore run on the main thread between frames, like event
+handlers: they may change module state (then call invalidate()) but,
+as always, should not block. Many concurrent I/O operations can share
+the one loop instead of each needing a BaseWorker thread.
+
+Coroutines wait on the EventBus with:
+
+    event = await app.events.wait_for('apt.out.done',
+                                      lambda e: e['data']['id'] == job)
+
+    async with app.events.stream('fetch.*') as events:
+        async for event in events:
+            ...
+
+An idle app still sleeps while tasks are alive: the main loop wakes
+for the loop's next timer, and for its I/O through the loop's selector
+fd (watched by the front end), at frame granularity. Tasks waiting on
+the bus are resumed by dispatch itself.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Optional, Set
+
+
+class AsyncRunner:
+    """An asyncio loop stepped from the DeskApp main loop."""
+
+    def __init__(self, on_error: Optional[Callable[[asyncio.Task,
+                                                    BaseException],
+                                                   None]] = None):
+        """
+        Args:
+            on_error: Called with (task, exception) when a task fails
+        """
+        self.loop = asyncio.new_event_loop()
+        self.tasks: Set[asyncio.Task] = set()
+        self.on_error = on_error
+        # Set once the front end wakes on fileno(); until then I/O is
+        # only noticed by stepping every frame
+        self.io_watched = False
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Schedule a coroutine; it first runs on the next step()."""
+        task = self.loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self.tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None and self.on_error is not None:
+            self.on_error(task, error)
+
+    def fileno(self) -> Optional[int]:
+        """The loop's selector fd, readable while awaited I/O is ready;
+        None if the loop has none that can be polled."""
+        selector = getattr(self.loop, '_selector', None)
+        try:
+            return selector.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def next_wakeup(self) -> Optional[float]:
+        """Seconds until step() has work to do.
+
+        0 when callbacks are ready (or the loop can't be inspected),
+        the time to the earliest timer, or None when tasks only wait
+        on events or I/O.
+        """
+        if not self.tasks or self.loop.is_closed():
+            return None
+        loop = self.loop
+        if getattr(loop, '_ready', None):
+            return 0.0
+        scheduled = getattr(loop, '_scheduled', None)
+        if scheduled is None or not self.io_watched:
+            return 0.0
+        whens = [handle.when() for handle in scheduled
+                 if not handle.cancelled()]
+        if not whens:
+            return None
+        return max(0.0, min(whens) - loop.time())
+
+    def step(self, max_passes: int = 16) -> None:
+        """Run every callback that is ready now, then return.
+
+        I/O is polled without waiting; timers that are due fire. A
+        callback usually readies another (a timer resolves a future,
+        which resumes its task), so passes repeat while work is ready,
+        up to max_passes, and a coroutine moves on within the frame
+        instead of one hop per frame.
+        """
+        if not self.tasks or self.loop.is_closed():
+            return
+        for _ in range(max_passes):
+            self.loop.call_soon(self.loop.stop)
+            self.loop.run_forever()
+            # The base loop's ready queue; a loop without one gets a
+            # single pass per frame
+            if not getattr(self.loop, '_ready', None):
+                break
+
+    def close(self) -> None:
+        """Cancel remaining tasks, let them clean up, close the loop."""
+        if self.loop.is_closed():
+            return
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+
+def deliver(loop: asyncio.AbstractEventLoop, owner: int,
+            func: Callable, *args: Any) -> None:
+    """Call func in the loop's thread: directly if that is this thread
+    (the usual case: dispatch and the loop share the main thread),
+    else through call_soon_threadsafe."""
+    if threading.get_ident() == owner:
+        func(*args)
+    else:
+        loop.call_soon_threadsafe(func, *args)
+
+
+def keep(bus, event):
+    """The event itself, or a copy when the bus recycles events after
+    dispatch (pool_size); a coroutine reads it later."""
+    return event.copy() if bus.pool_size else event
+
+
+def resolve(future: asyncio.Future, value: Any) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+async def wait_for_event(bus, event_type: str,
+                         predicate: Optional[Callable[[Any], bool]] = None,
+                         timeout: Optional[float] = None):
+    """Implementation of EventBus.wait_for; see there."""
+    loop = asyncio.get_running_loop()
+    owner = threading.get_ident()
+    future = loop.create_future()
+
+    def handler(event):
+        if future.done() or (predicate is not None
+                             and not predicate(event)):
+            return
+        deliver(loop, owner, resolve, future, keep(bus, event))
+
+    bus.on(event_type, handler)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    finally:
+        bus.off(event_type, handler)
+
+
+class EventStream:
+    """Async iterator over the events matching a type or 'prefix.*'.
+
+    Subscribes on creation and stays subscribed until close(), so no
+    event is missed between two iterations. With maxsize set, a
+    consumer that falls behind loses the oldest buffered events
+    (counted in dropped) rather than holding up dispatch.
+    """
+
+    def __init__(self, bus, event_type: str,
+                 predicate: Optional[Callable[[Any], bool]] = None,
+                 maxsize: int = 0):
+        self.bus = bus
+        self.event_type = event_type
+        self.predicate = predicate
+        self.maxsize = maxsize
+        self.buffer: deque = deque()
+        self.dropped = 0
+        self.closed = False
+        self.waiter: Optional[asyncio.Future] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.owner = 0
+        bus.on(event_type, self.push)
+
+    def push(self, event) -> None:
+        """EventBus handler: buffer the event and wake the consumer."""
+        if self.closed or (self.predicate is not None
+                           and not self.predicate(event)):
+            return
+        if self.maxsize and len(self.buffer) >= self.maxsize:
+            self.buffer.popleft()
+            self.dropped += 1
+        self.buffer.append(keep(self.bus, event))
+        self.wake()
+
+    def wake(self) -> None:
+        waiter = self.waiter
+        if waiter is not None:
+            deliver(self.loop, self.owner, resolve, waiter, None)
+
+    def close(self) -> None:
+        """Unsubscribe; iteration ends once the buffer is empty."""
+        if self.closed:
+            return
+        self.closed = True
+        self.bus.off(self.event_type, self.push)
+        self.wake()
+
+    def __aiter__(self) -> 'EventStream':
+        return self
+
+    async def __anext__(self):
+        while True:
+            if self.buffer:
+                return self.buffer.popleft()
+            if self.closed:
+                raise StopAsyncIteration
+            self.loop = asyncio.get_running_loop()
+            self.owner = threading.get_ident()
+            waiter = self.waiter = self.loop.create_future()
+            # An event pushed from another thread just before the
+            # waiter existed would not have woken us
+            if not self.buffer and not self.closed:
+                try:
+                    await waiter
+                finally:
+                    self.waiter = None
+            else:
+                self.waiter = None
+
+    async def __aenter__(self) -> 'EventStream':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    async def aclose(self) -> None:
+        self.close()
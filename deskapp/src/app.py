@@ -13,9 +13,15 @@ Updated by: Claude Sonnet 4.5 10-10-25
 import pathlib
 from deskapp import Curse, Logic, Backend, Module, Keys, callback, callbacks
 from deskapp.mods import About, Buttons, Fire, APT
+from deskapp.src.aio import AsyncRunner
 from deskapp.src.events import EventBus
 from deskapp.src.memory import MemoryTracker  # Added Session 1 Step 3
 from deskapp.src.store import DataStore        # Added Proposal 08
+from deskapp.src.damage import WatchedData
+from deskapp.src.headless import HeadlessCurse
+from deskapp.src.callback import (
+    APP_ID, MODULE_ID, CallbackRegistry, registry
+)
 
 class App:
     def __init__(self,
@@ -54,13 +60,28 @@ class App:
                  autostart:            bool = True,
                  # PERFORMANCE CONTROLS - Added Claude Sonnet 4.5 10-09-25
                  fps_cap:               int = 40,
+                 frame_buffer:         bool = False,
+                 event_driven:         bool = True,
+                 profile:              bool = True,
+                 # HEADLESS: no TTY, in-memory screen, scripted input
+                 headless:             bool = False,
+                 headless_size:       tuple = (24, 80),
                  # COMMAND CONTROLS
                  use_mouse:            bool = True,
                  use_focus:            bool = False,
+                 escape_timeout:      float = 0.01,
+                 coalesce_motion:      bool = True,
+                 # INPUT TRACE: record to this file (see src/trace.py)
+                 record_trace:          str = None,
+                 # EVENT BRIDGE: serve the EventBus on this Unix socket
+                 # (see src/bridge.py)
+                 event_bridge:          str = None,
             ):
         # initialize the constructor.
         self.app = self
-        self.user_modules = modules
+        # Copy so the default list and the caller's list are not
+        # extended with the demo modules.
+        self.user_modules = list(modules)
         self.show_splash = splash_screen
         self.show_demo = demo_mode
         self.show_box = show_box
@@ -78,6 +99,11 @@ class App:
         self.should_autostart = autostart
         # Added by Claude Sonnet 4.5 10-09-25
         self.fps_cap = fps_cap
+        self.event_driven = event_driven
+        self.profile = profile
+        self.coalesce_motion = coalesce_motion
+        self.record_trace = record_trace
+        self.event_bridge = event_bridge
 
         # PANELS ON STARTUP
         self.show_header = show_header
@@ -102,10 +128,23 @@ class App:
         self.disable_floating = disable_floating
 
         # APP FUNCTIONALITY
-        self.data = {'messages': [], 'errors': []}
+        # WatchedData counts changes so panels repaint on data updates
+        self.data = WatchedData({'messages': [], 'errors': []})
+
+        # KEY BINDINGS: this app's own dispatch table. Module bindings
+        # are added as modules load (Backend.setup_mod).
+        self.callbacks = CallbackRegistry()
+        self.callbacks.adopt(registry, MODULE_ID, APP_ID)
 
         # EVENT SYSTEM - Added by Claude Sonnet 4.5 10-10-25
         self.events = EventBus()
+        # State-style events: only the latest pending one is dispatched
+        self.events.coalesce('system.fps_update')
+        self.events.coalesce('counter.tick')
+        # asyncio loop for spawn(), created on first use
+        self.tasks = None
+        # EventBridge for other processes, started by the backend
+        self.bridge = None
 
         # DATASTORE - Added Proposal 08
         self.store = DataStore(
@@ -124,7 +163,17 @@ class App:
             self.menu.extend([About, Buttons, Fire, APT])  # , Deskhunter
 
         # CORE MODULES
-        self.front = Curse(use_mouse=use_mouse, use_focus=use_focus)
+        if headless:
+            self.front = HeadlessCurse(
+                headless_size[0], headless_size[1],
+                use_mouse=use_mouse, use_focus=use_focus,
+                event_driven=event_driven, escape_timeout=escape_timeout
+            )
+        else:
+            self.front = Curse(use_mouse=use_mouse, use_focus=use_focus,
+                               frame_buffer=frame_buffer,
+                               event_driven=event_driven,
+                               escape_timeout=escape_timeout)
         if self.show_splash:
             self.front.splash_screen()
         self.logic = Logic(self)
@@ -176,19 +225,81 @@ class App:
     ## EVENT SYSTEM CONVENIENCE METHODS
     ## Added by: Claude Sonnet 4.5 10-10-25
 
+    def bind(self, keypress, func, ID=APP_ID):
+        """Bind a key for this app only.
+
+        Args:
+            keypress: Key code, e.g. Keys.F
+            func: Called as func(module, panel) like @callback methods
+            ID: classID the binding belongs to; APP_ID applies to every
+                module that does not bind the key itself
+        """
+        self.callbacks.register(ID, keypress, func, func.__doc__)
+
     def emit(self, event_type: str, data: dict = None,
-             source: str = "app") -> bool:
+             source: str = "app", coalesce_key=None, lane=None) -> bool:
         """Emit an event to the event bus.
 
         Args:
             event_type: Event identifier (e.g., 'data.update')
             data: Event payload dictionary
             source: Event source (default: 'app')
+            coalesce_key: Replace a pending event of this type with the
+                          same key instead of queueing another one
+            lane: Priority lane to use instead of the routed one
+                  ('system', 'interactive' or 'bulk')
 
         Returns:
             True if queued, False if dropped
         """
-        return self.events.emit(event_type, data, source)
+        return self.events.emit(event_type, data, source, coalesce_key,
+                                lane)
+
+    def emit_batch(self, event_type: str, items, source: str = "app",
+                   data: dict = None, lane=None) -> bool:
+        """Emit many items as one event; handlers get data['items'].
+
+        Args:
+            event_type: Event identifier
+            items: Payload items, delivered as a list in order
+            source: Event source (default: 'app')
+            data: Fields shared by the whole batch
+            lane: Priority lane to use instead of the routed one
+
+        Returns:
+            True if queued, False if dropped or empty
+        """
+        return self.events.emit_batch(event_type, items, source, data,
+                                      lane)
+
+    def spawn(self, coro):
+        """Run a coroutine on the app's asyncio loop.
+
+        The loop is stepped once per frame on the main thread, so the
+        coroutine may await app.events.wait_for() / stream() and
+        asyncio I/O, and update module state without locks.
+
+        Args:
+            coro: Coroutine object
+
+        Returns:
+            The asyncio.Task
+        """
+        if self.tasks is None:
+            self.tasks = AsyncRunner(on_error=self._task_failed)
+            # Wake the main loop when awaited I/O is ready, so it can
+            # sleep between frames while tasks wait
+            fd = self.tasks.fileno()
+            if fd is not None:
+                self.tasks.io_watched = self.front.watch_fd(fd)
+        return self.tasks.spawn(coro)
+
+    def _task_failed(self, task, error) -> None:
+        self.print(f"Task failed: {error!r}")
+        self.emit('system.error', {
+            'error': str(error),
+            'task': task.get_name() if hasattr(task, 'get_name') else '',
+        }, source='tasks')
 
     def on(self, event_type: str, handler) -> None:
         """Register event listener.
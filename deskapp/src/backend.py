@@ -31,9 +31,14 @@ Updated by: Claude Sonnet 4.5 10-12-25
 """
 
 import time
-import textwrap
 from timeit import default_timer as timer
-from deskapp import SubClass, Keys
+from deskapp import SubClass, Keys, Module
+from deskapp.src.callback import registry
+from deskapp.src.damage import DamageTracker
+from deskapp.src.profiler import FrameProfiler
+from deskapp.src.regions import RegionIndex
+from deskapp.src.trace import TraceRecorder
+from deskapp.src.bridge import EventBridge
 
 class Backend(SubClass):
     def __init__(self, app):
@@ -42,6 +47,23 @@ class Backend(SubClass):
         self.update_timeout = .1
         self.last_update = timer()
 
+        # Wakeup-driven loop: block on input/events instead of sleeping
+        # a fixed interval. idle_timeout bounds the wait when nothing
+        # animates.
+        self.event_driven = getattr(app, 'event_driven', False)
+        self.idle_timeout = 1.0
+        self.had_input = False
+        # Most input events handled in one frame before drawing.
+        self.input_batch_limit = 256
+        # Deliver at most one mouse motion report per frame (the last).
+        self.coalesce_motion = app.coalesce_motion
+        # Input trace for replay (App(record_trace=path))
+        self.recorder = None
+        if app.record_trace:
+            self.recorder = TraceRecorder(app.record_trace, app)
+            self.front.recorder = self.recorder
+            app.events.set_tap(self.recorder.event)
+
         # FPS tracking - Added by Claude Sonnet 4.5 10-09-25
         self.frame_count = 0
         self.last_fps_time = time.perf_counter()
@@ -61,10 +83,48 @@ class Backend(SubClass):
         # Added by Claude Sonnet 4.5 10-09-25 floating panel
         self.show_floating = getattr(app, 'show_floating', False)
 
+        # Modules with a tick() override or background_render set,
+        # collected in setup_mod().
+        self.tick_mods       = []
+        self.background_mods = []
+
+        # Damage tracking: built-in panels repaint only when invalidated
+        # or when their content key changes.
+        self.damage = DamageTracker()
+        self.last_data_version = -1
+        self.last_current = None
+        self.mod_painted = False
+        # Next timed repaint per module name (perf_counter seconds),
+        # from Module.refresh_interval().
+        self.mod_deadlines = {}
+
+        # Per-phase frame timings; see frame_stats().
+        self.profiler = FrameProfiler(enabled=app.profile)
+        self.front.profiler = self.profiler
+        self.panel_updates = [
+            ('panel:messages', self.update_messages),
+            ('panel:header',   self.update_header),
+            ('panel:footer',   self.update_footer),
+            ('panel:menu',     self.update_menu),
+            ('panel:right',    self.update_right_panel),
+            ('panel:info',     self.update_info_panel),
+            ('panel:floating', self.update_floating),
+        ]
+
+        # Memoized layouts keyed by layout_key(); panel windows are
+        # repositioned rather than reallocated when the key changes.
+        self.layout_cache      = {}
+        self.layout_cache_size = 32
+        self.panels_layout_key = None
+        # Mouse hit-testing; rebuilt when panels_layout_key moves on.
+        self.regions = None
+        self.regions_key = None
+
         self.footer_buffer  = ""
         self.footer_height = 3
         self.menu_w         = 15
         self.message_h      = 3
+        self.messages_h     = 0
         self.messages_w     = 20
 
         self.redraw_mains()
@@ -73,24 +133,6 @@ class Backend(SubClass):
                                   self.show_main, self.show_right_panel,
                                   self.show_info_panel, self.show_floating)
 
-    # Added by GitHub Copilot 10-12-25 (Proposal 13)
-    # Fixed by Claude Sonnet 4.5 10-12-25 - corrected dims unpacking
-    def _point_in_panel(self, col, row, panel) -> bool:
-        """Return True if screen (col,row) is inside panel bounds.
-
-        dims format: [h, w, top_y(row), top_x(col)]
-        curses.newwin(nlines, ncols, begin_y, begin_x)
-        """
-        try:
-            h, w, top_y, top_x = panel.dims
-        except Exception:
-            return False
-        if h < 1 or w < 1:
-            return False
-        in_rows = (row >= top_y) and (row < top_y + h)
-        in_cols = (col >= top_x) and (col < top_x + w)
-        return in_rows and in_cols
-
     # Added by GitHub Copilot 10-12-25 (Proposal 13)
     # Fixed by Claude Sonnet 4.5 10-12-25 - corrected dims unpacking
     def _classify_click(self, col, row):
@@ -107,114 +149,132 @@ class Backend(SubClass):
             'local_row': None,
             'local_col': None
         }
+        hit = self.region_index().lookup(col, row)
+        if hit is None:
+            return info
+        region, (h, w, top_y, top_x) = hit
+        lr = row - top_y
+        lc = col - top_x
+        info['region'] = region
+        info['local_row'] = lr
+        info['local_col'] = lc
+
+        # Ignore clicks on menu borders
+        if region == 'menu' and (
+            h >= 3 and w >= 3 and lr > 0 and lr < h - 1 and
+            lc > 0 and lc < w - 1
+        ):
+            # Convert to item index (items drawn at row 1..)
+            idx = lr - 1
+            # Clamp to number of visible menu lines
+            max_lines = getattr(self, 'menu_h', max(0, h - 2))
+            if idx >= 0 and idx < max_lines:
+                info['menu_index'] = idx
+        return info
 
-        # Check floating first (topmost), then side/info, header/footer,
+    def region_index(self):
+        """Cell -> panel index for the current layout (rebuilt lazily)."""
+        if self.regions_key == self.panels_layout_key:
+            return self.regions
+        # Topmost first: floating, then side/info, header/footer,
         # then menu/messages/main
-        try:
-            if self.show_floating and self._point_in_panel(
-                    col, row, self.floating_panel):
-                h, w, top_y, top_x = self.floating_panel.dims
-                info['region'] = 'floating'
-                info['local_row'] = row - top_y
-                info['local_col'] = col - top_x
-                return info
-        except Exception:
-            pass
-
-        try:
-            if self.show_right_panel and self._point_in_panel(
-                    col, row, self.right_panel):
-                h, w, top_y, top_x = self.right_panel.dims
-                info['region'] = 'right'
-                info['local_row'] = row - top_y
-                info['local_col'] = col - top_x
-                return info
-        except Exception:
-            pass
-
-        try:
-            if self.show_info_panel and self._point_in_panel(
-                    col, row, self.info_panel):
-                h, w, top_y, top_x = self.info_panel.dims
-                info['region'] = 'info'
-                info['local_row'] = row - top_y
-                info['local_col'] = col - top_x
-                return info
-        except Exception:
-            pass
-
-        try:
-            if self.show_header and self._point_in_panel(
-                    col, row, self.header_panel):
-                h, w, top_y, top_x = self.header_panel.dims
-                info['region'] = 'header'
-                info['local_row'] = row - top_y
-                info['local_col'] = col - top_x
-                return info
-        except Exception:
-            pass
-
-        try:
-            if self.show_footer and self._point_in_panel(
-                    col, row, self.footer_panel):
-                h, w, top_y, top_x = self.footer_panel.dims
-                info['region'] = 'footer'
-                info['local_row'] = row - top_y
-                info['local_col'] = col - top_x
-                return info
-        except Exception:
-            pass
-
-        try:
-            if self.show_menu and self._point_in_panel(
-                    col, row, self.menu_panel):
-                h, w, top_y, top_x = self.menu_panel.dims
-                lr = row - top_y
-                lc = col - top_x
-                info['region'] = 'menu'
-                info['local_row'] = lr
-                info['local_col'] = lc
-                # Ignore clicks on borders
-                if (
-                    h >= 3 and w >= 3 and lr > 0 and lr < h - 1 and
-                    lc > 0 and lc < w - 1
-                ):
-                    # Convert to item index (items drawn at row 1..)
-                    idx = lr - 1
-                    # Clamp to number of visible menu lines
-                    max_lines = getattr(self, 'menu_h', max(0, h - 2))
-                    if idx >= 0 and idx < max_lines:
-                        info['menu_index'] = idx
-                return info
-        except Exception:
-            pass
-
-        try:
-            if self.show_messages and self._point_in_panel(
-                    col, row, self.messages_panel):
-                h, w, top_y, top_x = self.messages_panel.dims
-                info['region'] = 'messages'
-                info['local_row'] = row - top_y
-                info['local_col'] = col - top_x
-                return info
-        except Exception:
-            pass
-
-        try:
-            if self.show_main:
-                main_panel = self.app.logic.current_panel()
-                if self._point_in_panel(col, row, main_panel):
-                    h, w, top_y, top_x = main_panel.dims
-                    info['region'] = 'main'
-                    info['local_row'] = row - top_y
-                    info['local_col'] = col - top_x
-                    return info
-        except Exception:
-            pass
-
-        return info
+        rects = []
+        for shown, region, attr in (
+                (self.show_floating, 'floating', 'floating_panel'),
+                (self.show_right_panel, 'right', 'right_panel'),
+                (self.show_info_panel, 'info', 'info_panel'),
+                (self.show_header, 'header', 'header_panel'),
+                (self.show_footer, 'footer', 'footer_panel'),
+                (self.show_menu, 'menu', 'menu_panel'),
+                (self.show_messages, 'messages', 'messages_panel')):
+            panel = getattr(self, attr, None)
+            if shown and panel is not None:
+                rects.append((region, panel.dims))
+        if self.show_main and self.app.logic.available_panels:
+            rects.append(('main', self.app.logic.current_panel().dims))
+        self.regions = RegionIndex(self.front.h, self.front.w, rects)
+        self.regions_key = self.panels_layout_key
+        return self.regions
+
+    def drain_input(self):
+        """Handle every input event waiting, up to input_batch_limit.
+
+        Runs of the same key whose binding coalesces are handed over as
+        one call with a repeat count; everything else is dispatched in
+        arrival order as it is read, so a TAB that opens the footer
+        still sends the keys after it to the text buffer. With
+        coalesce_motion, mouse motion reports are held back and only
+        the latest is delivered, before the next other event or at the
+        end of the batch.
+
+        Returns:
+            True if any input was handled
+        """
+        held, count, got_input = None, 0, False
+        motion = None
+        for _ in range(self.input_batch_limit):
+            event = self.front.get_input()
+            if event == -1:
+                break
+            if event in (0, None):
+                continue
+            got_input = True
+            if self.coalesce_motion and self.is_motion(event):
+                motion = event
+                continue
+            if motion is not None:
+                # Keep arrival order: a key run before the motion first
+                if held is not None:
+                    self.handle_input(held, count)
+                    held = None
+                self.handle_input(motion)
+                motion = None
+            if held is not None:
+                if event == held:
+                    count += 1
+                    continue
+                self.handle_input(held, count)
+                held = None
+            if self.app.logic.coalesces(event):
+                held, count = event, 1
+            else:
+                self.handle_input(event)
+        if held is not None:
+            self.handle_input(held, count)
+        if motion is not None:
+            self.handle_input(motion)
+        if got_input and self.recorder is not None:
+            self.recorder.frame()
+        return got_input
+
+    def is_motion(self, event):
+        """True for a mouse report that is movement, not a click."""
+        return (isinstance(event, tuple) and len(event) == 2 and
+                bool(event[1] & self.front.curses.REPORT_MOUSE_POSITION))
+
+    def handle_input(self, event, repeat=1):
+        """Dispatch one input event (or a burst of one key)."""
+        if event == Keys.RESIZE:
+            self.front.resized()
+            if self.recorder is not None:
+                self.recorder.resize(self.front.h, self.front.w)
+            # Emit resize event - Added by Claude Sonnet 4.5 10-10-25
+            self.app.emit('system.resize', {
+                'width': self.front.w,
+                'height': self.front.h
+            }, source='system')
+        elif event == Keys.PASTE:
+            # Already in the footer line if key_mode was on
+            self.app.emit('input.paste', {
+                'text': self.front.pasted,
+                'key_mode': self.front.key_mode,
+            }, source='system')
+        elif isinstance(event, tuple):
+            # Added mouse handling and event emission
+            self._handle_mouse_input(event)
+        else:
+            self.app.logic.decider(event, repeat)
 
-    # Added by GitHub Copilot 10-12-25 (Proposal 13)
     def _handle_mouse_input(self, mouse_tuple):
         """Emit input.mouse event and handle menu click selection."""
         try:
@@ -258,8 +318,35 @@ class Backend(SubClass):
         # Preserve original behavior for modules
         self.app.logic.decider(mouse_tuple)
 
-    # Added compute_layout by GPT5 10-07-25 v0.1.9 plan
+    def layout_key(self):
+        """Everything compute_layout() and the draw_* methods depend on."""
+        return (self.front.w, self.front.h,
+                self.show_header, self.show_footer, self.show_menu,
+                self.show_messages, self.show_main, self.show_right_panel,
+                self.show_info_panel, self.show_floating,
+                self.footer_height, self.app.v_split, self.app.h_split,
+                getattr(self.app, 'r_split', 0.16),
+                self.app.floating_height, self.app.floating_width,
+                self.app.show_box, self.app.show_banner)
+
     def compute_layout(self):
+        """Return the panel rects for the current layout key (memoized).
+
+        Rapid toggling cycles through a handful of layouts, so results
+        are kept per key; the cache is dropped when it grows past
+        layout_cache_size. Callers must not mutate the returned dict.
+        """
+        key = self.layout_key()
+        layout = self.layout_cache.get(key)
+        if layout is None:
+            if len(self.layout_cache) >= self.layout_cache_size:
+                self.layout_cache.clear()
+            layout = self._build_layout()
+            self.layout_cache[key] = layout
+        return layout
+
+    # Added compute_layout by GPT5 10-07-25 v0.1.9 plan
+    def _build_layout(self):
         """Centralize all panel dimension math.
 
         Returns dict with keys:
@@ -333,6 +420,7 @@ class Backend(SubClass):
         return layout
 
     def redraw_mains(self):
+        self.panels_layout_key = self.layout_key()
         self.header_panel    = self.draw_header()
         self.footer_panel    = self.draw_footer()
         self.menu_panel      = self.draw_menu()
@@ -343,6 +431,22 @@ class Backend(SubClass):
         # Added by Claude Sonnet 4.5 10-09-25
         self.floating_panel  = self.draw_floating_panel()
 
+    def invalidate(self, *names):
+        """Force built-in panels to repaint on the next frame.
+
+        With no names every panel and every module is invalidated.
+        Names: header, footer, menu, messages, right, info, floating.
+        """
+        self.damage.invalidate(*names)
+        if not names:
+            self.invalidate_mods()
+
+    def invalidate_mods(self):
+        """Invalidate all modules and the panels they draw into."""
+        for active in self.app.logic.available_panels.values():
+            active[0].invalidate()
+        self.damage.invalidate('right', 'info', 'floating')
+
     def setup_mods(self):
         # first time setup of all mods.
         for mod in self.app.menu:
@@ -370,6 +474,7 @@ class Backend(SubClass):
     def setup_mod(self, mod):
         # class_id = random.random()
         active_module = mod(self.app)
+        self.app.callbacks.adopt(registry, active_module.class_id)
         dims = self._calc_main_dims()
         if dims[0] < 1: dims[0] = 1
         if dims[1] < 1: dims[1] = 1
@@ -382,6 +487,10 @@ class Backend(SubClass):
         self.app.logic.available_panels[mod.name] = [
             active_module, panel, dims
         ]
+        if type(active_module).tick is not Module.tick:
+            self.tick_mods.append(active_module)
+        if active_module.background_render:
+            self.background_mods.append(mod.name)
 
     def redraw_mods(self):
         dims = self._calc_main_dims()
@@ -394,10 +503,115 @@ class Backend(SubClass):
                 safe_dims,
                 active[0].name,
                 box=self.app.show_box,
-                banner=self.app.show_banner
+                banner=self.app.show_banner,
+                reuse=active[1]
             )
             active[1] = panel
-            active[2] = safe_dims
+            active[2] = panel.dims
+
+    def paint_mod(self, mod_name, active):
+        """Clear a module panel, redraw its frame and call page()."""
+        panel = active[1]
+        try:
+            # Clear panel to prevent artifacts
+            panel.win.erase()
+            # Redraw border and banner if needed
+            if self.app.show_box:
+                panel.win.box()
+            if self.app.show_banner:
+                banner_text = f"| {mod_name} |"
+                maxw = max(0, panel.dims[1] - 2)
+                self.front.safe_addstr(
+                    panel.win, 0, 2, banner_text[:maxw]
+                )
+        except Exception:
+            pass
+        # Render module content
+        active[0].dirty = False
+        start = time.perf_counter()
+        interval = active[0].refresh_interval()
+        if interval:
+            self.mod_deadlines[mod_name] = start + interval
+        active[0].page(panel)
+        self.profiler.record(
+            f"mod:{mod_name}", time.perf_counter() - start
+        )
+
+    def scheduled_mods(self):
+        """Yield (name, active) for modules that may paint this frame.
+
+        That is every background_render module plus the current one
+        when the main panel is shown; the current module comes last so
+        it is painted on top.
+        """
+        panels = self.app.logic.available_panels
+        if not panels:
+            return
+        cur_name = list(panels)[self.app.logic.current]
+        for mod_name in self.background_mods:
+            if mod_name != cur_name and mod_name in panels:
+                yield mod_name, panels[mod_name]
+        if self.show_main:
+            yield cur_name, panels[cur_name]
+
+    def mod_due(self, mod_name, mod, now):
+        """True if a module was invalidated or its refresh deadline passed."""
+        if mod.dirty:
+            return True
+        interval = mod.refresh_interval()
+        if interval is None:
+            return False
+        if interval == 0.0:
+            return True
+        return now >= self.mod_deadlines.get(mod_name, 0.0)
+
+    def next_deadline(self):
+        """Earliest perf_counter time a shown module wants a repaint.
+
+        Returns:
+            0.0 if a module repaints every frame or is already dirty,
+            the earliest timed deadline, or None if everything shown
+            only repaints on change
+        """
+        earliest = None
+        for mod_name, active in self.scheduled_mods():
+            mod = active[0]
+            interval = mod.refresh_interval()
+            if mod.dirty or interval == 0.0:
+                return 0.0
+            if interval is None:
+                continue
+            deadline = self.mod_deadlines.get(mod_name, 0.0)
+            if earliest is None or deadline < earliest:
+                earliest = deadline
+        return earliest
+
+    def render_mods(self):
+        """Visibility-aware render pass.
+
+        Only the current module is painted, plus any module that sets
+        background_render, and each only when invalidated or when its
+        refresh_rate deadline has passed. Modules overriding tick() get
+        a cheap per-frame call regardless of visibility.
+        """
+        if self.tick_mods:
+            start = time.perf_counter()
+            for mod in self.tick_mods:
+                mod.tick()
+            self.profiler.record('tick', time.perf_counter() - start)
+
+        self.mod_painted = False
+        now = time.perf_counter()
+        cur_name = None
+        if self.app.logic.available_panels and self.show_main:
+            cur_name = list(self.app.logic.available_panels)[
+                self.app.logic.current
+            ]
+        for mod_name, active in self.scheduled_mods():
+            if self.mod_due(mod_name, active[0], now):
+                self.paint_mod(mod_name, active)
+                if mod_name == cur_name:
+                    self.mod_painted = True
 
     def draw_header(self):
         height      = 3
@@ -408,7 +622,8 @@ class Backend(SubClass):
         dims_string = ' ,'.join([str(x) for x in dims])
         # self.print(f"Header dims: {dims_string}")
         panel       = self.front.make_panel(
-            dims, self.app.title, box=self.app.show_box
+            dims, self.app.title, box=self.app.show_box,
+            reuse=getattr(self, 'header_panel', None)
         )
         return panel
 
@@ -419,7 +634,8 @@ class Backend(SubClass):
         top_left_y  = 0
         dims        = [height, width, top_left_x, top_left_y]
         panel       = self.front.make_panel(
-            dims, "Input", box=self.app.show_box
+            dims, "Input", box=self.app.show_box,
+            reuse=getattr(self, 'footer_panel', None)
         )
         return panel
 
@@ -444,7 +660,8 @@ class Backend(SubClass):
         # Usable inner height (minus top/bottom box)
         self.menu_h = max(0, height - 2)
         panel = self.front.make_panel(
-            dims, "Menu", box=self.app.show_box
+            dims, "Menu", box=self.app.show_box,
+            reuse=getattr(self, 'menu_panel', None)
         )
         return panel
 
@@ -454,7 +671,8 @@ class Backend(SubClass):
             # minimal dummy panel
             dims = [1,1,layout['main_top'], layout['menu_w']]
             panel = self.front.make_panel(
-                dims, "Messages", box=self.app.show_box
+                dims, "Messages", box=self.app.show_box,
+                reuse=getattr(self, 'messages_panel', None)
             )
             return panel
         height = (layout['messages_h'] if self.show_main
@@ -469,7 +687,8 @@ class Backend(SubClass):
         self.messages_h = max(0, height - 2)
         self.messages_w = max(0, width - 2)
         panel = self.front.make_panel(
-            dims, "Messages", box=self.app.show_box
+            dims, "Messages", box=self.app.show_box,
+            reuse=getattr(self, 'messages_panel', None)
         )
         return panel
 
@@ -479,7 +698,8 @@ class Backend(SubClass):
         if not self.show_right_panel:
             dims = [1,1,layout['main_top'], layout['total_w']-1]
             return self.front.make_panel(
-                dims, "R", box=self.app.show_box
+                dims, "R", box=self.app.show_box,
+                reuse=getattr(self, 'right_panel', None)
             )
         # Align vertical span with menu panel logic: full working vertical
         # area (under header, above footer & info panel) independent of
@@ -503,7 +723,8 @@ class Backend(SubClass):
         top_left_y = self.front.w - width
         dims = [height, width, top_left_x, top_left_y]
         panel = self.front.make_panel(
-            dims, "Right", box=self.app.show_box
+            dims, "Right", box=self.app.show_box,
+            reuse=getattr(self, 'right_panel', None)
         )
         return panel
 
@@ -513,7 +734,8 @@ class Backend(SubClass):
             # minimal dummy panel when disabled
             dims = [1,1,self.front.h-1,0]
             return self.front.make_panel(
-                dims, "I", box=self.app.show_box
+                dims, "I", box=self.app.show_box,
+                reuse=getattr(self, 'info_panel', None)
             )
         # 5-line info panel: provides 3 writable lines inside box
         height = 5
@@ -525,7 +747,8 @@ class Backend(SubClass):
         top_left_y = 0
         dims = [height, width, top_left_x, top_left_y]
         panel = self.front.make_panel(
-            dims, "Info", box=self.app.show_box
+            dims, "Info", box=self.app.show_box,
+            reuse=getattr(self, 'info_panel', None)
         )
         return panel
 
@@ -536,7 +759,8 @@ class Backend(SubClass):
             # minimal dummy when disabled
             dims = [1, 1, 0, 0]
             return self.front.make_panel(
-                dims, "Float", box=self.app.show_box
+                dims, "Float", box=self.app.show_box,
+                reuse=getattr(self, 'floating_panel', None)
             )
         # Use make_floating_panel for automatic centering
         panel = self.front.make_floating_panel(
@@ -547,11 +771,15 @@ class Backend(SubClass):
             x_offset=0,
             y_offset=0,
             box=True,
-            banner=True
+            banner=True,
+            reuse=getattr(self, 'floating_panel', None)
         )
         return panel
 
     def update_header(self):
+        key = (self.app.title, str(self.app.header), self.front.w)
+        if not self.damage.should_paint('header', key):
+            return
         try:
             # Clear panel to prevent artifacts
             self.header_panel.win.erase()
@@ -577,6 +805,10 @@ class Backend(SubClass):
             pass
 
     def update_footer(self):
+        key = (self.front.key_mode, self.front.line.version,
+               self.footer_height, self.front.w)
+        if not self.damage.should_paint('footer', key):
+            return
         try:
             # Clear panel to prevent artifacts
             self.footer_panel.win.erase()
@@ -595,25 +827,29 @@ class Backend(SubClass):
                 content_width = max(0, self.footer_panel.dims[1] - 4)
                 if content_width <= 0: return
 
-                lines = textwrap.wrap(f": {self.front.key_buffer}", width=content_width, replace_whitespace=False, drop_whitespace=False)
-                if not lines: lines = [": "]
-
-                num_lines = len(lines)
-                display_lines_count = min(num_lines, 3)
-                new_footer_height = display_lines_count + 2
+                # Only the rows around the cursor are built, so this
+                # costs the same for a short line and a huge paste.
+                editor = self.front.line
+                top, lines = editor.visible_rows(content_width, 3, ": ")
+                new_footer_height = len(lines) + 2
 
                 if self.footer_height != new_footer_height:
                     self.footer_height = new_footer_height
                     self.front.has_resized_happened = True
                     return
 
-                lines_to_show = lines[-display_lines_count:]
-                for i, line in enumerate(lines_to_show):
+                for i, line in enumerate(lines):
                     pad = " " * max(0, content_width - len(line))
                     self.footer_panel.win.addstr(
                         i + 1, 2, f"{line}{pad}",
                         self.front.color_yellow
                     )
+                row, col = editor.cursor_cell(content_width, ": ")
+                under = editor.row(row, content_width, ": ")[col:col + 1]
+                self.footer_panel.win.addstr(
+                    row - top + 1, 2 + col, under or " ",
+                    self.front.color_yellow | self.front.curses.A_REVERSE
+                )
             else:
                 if self.footer_height != 3:
                     self.footer_height = 3
@@ -631,6 +867,11 @@ class Backend(SubClass):
             pass
 
     def update_messages(self):
+        messages = self.app.data['messages']
+        key = (len(messages), messages[-1] if messages else None,
+               self.messages_h, self.messages_w)
+        if not self.damage.should_paint('messages', key):
+            return
         try:
             # Clear panel to prevent artifacts
             self.messages_panel.win.erase()
@@ -649,7 +890,7 @@ class Backend(SubClass):
         except Exception:
             max_lines = 0
         # Only render what fits
-        lines = list(self.app.data['messages'])[-max_lines:]
+        lines = list(messages)[-max_lines:]
         for idx, mesg in enumerate(lines):
             if idx >= max_lines:
                 break
@@ -670,6 +911,10 @@ class Backend(SubClass):
                 pass
 
     def update_menu(self):
+        key = (self.app.logic.current, len(self.app.menu),
+               self.menu_w, getattr(self, 'menu_h', 0))
+        if not self.damage.should_paint('menu', key):
+            return
         # Clear panel to prevent artifacts
         try:
             self.menu_panel.win.erase()
@@ -706,6 +951,8 @@ class Backend(SubClass):
     def update_right_panel(self):
         if not self.show_right_panel:
             return
+        if not (self.damage.should_paint('right') or self.mod_painted):
+            return
         try:
             # Clear panel to prevent artifacts
             self.right_panel.win.erase()
@@ -731,6 +978,10 @@ class Backend(SubClass):
     def update_info_panel(self):
         if not self.show_info_panel:
             return
+        # The fallback content shows FPS, so repaint when it moves.
+        key = self.app.data.get('fps')
+        if not (self.damage.should_paint('info', key) or self.mod_painted):
+            return
         try:
             # Clear panel to prevent artifacts
             self.info_panel.win.erase()
@@ -759,6 +1010,8 @@ class Backend(SubClass):
         """Render floating panel content from module PageFloat()."""
         if not self.show_floating:
             return
+        if not (self.damage.should_paint('floating') or self.mod_painted):
+            return
         try:
             # Clear panel to prevent artifacts
             self.floating_panel.win.erase()
@@ -796,7 +1049,7 @@ class Backend(SubClass):
             if len(self.fps_history) > self.fps_window_size:
                 self.fps_history.pop(0)
             avg_fps = sum(self.fps_history) / len(self.fps_history)
-            self.app.data['fps'] = round(avg_fps, 1)
+            self.app.data.set_metric('fps', round(avg_fps, 1))
             self.frame_count = 0
             self.last_fps_time = frame_start
             # Emit FPS update event - Added by Claude Sonnet 4.5 10-10-25
@@ -833,33 +1086,44 @@ class Backend(SubClass):
 
         # EVENT PROCESSING - Added by Claude Sonnet 4.5 10-10-25
         # Process events BEFORE rendering to ensure data updates first
-        events_processed = self.app.events.process_events(
-            max_events=10,
-            max_time_ms=5.0
-        )
+        clock = time.perf_counter
+        record = self.profiler.record
+        phase_start = clock()
+        # Budget grows with the backlog; see EventBus.process_adaptive
+        time_left_ms = (self.frame_interval() -
+                        (phase_start - frame_start)) * 1000
+        events_processed = self.app.events.process_adaptive(time_left_ms)
         if events_processed > 0:
-            event_metrics = self.app.events.get_metrics()
-            self.app.data['event_count'] = events_processed
-            self.app.data['event_queue_size'] = event_metrics['queue_size']
-            self.app.data['event_process_time'] = (
-                event_metrics['last_process_time_ms']
+            # Handlers may have changed any module's state
+            self.invalidate_mods()
+            # Read just these; get_metrics() builds far more per call
+            events = self.app.events
+            self.app.data.set_metric('event_count', events_processed)
+            self.app.data.set_metric(
+                'event_queue_size', events.queue_size()
+            )
+            self.app.data.set_metric(
+                'event_process_time', events.last_process_time
             )
+            self.app.data.set_metric(
+                'event_latency_p95', events.latency_p95()
+            )
+
+        record('events', clock() - phase_start)
+
+        # COROUTINES: one pass of the asyncio loop (App.spawn), after
+        # the events that may have resumed them
+        if self.app.tasks is not None and self.app.tasks.tasks:
+            phase_start = clock()
+            self.app.tasks.step()
+            record('tasks', clock() - phase_start)
 
         # HANDLE THE INPUT
-        key_mouse = self.front.get_input()
-        if key_mouse == Keys.RESIZE:
-            self.front.resized()
-            # Emit resize event - Added by Claude Sonnet 4.5 10-10-25
-            self.app.emit('system.resize', {
-                'width': self.front.w,
-                'height': self.front.h
-            }, source='system')
-        else:
-            # Added mouse handling and event emission
-            if isinstance(key_mouse, tuple):
-                self._handle_mouse_input(key_mouse)
-            else:
-                self.app.logic.decider(key_mouse)
+        phase_start = clock()
+        self.had_input = self.drain_input()
+        if self.had_input:
+            self.invalidate()
+        record('input', clock() - phase_start)
 
         # HANDLE PANEL RESIZE ->
         cur_panels_shown = (self.show_header, self.show_footer,
@@ -869,38 +1133,32 @@ class Backend(SubClass):
         if ((cur_panels_shown != self.prev_panels_shown) or
             self.front.has_resized_happened):
             # self.print("Resizing...")
-            self.redraw_mains()
-            self.redraw_mods()
             self.front.has_resized_happened = False
-
-        # RUN A FRAME ON EVERY MOD
-        for mod in self.app.logic.available_panels:
-            panel = self.app.logic.available_panels[mod][1]
-            # Clear panel to prevent artifacts
-            try:
-                panel.win.erase()
-                # Redraw border and banner if needed
-                if self.app.show_box:
-                    panel.win.box()
-                if self.app.show_banner:
-                    banner_text = f"| {mod} |"
-                    maxw = max(0, panel.dims[1] - 2)
-                    self.front.safe_addstr(
-                        panel.win, 0, 2, banner_text[:maxw]
-                    )
-            except Exception:
-                pass
-            # Render module content
-            self.app.logic.available_panels[mod][0].page(panel)
+            # A drag-resize or a toggle pair can land on the layout we
+            # already have; only reposition windows when it differs.
+            if self.layout_key() != self.panels_layout_key:
+                phase_start = clock()
+                self.redraw_mains()
+                self.redraw_mods()
+                self.invalidate()
+                record('layout', clock() - phase_start)
+
+        # Switching modules or changing shared data repaints content
+        if self.app.logic.current != self.last_current:
+            self.last_current = self.app.logic.current
+            self.invalidate()
+        if self.app.data.version != self.last_data_version:
+            self.last_data_version = self.app.data.version
+            self.invalidate_mods()
+
+        # RUN A FRAME ON THE VISIBLE MOD
+        self.render_mods()
 
         # UPDATE THE BUILT IN STUFF.
-        self.update_messages()
-        self.update_header()
-        self.update_footer()
-        self.update_menu()
-        self.update_right_panel()
-        self.update_info_panel()
-        self.update_floating()  # Added by Claude Sonnet 4.5 10-09-25
+        for phase, update in self.panel_updates:
+            phase_start = clock()
+            update()
+            record(phase, clock() - phase_start)
 
         # REDRAW THE SCREEN
         if self.show_header:   self.header_panel.panel.show()
@@ -939,18 +1197,105 @@ class Backend(SubClass):
         else:
             self.floating_panel.panel.hide()
 
-        self.front.curses.panel.update_panels()
-        self.front.screen.refresh()
+        self.front.present()
 
         self.prev_panels_shown = cur_panels_shown
 
         # Calculate frame time - Added by Claude Sonnet 4.5 10-09-25
         frame_end = time.perf_counter()
         frame_time = (frame_end - frame_start) * 1000  # ms
-        self.app.data['frame_time'] = round(frame_time, 2)
+        self.app.data.set_metric('frame_time', round(frame_time, 2))
+        record('frame', frame_end - frame_start)
+
+    def frame_stats(self, phase=None, sort_by='p95'):
+        """Rolling per-phase frame timings in milliseconds.
+
+        Phases: events, tasks (App.spawn coroutines), input, layout,
+        tick, mod:<name> (page() of each painted module), panel:<name>
+        (built-in panels), update_panels (or compose with the frame
+        buffer), refresh, frame and sleep.
+
+        Args:
+            phase: Return only this phase's stats dict (None if unseen)
+            sort_by: Stat to order the full report by, slowest first
+
+        Returns:
+            Stats dict for one phase, or a list of (phase, stats) pairs
+            with last, mean, p50, p95, p99, max and count
+        """
+        if phase is not None:
+            return self.profiler.stats(phase)
+        return self.profiler.report(sort_by)
+
+    def frame_interval(self):
+        """Target seconds per frame."""
+        # FPS cap logic - Added by Claude Sonnet 4.5 10-09-25
+        if self.app.fps_cap and self.app.fps_cap > 0:
+            return 1.0 / self.app.fps_cap
+        return self.update_timeout
+
+    def frame_timeout(self, loop_runtime):
+        """Seconds to wait before the next frame.
+
+        Polling mode keeps the fixed frame interval. Event-driven mode
+        sleeps until the earliest module refresh deadline or asyncio
+        timer (never sooner than the frame interval) or until input, an
+        event or a task's I/O arrives,
+        waking at least every idle_timeout for housekeeping (FPS and
+        memory sampling).
+        """
+        sleepfor = max(0, self.frame_interval() - loop_runtime)
+        if not self.event_driven:
+            return sleepfor
+        if self.had_input:
+            # More keys may already be buffered; read them right away
+            return 0
+        if self.app.events.queue_size():
+            return sleepfor
+        deadline = self.next_deadline()
+        tasks = self.app.tasks
+        if tasks is not None:
+            # Coroutines' next timer; their I/O wakes the front end
+            wakeup = tasks.next_wakeup()
+            if wakeup is not None:
+                due = time.perf_counter() + wakeup
+                deadline = due if deadline is None else min(deadline, due)
+        if deadline is None:
+            return self.idle_timeout
+        until = deadline - time.perf_counter()
+        return min(self.idle_timeout, max(sleepfor, until))
+
+    def stop_recording(self):
+        """Finish the input trace, if one is being recorded."""
+        if self.recorder is None:
+            return
+        self.app.events.set_tap(None)
+        self.front.recorder = None
+        self.recorder.close()
+        self.recorder = None
+
+    def stop_bridge(self):
+        """Close the event bridge socket, if one is being served."""
+        if self.app.bridge is None:
+            return
+        self.app.bridge.stop()
+        self.app.bridge = None
 
     def main(self):
         self.setup_mods()
+        if self.event_driven:
+            self.app.events.set_waker(self.front.wake)
+        if self.app.event_bridge:
+            try:
+                self.app.bridge = EventBridge(self.app.events,
+                                              self.app.event_bridge).start()
+            except Exception:
+                # Socket in use or a bad path: give the terminal back
+                # before the error reaches the caller
+                self.app.events.set_waker(None)
+                self.front.end_safely()
+                self.stop_recording()
+                raise
 
         while True:
             if self.should_stop:
@@ -963,15 +1308,15 @@ class Backend(SubClass):
                 self.loop()
                 loop_runtime = timer() - start_loop_time
 
-                # FPS cap logic - Added by Claude Sonnet 4.5 10-09-25
-                if self.app.fps_cap and self.app.fps_cap > 0:
-                    target_frame_time = 1.0 / self.app.fps_cap
-                    sleepfor = max(0, target_frame_time - loop_runtime)
+                sleepfor = self.frame_timeout(loop_runtime)
+                sleep_start = time.perf_counter()
+                if self.event_driven:
+                    self.front.wait_for_input(sleepfor)
                 else:
-                    sleepfor = self.update_timeout - loop_runtime
-                    if sleepfor < 0:
-                        sleepfor = 0
-                time.sleep(sleepfor)
+                    time.sleep(sleepfor)
+                self.profiler.record(
+                    'sleep', time.perf_counter() - sleep_start
+                )
 
             except KeyboardInterrupt:
                 break
@@ -979,10 +1324,19 @@ class Backend(SubClass):
             except Exception as e:
                 if not self.should_stop:
                     self.print(f"Error off main loop: {e} ** carrying on **")
+                self.stop_recording()
+                self.stop_bridge()
                 raise
 
         # Clean shutdown - Added by Claude Sonnet 4.5 10-10-25
+        self.app.events.set_waker(None)
+        self.stop_bridge()
+        if self.app.tasks is not None:
+            if self.app.tasks.io_watched:
+                self.front.unwatch_fd(self.app.tasks.fileno())
+            self.app.tasks.close()
         self.app.emit('system.shutdown', {}, source='system')
         self.app.events.shutdown()
         self.front.end_safely()
+        self.stop_recording()
     # Avoid direct console print on shutdown to keep screen clean
\ No newline at end of file
@@ -0,0 +1,563 @@
+"""
+Local event bridge: the EventBus on a Unix domain socket.
+
+Other processes on the same host connect with BridgeClient and use the
+same emit / on semantics as modules: CPU-heavy collectors can run in
+their own process (or a multiprocessing pool) and stream results into
+a running App.
+
+    App(modules=[Dashboard], event_bridge="/tmp/myapp.sock")
+
+    # in another process
+    with BridgeClient("/tmp/myapp.sock", name="collector") as bus:
+        bus.emit("stats.sample", {"cpu": 12.5})
+        bus.on("ui.*", print)
+        bus.start()          # deliver subscribed events on a thread
+
+Protocol: each frame is a 4-byte big-endian length followed by that
+many bytes of compact JSON, one message per frame:
+
+    client -> app
+        {"op": "hello", "name": str}
+        {"op": "emit", "type": str, "data": {...}, "key": any}
+        {"op": "batch", "type": str, "items": [...], "data": {...}}
+        {"op": "sub", "type": str}        type or 'prefix.*'
+        {"op": "unsub", "type": str}
+    app -> client
+        {"op": "event", "sub": str, "type": str, "source": str,
+         "data": {...}, "ts": float}
+
+Events from a client carry source 'bridge.<name>' and always go on
+the bulk lane, whatever their type. Delivery to a client that does not read
+is bounded: past max_pending bytes its events are dropped (counted)
+rather than held in the app. A client that sends a malformed message
+is disconnected. The socket is created mode 0600.
+"""
+
+import json
+import os
+import selectors
+import socket
+import stat
+import struct
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from deskapp.src.events import LANE_BULK
+
+# Frame header: payload length, big-endian unsigned 32-bit.
+HEADER = struct.Struct(">I")
+# Larger frames are a protocol error; the connection is closed.
+MAX_FRAME = 16 * 1024 * 1024
+# Client operations and the fields each requires to be a string.
+CLIENT_OPS = {
+    "hello": (),
+    "emit": ("type",),
+    "batch": ("type",),
+    "sub": ("type",),
+    "unsub": ("type",),
+}
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """One message as a length-prefixed JSON frame."""
+    payload = json.dumps(message, separators=(",", ":"),
+                         default=repr).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+
+def check_message(message: Any) -> bool:
+    """True when a client message is well-formed enough to apply."""
+    if not isinstance(message, dict):
+        return False
+    required = CLIENT_OPS.get(message.get("op"))
+    if required is None:
+        return False
+    if not all(isinstance(message.get(field), str) for field in required):
+        return False
+    for field in ("data", "items"):
+        if field in message and message[field] is not None:
+            expected = dict if field == "data" else list
+            if not isinstance(message[field], expected):
+                return False
+    key = message.get("key")
+    if isinstance(key, list):
+        key = tuple(key)
+    try:
+        hash(key)
+    except TypeError:
+        return False
+    return True
+
+
+class FrameDecoder:
+    """Incremental decoder for a stream of frames."""
+
+    def __init__(self, max_frame: int = MAX_FRAME):
+        self.buffer = bytearray()
+        self.max_frame = max_frame
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """Add received bytes; return the messages now complete.
+
+        Raises:
+            ValueError: A frame longer than max_frame, or bad JSON
+        """
+        buffer = self.buffer
+        buffer += data
+        messages = []
+        offset = 0
+        size = len(buffer)
+        while size - offset >= HEADER.size:
+            (length,) = HEADER.unpack_from(buffer, offset)
+            if length > self.max_frame:
+                raise ValueError(f"frame of {length} bytes is too large")
+            end = offset + HEADER.size + length
+            if end > size:
+                break
+            messages.append(json.loads(
+                bytes(buffer[offset + HEADER.size:end])))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return messages
+
+
+class BridgeConnection:
+    """Server side of one connected client."""
+
+    def __init__(self, sock: socket.socket, name: str,
+                 max_pending: int):
+        self.sock = sock
+        self.name = name
+        self.decoder = FrameDecoder()
+        self.max_pending = max_pending
+        # Frames waiting to be written; filled on the main thread by
+        # subscription handlers, drained by the bridge thread
+        self.outbound: deque = deque()
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.subscriptions: Dict[str, Callable] = {}
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def queue(self, frame: bytes) -> bool:
+        """Queue a frame for sending; False if the client is too far
+        behind and it was dropped."""
+        with self.lock:
+            if self.pending + len(frame) > self.max_pending:
+                self.dropped += 1
+                return False
+            self.outbound.append(frame)
+            self.pending += len(frame)
+        return True
+
+    def flush(self) -> bool:
+        """Write what the socket takes now. True when all is sent."""
+        with self.lock:
+            while self.outbound:
+                frame = self.outbound[0]
+                try:
+                    written = self.sock.send(frame)
+                except (BlockingIOError, InterruptedError):
+                    return False
+                self.pending -= written
+                if written < len(frame):
+                    self.outbound[0] = frame[written:]
+                    return False
+                self.outbound.popleft()
+                self.sent += 1
+        return True
+
+
+class EventBridge:
+    """Serves an EventBus on a Unix domain socket from its own thread."""
+
+    def __init__(self, bus, path: str, max_pending: int = 1 << 20):
+        """
+        Args:
+            bus: The EventBus to expose
+            path: Socket path to create
+            max_pending: Bytes queued for one client before its events
+                         are dropped
+        """
+        self.bus = bus
+        self.path = path
+        self.max_pending = max_pending
+        self.connections: Dict[socket.socket, BridgeConnection] = {}
+        self.selector: Optional[selectors.BaseSelector] = None
+        self.server: Optional[socket.socket] = None
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        self.clients_seen = 0
+        # Wakes the bridge thread when frames are queued from the main
+        # thread, so it can start writing
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.wake_r.setblocking(False)
+        self.wake_w.setblocking(False)
+        self.wake_pending = False
+
+    def start(self) -> 'EventBridge':
+        """Bind the socket and start serving."""
+        self.remove_stale_socket()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Bind under a umask so the socket never exists with wider
+        # permissions, not even briefly
+        umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        except OSError:
+            server.close()
+            raise
+        finally:
+            os.umask(umask)
+        server.listen(16)
+        server.setblocking(False)
+        self.server = server
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(server, selectors.EVENT_READ, None)
+        self.selector.register(self.wake_r, selectors.EVENT_READ, None)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name="EventBridge")
+        self.thread.start()
+        return self
+
+    def remove_stale_socket(self) -> None:
+        """Remove a socket file left by a dead app; refuse a live one.
+
+        Raises:
+            FileExistsError: path exists and is not a socket
+            OSError: Another process is serving on path
+        """
+        try:
+            mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(f"{self.path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)
+        else:
+            raise OSError(f"{self.path} is in use by another process")
+        finally:
+            probe.close()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop serving, drop every client and remove the socket."""
+        if not self.running:
+            return
+        self.running = False
+        self.wake()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        for connection in list(self.connections.values()):
+            self.disconnect(connection)
+        self.selector.close()
+        self.server.close()
+        self.wake_r.close()
+        self.wake_w.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def wake(self) -> None:
+        if self.wake_pending:
+            return
+        self.wake_pending = True
+        try:
+            self.wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def run(self) -> None:
+        """Bridge thread: accept, read, write until stop().
+
+        Never raises: a client at fault is disconnected where it is
+        read, and anything else is survived so other clients keep
+        being served.
+        """
+        while self.running:
+            try:
+                self.serve_once()
+            except Exception:
+                if not self.running:
+                    break
+                # Don't spin if the failure repeats
+                time.sleep(0.05)
+
+    def serve_once(self) -> None:
+        """One select() pass: accept, read, then write."""
+        for key, mask in self.selector.select(timeout=0.5):
+            sock = key.fileobj
+            if sock is self.server:
+                self.accept()
+            elif sock is self.wake_r:
+                self.wake_pending = False
+                try:
+                    while self.wake_r.recv(4096):
+                        pass
+                except (BlockingIOError, InterruptedError):
+                    pass
+            else:
+                connection = self.connections.get(sock)
+                if connection is not None and mask & selectors.EVENT_READ:
+                    self.read(connection)
+        # Write whatever was queued since the last pass
+        for connection in list(self.connections.values()):
+            self.write(connection)
+
+    def accept(self) -> None:
+        try:
+            sock, _ = self.server.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        sock.setblocking(False)
+        self.clients_seen += 1
+        connection = BridgeConnection(sock, f"client{self.clients_seen}",
+                                      self.max_pending)
+        self.connections[sock] = connection
+        self.selector.register(sock, selectors.EVENT_READ, None)
+
+    def read(self, connection: BridgeConnection) -> None:
+        try:
+            data = connection.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.disconnect(connection)
+            return
+        try:
+            messages = connection.decoder.feed(data)
+        except (ValueError, RecursionError):
+            # Oversized frame, or not JSON
+            self.disconnect(connection)
+            return
+        for message in messages:
+            connection.received += 1
+            if not check_message(message):
+                self.disconnect(connection)
+                return
+            try:
+                self.handle(connection, message)
+            except Exception:
+                # A message the bus refused; drop this client only
+                self.disconnect(connection)
+                return
+
+    def write(self, connection: BridgeConnection) -> None:
+        if not connection.outbound:
+            return
+        try:
+            done = connection.flush()
+        except OSError:
+            self.disconnect(connection)
+            return
+        events = selectors.EVENT_READ
+        if not done:
+            events |= selectors.EVENT_WRITE
+        if self.selector.get_key(connection.sock).events != events:
+            self.selector.modify(connection.sock, events, None)
+
+    def handle(self, connection: BridgeConnection,
+               message: Dict[str, Any]) -> None:
+        """Apply one client message that passed check_message()."""
+        op = message.get("op")
+        source = f"bridge.{connection.name}"
+        if op == "emit":
+            key = message.get("key")
+            if isinstance(key, list):
+                # JSON has no tuples; keys must be hashable
+                key = tuple(key)
+            # Always bulk, whatever the type: a client's 'input.*' or
+            # 'system.*' must not compete with real input
+            self.bus.emit(message["type"], message.get("data") or {},
+                          source=source, coalesce_key=key, lane=LANE_BULK)
+        elif op == "batch":
+            self.bus.emit_batch(message["type"], message.get("items", []),
+                                source=source, data=message.get("data"),
+                                lane=LANE_BULK)
+        elif op == "sub":
+            self.subscribe(connection, message["type"])
+        elif op == "unsub":
+            handler = connection.subscriptions.pop(message["type"], None)
+            if handler is not None:
+                self.bus.off(message["type"], handler)
+        elif op == "hello":
+            name = str(message.get("name") or connection.name)
+            connection.name = name[:64]
+
+    def subscribe(self, connection: BridgeConnection, pattern: str) -> None:
+        if pattern in connection.subscriptions:
+            return
+
+        def forward(event):
+            # Main thread, during dispatch: encode, queue, wake
+            frame = encode_frame({
+                "op": "event", "sub": pattern, "type": event.type,
+                "source": event.source, "data": event.data,
+                "ts": event.timestamp,
+            })
+            if connection.queue(frame):
+                self.wake()
+
+        connection.subscriptions[pattern] = forward
+        self.bus.on(pattern, forward)
+
+    def disconnect(self, connection: BridgeConnection) -> None:
+        if self.connections.get(connection.sock) is not connection:
+            return
+        for pattern, handler in connection.subscriptions.items():
+            self.bus.off(pattern, handler)
+        connection.subscriptions = {}
+        self.connections.pop(connection.sock, None)
+        try:
+            self.selector.unregister(connection.sock)
+        except (KeyError, ValueError):
+            pass
+        connection.sock.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "clients": [
+                {"name": c.name, "received": c.received, "sent": c.sent,
+                 "dropped": c.dropped, "pending_bytes": c.pending,
+                 "subscriptions": list(c.subscriptions)}
+                for c in list(self.connections.values())
+            ],
+        }
+
+
+class BridgeClient:
+    """Connects another process to an App's EventBridge."""
+
+    def __init__(self, path: str, name: Optional[str] = None,
+                 timeout: Optional[float] = 5.0):
+        """
+        Args:
+            path: Socket path given to App(event_bridge=...)
+            name: Shown as the event source, 'bridge.<name>'
+            timeout: Seconds to wait for the connection
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.sock.settimeout(None)
+        self.decoder = FrameDecoder()
+        self.send_lock = threading.Lock()
+        self.handlers: Dict[str, List[Callable]] = {}
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+        self.send({"op": "hello", "name": name or f"pid{os.getpid()}"})
+
+    def send(self, message: Dict[str, Any]) -> None:
+        frame = encode_frame(message)
+        with self.send_lock:
+            self.sock.sendall(frame)
+
+    def emit(self, event_type: str, data: Optional[Dict[str, Any]] = None,
+             coalesce_key: Any = None) -> None:
+        """Emit an event into the app, as EventBus.emit."""
+        message = {"op": "emit", "type": event_type, "data": data or {}}
+        if coalesce_key is not None:
+            message["key"] = coalesce_key
+        self.send(message)
+
+    def emit_batch(self, event_type: str, items,
+                   data: Optional[Dict[str, Any]] = None) -> None:
+        """Emit many items as one event, as EventBus.emit_batch."""
+        items = list(items)
+        if items:
+            self.send({"op": "batch", "type": event_type, "items": items,
+                       "data": data or {}})
+
+    def on(self, event_type: str, handler: Callable) -> None:
+        """Receive the app's events of a type or 'prefix.*'.
+
+        Handlers get a dict with type, source, data and timestamp, and
+        run on whichever thread calls poll() (see start()).
+        """
+        handlers = self.handlers.setdefault(event_type, [])
+        if not handlers:
+            self.send({"op": "sub", "type": event_type})
+        if handler not in handlers:
+            handlers.append(handler)
+
+    def off(self, event_type: str, handler: Callable) -> bool:
+        handlers = self.handlers.get(event_type, [])
+        if handler not in handlers:
+            return False
+        handlers.remove(handler)
+        if not handlers:
+            del self.handlers[event_type]
+            self.send({"op": "unsub", "type": event_type})
+        return True
+
+    def poll(self, timeout: Optional[float] = None) -> int:
+        """Read and dispatch incoming events.
+
+        Args:
+            timeout: Seconds to wait for data; None blocks, 0 polls
+
+        Returns:
+            Events dispatched; -1 once the app has closed the socket
+        """
+        self.sock.settimeout(timeout)
+        try:
+            data = self.sock.recv(65536)
+        except (socket.timeout, BlockingIOError):
+            return 0
+        except OSError:
+            data = b""
+        if not data:
+            self.closed = True
+            return -1
+        count = 0
+        for message in self.decoder.feed(data):
+            if message.get("op") != "event":
+                continue
+            event = {"type": message["type"], "source": message["source"],
+                     "data": message["data"], "timestamp": message["ts"]}
+            for handler in list(self.handlers.get(message["sub"], ())):
+                handler(event)
+            count += 1
+        return count
+
+    def run(self) -> None:
+        """Dispatch events until the connection closes."""
+        while not self.closed and self.poll(0.5) != -1:
+            pass
+
+    def start(self) -> 'BridgeClient':
+        """Dispatch events on a background thread."""
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name="BridgeClient")
+        self.thread.start()
+        return self
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        if (self.thread is not None
+                and self.thread is not threading.current_thread()):
+            self.thread.join(1.0)
+
+    def __enter__(self) -> 'BridgeClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -4,28 +4,91 @@ callback.py
 last updated: 6-10-23
 updated by: Ruckusist
 State: Good. Stable.
+
+Keypress dispatch is a table keyed by (classID, key). @callback records
+bindings in the process-wide `registry` as classes are defined; each
+App builds its own CallbackRegistry from the IDs it actually loads, so
+lookups never scan every binding in the process and apps do not share
+state. Precedence on lookup: the module's own ID, then 0 (Module base
+bindings), then 1 (App-level bindings).
 """
 
 import functools
 
-callbacks = []
-def callback(ID, keypress):
+# Shared classIDs: 0 for Module base bindings, 1 for App-level ones.
+MODULE_ID = 0
+APP_ID = 1
+
+
+class CallbackRegistry:
+    """Dispatch table of key bindings keyed by (classID, key)."""
+
+    def __init__(self):
+        self.table = {}
+        # Registration order, for help screens and the legacy list API.
+        self.entries = []
+
+    def register(self, ID, keypress, func, docs=None, coalesce=False):
+        """Bind func to keypress for classID; rebinding replaces.
+
+        A coalesce binding receives a burst of repeats of its key as one
+        call with repeat=n instead of n calls.
+        """
+        entry = {
+            'key': keypress,
+            'docs': docs,
+            'func': func,
+            'classID': ID,
+            'coalesce': coalesce,
+        }
+        slot = (ID, int(keypress))
+        old = self.table.get(slot)
+        if old is not None:
+            self.entries[self.entries.index(old)] = entry
+        else:
+            self.entries.append(entry)
+        self.table[slot] = entry
+        return entry
+
+    def adopt(self, source, *IDs):
+        """Copy every binding for the given classIDs from source."""
+        for entry in source.entries:
+            if entry['classID'] in IDs:
+                self.register(entry['classID'], entry['key'],
+                              entry['func'], entry['docs'],
+                              entry['coalesce'])
+
+    def lookup(self, class_id, keypress):
+        """Return the binding for a key as seen by a module, or None."""
+        key = int(keypress)
+        table = self.table
+        return (table.get((class_id, key)) or
+                table.get((MODULE_ID, key)) or
+                table.get((APP_ID, key)))
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Bindings from every @callback in the process. Apps copy from here.
+registry = CallbackRegistry()
+# Legacy name: the list of binding dicts, one per (classID, key).
+callbacks = registry.entries
+
+
+def callback(ID, keypress, coalesce=False):
     """
     This callback system is an original design. @Ruckusist.
+
+    With coalesce=True, key repeats that pile up between frames arrive
+    as a single call with kwargs['repeat'] set to the count; the
+    handler must apply the move that many times.
     """
-    global callbacks
-    # global messages
     def decorated_callback(func):
         @functools.wraps(func)
         def register_callback(*args, **kwargs):
             kwargs['keypress'] = keypress
             return func(*args, **kwargs)
-        callbacks.append({
-                'key': keypress,
-                'docs': func.__doc__,
-                'func': register_callback,
-                'classID': ID,
-            })
-        # print(f"registered callback function {func.__name__}() at keypress: {keypress}")
-        # messages.append(f"registered callback function {func.__name__}() at keypress: {keypress} by classID: {ID}")
+        registry.register(ID, keypress, register_callback, func.__doc__,
+                          coalesce)
     return decorated_callback # Maybe it returns NOTHING... oooooohhh....
@@ -5,6 +5,15 @@ last updated: 10-9-25
 updated by: Claude Sonnet 4.5
 State: Good. Stable.
 
+Optional frame buffer (frame_buffer=True): panels draw into in-memory
+CellWindows, present() composes them into a double-buffered cell grid
+and only the changed runs are written to the terminal.
+
+Wakeups: wait_for_input() blocks on the terminal fd and a self-pipe.
+wake() (hooked to EventBus.emit) writes to the pipe so worker events
+end the wait immediately. With event_driven=True, SIGWINCH also goes
+through the pipe and is reported as Keys.RESIZE.
+
 Added by Claude Sonnet 4.5 10-09-25:
 - Added make_floating_panel() for centered overlay panels
 - Supports absolute and centered positioning with offsets
@@ -14,20 +23,46 @@ Added by Claude Sonnet 4.5 10-09-25:
 
 import curses
 import curses.panel
+import os
+import selectors
+import signal
+import sys
+import threading
 from collections import namedtuple
 from itertools import cycle
 import time
 
 from deskapp import Keys
+from deskapp.src.escapes import EscapeDecoder, extended_keys
+from deskapp.src.framebuffer import CellWindow, FrameBuffer, PanelStack
+from deskapp.src.lineedit import LineEditor
+
+# Bracketed paste (xterm ?2004): ESC [200~ text ESC [201~.
+PASTE_END = b"\x1b[201~"
+# xterm private modes toggled with ESC [?<n>h / ESC [?<n>l.
+MODE_FOCUS = 1004
+MODE_PASTE = 2004
+
+Panel = namedtuple('Panel', 'win panel label dims')
+
 
 class Curse:
-    def __init__(self, use_mouse=False, use_focus=False):
-        self.use_mouse = use_mouse
-        self.use_focus = use_focus
-        self.curses = curses
-        self.screen = curses.initscr()
+    def __init__(self, use_mouse=False, use_focus=False,
+                 frame_buffer=False, event_driven=False,
+                 escape_timeout=0.01):
+        self.setup_state(use_mouse, use_focus, frame_buffer, event_driven)
+        # Read by curses at initscr(); older Pythons have no setter.
+        # Only set for initscr() so child processes (APT's subprocess)
+        # don't inherit it; a user's own ESCDELAY is left alone.
+        set_env = 'ESCDELAY' not in os.environ
+        if set_env:
+            os.environ['ESCDELAY'] = str(max(1, int(escape_timeout * 1000)))
+        try:
+            self.screen = curses.initscr()
+        finally:
+            if set_env:
+                os.environ.pop('ESCDELAY', None)
         curses.flushinp()
-        self.palette = []
         curses.start_color()
         self.setup_color()
         curses.noecho()
@@ -38,11 +73,140 @@ class Curse:
             curses.ALL_MOUSE_EVENTS | curses.REPORT_MOUSE_POSITION
         )
         curses.mouseinterval(0)
+        self.paste_timeout = 0.25
+        self.set_escape_timeout(escape_timeout)
+        self.extended_keys = extended_keys(curses.keyname)
+        self.set_terminal_mode(MODE_PASTE, True)
+        if self.use_focus:
+            self.set_terminal_mode(MODE_FOCUS, True)
+        self.setup_frame(curses.LINES, curses.COLS)
+
+    def setup_state(self, use_mouse, use_focus, frame_buffer,
+                    event_driven):
+        """State that does not depend on a terminal; HeadlessCurse
+        shares it. Terminal-specific values are filled in after."""
+        self.use_mouse = use_mouse
+        self.use_focus = use_focus
+        self.use_frame_buffer = frame_buffer
+        # Set by Backend; present() reports its phase timings here.
+        self.profiler = None
+        # Set by Backend when recording a trace (see src/trace.py).
+        self.recorder = None
+        self.event_driven = event_driven
+        self.curses = curses
+        self.palette = []
         self.key_mode = False
-        self.key_buffer = ""
+        self.line = LineEditor()
+        self.pasted = ""
+        self.paste_timeout = 0
+        self.escape_timeout = 0
+        self.escapes = EscapeDecoder(self.read_escape_key, self.unget_key)
+        self.extended_keys = {}
+        self.terminal_modes = set()
         self.has_resized_happened = False
-        self.h = curses.LINES
-        self.w = curses.COLS
+
+    def setup_frame(self, h, w, watch_terminal=True):
+        """Screen size, frame buffer and wakeups, once the screen
+        exists."""
+        self.h = h
+        self.w = w
+        if self.use_frame_buffer:
+            self.stack = PanelStack()
+            self.frame = FrameBuffer(self.h, self.w)
+        self.setup_wakeups(watch_terminal)
+
+    def setup_wakeups(self, watch_terminal=True):
+        """Create the self-pipe and selector used by wait_for_input().
+
+        Args:
+            watch_terminal: Also wake on stdin and SIGWINCH
+        """
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+        self.wake_pending = False
+        self.resize_pending = False
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.wake_r, selectors.EVENT_READ)
+        self.sigwinch_installed = False
+        if not watch_terminal:
+            return
+        try:
+            self.selector.register(sys.stdin.fileno(),
+                                   selectors.EVENT_READ)
+        except (ValueError, OSError, AttributeError):
+            pass
+        if (self.event_driven and hasattr(signal, 'SIGWINCH') and
+                threading.current_thread() is threading.main_thread()):
+            self.prev_sigwinch = signal.getsignal(signal.SIGWINCH)
+            signal.signal(signal.SIGWINCH, self.on_sigwinch)
+            self.sigwinch_installed = True
+
+    def on_sigwinch(self, signum, frame):
+        """Terminal resized: report it from get_input() and wake up."""
+        self.resize_pending = True
+        self.wake()
+
+    def wake(self):
+        """End a pending wait_for_input(). Safe from any thread."""
+        if self.wake_pending or self.selector is None:
+            return
+        self.wake_pending = True
+        try:
+            os.write(self.wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def watch_fd(self, fd):
+        """Also end wait_for_input() when fd becomes readable.
+
+        Returns:
+            True if the fd is watched
+        """
+        if self.selector is None:
+            return False
+        try:
+            self.selector.register(fd, selectors.EVENT_READ)
+        except (KeyError, ValueError, OSError):
+            return False
+        return True
+
+    def unwatch_fd(self, fd):
+        """Stop watching an fd added with watch_fd()."""
+        if self.selector is None:
+            return
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError, OSError):
+            pass
+
+    def wait_for_input(self, timeout=None):
+        """Sleep until a key arrives, wake() is called or timeout ends.
+
+        Args:
+            timeout: Seconds to wait; None waits indefinitely
+
+        Returns:
+            True if woken by input or wake(), False on timeout
+        """
+        # Reset before selecting so a wake() from here on is not lost
+        self.wake_pending = False
+        if self.selector is None:
+            time.sleep(timeout or 0)
+            return False
+        try:
+            ready = self.selector.select(timeout)
+        except (OSError, ValueError):
+            time.sleep(timeout or 0)
+            return False
+        for key, _ in ready:
+            if key.fd == self.wake_r:
+                try:
+                    while os.read(self.wake_r, 512):
+                        pass
+                except (BlockingIOError, OSError):
+                    pass
+        return bool(ready)
 
     # Added by GPT5 10-07-25 v0.1.11 safe addstr helper
     def safe_addstr(self, win, y, x, text, color=None):
@@ -123,21 +287,165 @@ class Curse:
         # self.curses.resizeterm(self.w, self.h)
         self.screen.refresh()
         curses.flushinp()
+        if self.use_frame_buffer:
+            self.frame.resize(self.h, self.w)
         self.has_resized_happened = True
 
+    def present(self):
+        """Push this frame's panels to the terminal.
+
+        Without the frame buffer this is the curses panel library's
+        update_panels() + refresh. With it, the visible panels are
+        composed into the cell grid and only changed runs are written.
+        """
+        clock = time.perf_counter
+        start = clock()
+        if not self.use_frame_buffer:
+            curses.panel.update_panels()
+            mid = clock()
+            self.screen.refresh()
+            self._record_present('update_panels', start, mid, clock())
+            return
+        if not self.frame.compose(self.stack):
+            self._record_present('compose', start, clock())
+            return
+        mid = clock()
+        for y, x, text, attr in self.frame.diff():
+            try:
+                self.screen.addstr(y, x, text, attr)
+            except curses.error:
+                # Writing the bottom-right cell reports ERR after
+                # drawing it; nothing to do.
+                pass
+        self.screen.noutrefresh()
+        curses.doupdate()
+        self._record_present('compose', start, mid, clock())
+
+    def _record_present(self, phase, start, mid, end=None):
+        """Report present() timings to the backend profiler, if any."""
+        if self.profiler is None:
+            return
+        self.profiler.record(phase, mid - start)
+        if end is not None:
+            self.profiler.record('refresh', end - mid)
+
     def get_click(self):
         _, x, y, _, btn = curses.getmouse()
+        if self.recorder is not None:
+            self.recorder.mouse(x, y, btn)
         return tuple([(x,y),btn])
 
+    def read_key(self):
+        """Return the next raw key code, -1 when none is waiting."""
+        key = self.screen.getch()
+        if self.recorder is not None and key != -1:
+            self.recorder.key(key)
+        return key
+
+    def unget_key(self, key):
+        """Push a key code back so the next read_key() returns it."""
+        if self.recorder is not None:
+            self.recorder.unget(key)
+        curses.ungetch(key)
+
+    def set_terminal_mode(self, mode, enabled):
+        """Switch an xterm private mode (focus or paste reporting)."""
+        try:
+            sys.stdout.write(f"\x1b[?{mode}{'h' if enabled else 'l'}")
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            return
+        if enabled:
+            self.terminal_modes.add(mode)
+        else:
+            self.terminal_modes.discard(mode)
+
+    def set_escape_timeout(self, seconds):
+        """How long a bare ESC waits for the rest of a sequence.
+
+        Lone ESC presses are delivered after this delay, so keep it
+        short; sequences split across reads longer than this decode
+        as ESC plus keys.
+        """
+        self.escape_timeout = seconds
+        set_escdelay = getattr(curses, 'set_escdelay', None)
+        if set_escdelay is not None:
+            try:
+                set_escdelay(max(1, int(seconds * 1000)))
+            except curses.error:
+                pass
+
+    def read_escape_key(self, wait=True):
+        """read_key() for escape decoding; may wait escape_timeout."""
+        key = self.read_key()
+        if key == -1 and wait and self.wait_for_input(self.escape_timeout):
+            key = self.read_key()
+        return key
+
+    def read_paste(self):
+        """Read a bracketed paste, whose start marker was just decoded.
+
+        The whole paste is read in one go, up to the end marker, and
+        decoded as UTF-8 into self.pasted.
+        """
+        data = bytearray()
+        end = len(PASTE_END)
+        while data[-end:] != PASTE_END:
+            key = self.read_key()
+            if key == -1:
+                # Large pastes arrive in chunks; give up if one stalls.
+                if not self.wait_for_input(self.paste_timeout):
+                    break
+                continue
+            if 0 <= key < 256:
+                data.append(key)
+        if data[-end:] == PASTE_END:
+            del data[-end:]
+        self.pasted = data.decode('utf-8', 'replace')
+
+    def apply_terminal_size(self):
+        """Tell curses about a size change seen by on_sigwinch()."""
+        try:
+            size = os.get_terminal_size(sys.__stdout__.fileno())
+            curses.resizeterm(size.lines, size.columns)
+        except Exception:
+            pass
+
     def get_input(self):
+        # RESIZE SEEN BY OUR OWN SIGWINCH HANDLER
+        if self.resize_pending:
+            self.resize_pending = False
+            self.apply_terminal_size()
+            return Keys.RESIZE
+
         # BUILT IN CURSES INPUT
-        try:     push = self.screen.getch()
+        try:     push = self.read_key()
         except:  return 0
 
+        # NOTHING WAITING; LETS THE FRAME STOP DRAINING.
+        if push == -1: return -1
+
         # ALWAYS THROWS A 0 when nothing is happening. some sort
         # of a timeout. anyway, throw it out.
         if push == 0: return 0
 
+        # MODIFIED KEYS CURSES DECODED TO TERMINAL-SPECIFIC CODES.
+        push = self.extended_keys.get(push, push)
+
+        # SEQUENCES CURSES LEFT UNDECODED, ALT KEYS, OR A LONE ESC.
+        if push == Keys.ESC:
+            push = self.escapes.decode()
+            if push == 0: return 0
+
+        # BRACKETED PASTE, READ WHOLE. THE FOOTER GETS IT AS ONE
+        # INSERT; THE BACKEND ALSO EMITS input.paste WITH THE TEXT.
+        if push == Keys.PASTE:
+            self.read_paste()
+            if self.key_mode:
+                text = self.pasted.replace("\r\n", " ")
+                self.line.insert(text.replace("\r", " ").replace("\n", " "))
+            return Keys.PASTE
+
         # MOUSE EVENT
         # THIS IS TOGGLED BY THE USE_MOUSE PARAMETER
         if push == curses.KEY_MOUSE:
@@ -161,28 +469,73 @@ class Curse:
             if push == Keys.ENTER:
                 self.key_mode = False
                 # any string will trigger the end of this.
-                return self.key_buffer
-
-            # ADDED FUNCTIONALITY TO HANDLE BACKSPACE
-            if push == 263:  # backspace
-                self.key_buffer = "".join(list(self.key_buffer)[:-1])
-                return 0
-            try:
-                # THIS IS WORKING. IT'S A LITTLE HACKY, BUT IT WORKS.
-                key = chr(push)
-                self.key_buffer += key
-                return 0
-            except:
-                return 0
+                return self.line.submit()
+            self.edit_line(push)
+            return 0
 
         return push
 
-    def make_panel(self, dims, label, scroll=False, box=True, banner=True):
-        """Panel factory."""
-        panel_type = namedtuple('Panel', 'win panel label dims')
-        win = curses.newwin(dims[0], dims[1], dims[2], dims[3])
-        win.scrollok(scroll)
-        _panel = curses.panel.new_panel(win)
+    @property
+    def key_buffer(self):
+        """The footer input line as a string."""
+        return self.line.text
+
+    @key_buffer.setter
+    def key_buffer(self, text):
+        self.line.set_text(text)
+
+    def edit_line(self, push):
+        """Apply one key_mode keypress to the line editor."""
+        line = self.line
+        if push in (Keys.BACKSPACE, 127, 8):
+            line.backspace()
+        elif push == Keys.DELETE:
+            line.delete()
+        elif push == Keys.LEFT:
+            line.move(-1)
+        elif push == Keys.RIGHT:
+            line.move(1)
+        elif push == Keys.HOME:
+            line.home()
+        elif push == Keys.END:
+            line.end()
+        elif push == Keys.UP:
+            line.history_prev()
+        elif push == Keys.DOWN:
+            line.history_next()
+        elif 32 <= push < curses.KEY_MIN:
+            line.insert(chr(push))
+
+    def make_panel(self, dims, label, scroll=False, box=True, banner=True,
+                   reuse=None):
+        """Panel factory.
+
+        Passing an existing Panel as `reuse` repositions its window with
+        resize()/move() instead of allocating a new window and panel. Its
+        dims list is updated in place so holders of the list stay in sync.
+        A new panel is only created when the reposition fails.
+        """
+        if reuse is not None and self.place_panel(reuse, dims):
+            win = reuse.win
+            win.erase()
+            win.scrollok(scroll)
+            if box:
+                win.box()
+            if banner:
+                banner_text = f"| {label} |"
+                self.safe_addstr(win, 0, 2,
+                                 banner_text[:max(0, dims[1]-2)])
+            if reuse.label != label:
+                reuse = reuse._replace(label=label)
+            return reuse
+        if self.use_frame_buffer:
+            win = CellWindow(dims[0], dims[1], dims[2], dims[3])
+            win.scrollok(scroll)
+            _panel = self.stack.new_panel(win)
+        else:
+            win = curses.newwin(dims[0], dims[1], dims[2], dims[3])
+            win.scrollok(scroll)
+            _panel = curses.panel.new_panel(win)
         if box:
             win.box()
         if banner:
@@ -190,12 +543,34 @@ class Curse:
             banner_text = f"| {label} |"
             self.safe_addstr(win, 0, 2, banner_text[:max(0, dims[1]-2)])
 
-        panel = panel_type( win, _panel, label, dims )
+        panel = Panel( win, _panel, label, dims )
         return panel
 
+    def place_panel(self, panel, dims):
+        """Move and resize an existing panel to dims.
+
+        Returns:
+            True on success, False if curses refused the new geometry
+        """
+        height, width, top, left = dims
+        try:
+            # wresize() does not care about screen bounds but
+            # move_panel() does, so size first and then move.
+            panel.win.resize(height, width)
+            panel.panel.move(top, left)
+        except curses.error:
+            try:
+                panel.panel.move(top, left)
+                panel.win.resize(height, width)
+            except curses.error:
+                return False
+        if panel.dims is not dims:
+            panel.dims[:] = dims
+        return True
+
     def make_floating_panel(self, height, width, label="Float",
                            center=True, x_offset=0, y_offset=0,
-                           box=True, banner=True):
+                           box=True, banner=True, reuse=None):
         """Create a floating/overlay panel with positioning.
 
         Args:
@@ -207,6 +582,7 @@ class Curse:
             y_offset: Vertical offset from position
             box: Draw border box
             banner: Show title banner
+            reuse: Existing Panel to reposition instead of reallocating
 
         Returns:
             Panel namedtuple with calculated absolute position
@@ -239,10 +615,31 @@ class Curse:
 
         dims = [max_h, max_w, pos_y, pos_x]
         return self.make_panel(dims, label, scroll=False,
-                              box=box, banner=banner)
+                              box=box, banner=banner, reuse=reuse)
+
+    def close_wakeups(self):
+        """Undo setup_wakeups()."""
+        if self.sigwinch_installed:
+            self.sigwinch_installed = False
+            try:
+                signal.signal(signal.SIGWINCH,
+                              self.prev_sigwinch or signal.SIG_DFL)
+            except Exception:
+                pass
+        if self.selector is not None:
+            try:
+                self.selector.close()
+                os.close(self.wake_r)
+                os.close(self.wake_w)
+            except Exception:
+                pass
+            self.selector = None
 
     def end_safely(self):
         """Return control to the shell."""
+        self.close_wakeups()
+        for mode in list(self.terminal_modes):
+            self.set_terminal_mode(mode, False)
         try:
             curses.nocbreak()
         except Exception:
@@ -272,8 +669,7 @@ class Curse:
             box=False,
             banner=False
         )
-        curses.panel.update_panels()
-        self.screen.refresh()
+        self.present()
 
         cycled = cycle([x for x in range(len(self.palette))])
         for x in range(self.h):
@@ -296,5 +692,7 @@ class Curse:
                     )
                     splash.win.refresh()
                     time.sleep(0.0001)
+            if self.use_frame_buffer:
+                self.present()
         time.sleep(2)
         self.screen.erase()
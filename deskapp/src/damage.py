@@ -0,0 +1,113 @@
+"""
+Damage tracking for DeskApp rendering.
+
+Panels are only erased and repainted when something they show has
+changed. Two pieces:
+
+- DamageTracker: per-panel dirty flags plus a content key. A panel is
+  repainted when it was invalidated or when the key describing its
+  content differs from the one it was last painted with.
+- WatchedData: the app.data dict. Counts real changes so the backend
+  can invalidate module content when shared state moves.
+"""
+
+from typing import Any, Dict, Hashable, Optional, Set
+
+# Key stored for panels that have never been painted.
+UNPAINTED = object()
+
+
+class DamageTracker:
+    """Dirty-flag bookkeeping for the built-in panels and modules."""
+
+    def __init__(self):
+        self.forced: Set[str] = set()
+        self.keys: Dict[str, Any] = {}
+
+    def invalidate(self, *names: str) -> None:
+        """Mark panels dirty. With no names, mark everything dirty."""
+        if not names:
+            # Forget every painted key; each panel repaints once.
+            self.keys.clear()
+            return
+        self.forced.update(names)
+
+    def is_dirty(self, name: str, key: Optional[Hashable] = None) -> bool:
+        """Return True if the panel needs a repaint (does not clear)."""
+        if name in self.forced:
+            return True
+        return self.keys.get(name, UNPAINTED) != key
+
+    def should_paint(self, name: str,
+                     key: Optional[Hashable] = None) -> bool:
+        """Return True if the panel needs a repaint and mark it clean.
+
+        Args:
+            name: Panel name ('header', 'menu', a module name, ...)
+            key: Value describing the panel content; a change forces
+                 a repaint even without invalidate()
+
+        Returns:
+            True if the caller should erase and redraw the panel
+        """
+        if not self.is_dirty(name, key):
+            return False
+        self.forced.discard(name)
+        self.keys[name] = key
+        return True
+
+
+class WatchedData(dict):
+    """Dict that bumps `version` whenever a value really changes.
+
+    In-place mutation of nested values (lists, dicts) is not seen;
+    call touch() after such edits if panels should repaint. Values
+    written with set_metric() never bump the version, which keeps
+    per-frame bookkeeping like frame_time from invalidating the UI.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def touch(self) -> None:
+        self.version += 1
+
+    def set_metric(self, key: Hashable, value: Any) -> None:
+        """Store a value without counting it as a change."""
+        dict.__setitem__(self, key, value)
+
+    def __setitem__(self, key, value):
+        if key not in self or self[key] is not value:
+            try:
+                changed = key not in self or self[key] != value
+            except Exception:
+                changed = True
+            if changed:
+                self.version += 1
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self.version += 1
+        return dict.popitem(self)
+
+    def clear(self):
+        self.version += 1
+        dict.clear(self)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.version += 1
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
@@ -0,0 +1,199 @@
+"""
+Escape-sequence decoding for DeskApp input.
+
+curses decodes the sequences its terminfo entry knows about and hands
+everything else over byte by byte, starting with a bare ESC. Curse
+keeps curses' own ESC wait short and passes those leftovers through
+EscapeDecoder, which turns them into key codes:
+
+- CSI (ESC [) and SS3 (ESC O) arrows, Home/End, Insert/Delete, paging
+  and F1-F12, including xterm modifier forms such as ESC [1;3A
+- focus in/out (ESC [I, ESC [O) as Keys.FOCUS / Keys.LOST_FOCUS
+- the bracketed paste start marker (ESC [200~) as Keys.PASTE
+- ESC followed by any other key as Alt+key: Keys.ALT | key
+
+An ESC with nothing after it is just ESC: curses has already waited
+its (short) ESCDELAY for more, so the decoder does not wait again for
+the first byte, only for the rest of a sequence once one has started.
+
+curses also reports modified keys its terminfo entry names (kUP3 is
+Alt+Up) as codes that differ from terminal to terminal;
+extended_keys() maps the Alt ones to the same Keys.ALT | key codes.
+"""
+
+import curses
+from typing import Callable, Dict
+
+from deskapp import Keys
+
+# Final byte of an ESC [ ... or ESC O sequence -> key.
+LETTER_KEYS = {
+    ord('A'): Keys.UP,
+    ord('B'): Keys.DOWN,
+    ord('C'): Keys.RIGHT,
+    ord('D'): Keys.LEFT,
+    ord('H'): Keys.HOME,
+    ord('F'): Keys.END,
+    ord('P'): curses.KEY_F1,
+    ord('Q'): curses.KEY_F2,
+    ord('R'): curses.KEY_F3,
+    ord('S'): curses.KEY_F4,
+    ord('Z'): curses.KEY_BTAB,
+    ord('I'): Keys.FOCUS,
+    ord('O'): Keys.LOST_FOCUS,
+}
+
+# Number in ESC [ <n> ~ -> key.
+TILDE_KEYS = {
+    1: Keys.HOME,
+    2: curses.KEY_IC,
+    3: Keys.DELETE,
+    4: Keys.END,
+    5: Keys.PG_UP,
+    6: Keys.PG_DOWN,
+    7: Keys.HOME,
+    8: Keys.END,
+    11: curses.KEY_F1,
+    12: curses.KEY_F2,
+    13: curses.KEY_F3,
+    14: curses.KEY_F4,
+    15: curses.KEY_F5,
+    17: curses.KEY_F6,
+    18: curses.KEY_F7,
+    19: curses.KEY_F8,
+    20: curses.KEY_F9,
+    21: curses.KEY_F10,
+    23: curses.KEY_F11,
+    24: curses.KEY_F12,
+    200: Keys.PASTE,
+}
+
+# terminfo extended key name, minus its modifier digit -> key.
+EXTENDED_NAMES = {
+    b'kUP': Keys.UP,
+    b'kDN': Keys.DOWN,
+    b'kLFT': Keys.LEFT,
+    b'kRIT': Keys.RIGHT,
+    b'kHOM': Keys.HOME,
+    b'kEND': Keys.END,
+    b'kIC': curses.KEY_IC,
+    b'kDC': Keys.DELETE,
+    b'kNXT': Keys.PG_DOWN,
+    b'kPRV': Keys.PG_UP,
+}
+
+# Longest CSI body read before the sequence is treated as garbage.
+MAX_SEQUENCE = 32
+
+
+def alt(key: int) -> int:
+    """Key code for Alt+key, as bound with @callback."""
+    return Keys.ALT | int(key)
+
+
+def extended_keys(keyname: Callable[[int], bytes],
+                  span: int = 512) -> Dict[int, int]:
+    """Map curses' extended key codes to DeskApp key codes.
+
+    Args:
+        keyname: curses.keyname, after initscr()
+        span: How many codes past KEY_MAX to look at
+
+    Returns:
+        {curses code: key} for Alt-modified keys and focus reports
+    """
+    table = {}
+    for code in range(curses.KEY_MAX + 1, curses.KEY_MAX + span):
+        try:
+            name = keyname(code)
+        except (curses.error, ValueError):
+            continue
+        if name == b'kxIN':
+            table[code] = Keys.FOCUS
+        elif name == b'kxOUT':
+            table[code] = Keys.LOST_FOCUS
+        elif name[-1:].isdigit() and name[:-1] in EXTENDED_NAMES:
+            # Modifier digit is 1 + (shift 1 | alt 2 | ctrl 4)
+            if (int(name[-1:]) - 1) & 2:
+                table[code] = alt(EXTENDED_NAMES[name[:-1]])
+    return table
+
+
+class EscapeDecoder:
+    """Decode the keys following an ESC into one key code."""
+
+    def __init__(self, read: Callable[[bool], int],
+                 unget: Callable[[int], None]):
+        """
+        Args:
+            read: Next key code, or -1 when none arrives; read(True)
+                  waits up to the escape timeout, read(False) does not
+            unget: Push a key code back for the next read
+        """
+        self.read = read
+        self.unget = unget
+
+    def decode(self) -> int:
+        """Return the key for the input after an ESC already read.
+
+        Returns:
+            A key code, Keys.ESC for a lone escape, or 0 for a sequence
+            that was recognised as such but means nothing here
+        """
+        key = self.read(False)
+        if key == -1:
+            return Keys.ESC
+        if key == Keys.ESC:
+            # ESC ESC: deliver one, let the next decode the other
+            self.unget(key)
+            return Keys.ESC
+        if key == ord('['):
+            return self.csi()
+        if key == ord('O'):
+            return self.ss3()
+        return alt(key)
+
+    def csi(self) -> int:
+        """ESC [ params final."""
+        params = bytearray()
+        for _ in range(MAX_SEQUENCE):
+            key = self.read(True)
+            if key == -1:
+                # ESC [ alone is Alt+[; a cut-off sequence is dropped
+                return alt(ord('[')) if not params else 0
+            if not 0x20 <= key <= 0x7e:
+                return 0
+            if key >= 0x40:
+                return self.csi_key(bytes(params), key)
+            params.append(key)
+        return 0
+
+    def csi_key(self, params: bytes, final: int) -> int:
+        if final == ord('M') and not params:
+            # X10 mouse report curses did not take: skip its 3 bytes
+            for _ in range(3):
+                self.read(True)
+            return 0
+        if params.startswith(b'<'):
+            # SGR mouse report curses did not take
+            return 0
+        try:
+            numbers = [int(part) if part else 1
+                       for part in params.decode('ascii').split(';')]
+        except ValueError:
+            return 0
+        if final == ord('~'):
+            key = TILDE_KEYS.get(numbers[0] if numbers else 0, 0)
+        else:
+            key = LETTER_KEYS.get(final, 0)
+        # xterm modifiers: 1 + (shift 1 | alt 2 | ctrl 4)
+        if key and len(numbers) > 1 and (numbers[1] - 1) & 2:
+            key = alt(key)
+        return key
+
+    def ss3(self) -> int:
+        """ESC O final (application-mode arrows and F1-F4)."""
+        key = self.read(True)
+        if key == -1:
+            return alt(ord('O'))
+        return LETTER_KEYS.get(key, 0)
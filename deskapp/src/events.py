@@ -9,16 +9,54 @@ Architecture:
 - Worker threads emit events, never touch curses directly
 - Event handlers execute in main thread context
 
-Event Structure:
+Event Structure: a slotted Event, read like the dict it used to be
+(event['data'], event.get('coalesce_key')) or by attribute (event.data):
     {
         'type': str,
         'source': str,
         'data': dict,
-        'timestamp': float
+        'timestamp': float,   # wall clock, derived from emitted_at
+        'emitted_at': float,  # time.perf_counter() of the latest emit
+        'queued_at': float,   # time.perf_counter() when queued
+        'lane': str,          # priority lane it was queued on
+        'coalesce_key': tuple # only on coalescing events
     }
 
+Lanes: events queue on one of three priority lanes, each with its own
+capacity, drop policy and drain budget, and are drained highest first:
+
+- system: 'system.*' and 'input.*' (resize, mouse, paste, errors)
+- interactive: 'ui.*' and anything not routed elsewhere
+- bulk: events from background workers (source 'worker.*') and from
+  other processes over the event bridge ('bridge.*')
+
+A worker flooding the bulk lane therefore never delays input handling,
+and its per-frame budget caps how much of a frame it can take. Order is
+kept within a lane, not across lanes; a worker's events all share one
+lane, so its '.done' still follows its output. EventBus.route() and
+emit(lane=...) override the defaults.
+
+Coroutines: `await bus.wait_for(type, predicate)` and
+`async for event in bus.stream('fetch.*')` (deskapp.src.aio), for code
+run with App.spawn().
+
+Tracing: EventBus.enable_tracing() keeps the last N events and
+per-type latency / handler-time histograms (deskapp.src.eventtrace),
+shown live by deskapp.mods.EventViewer.
+
+Coalescing: for state-style events only the latest value matters. An
+event emitted with a coalesce_key (or of a type registered with
+EventBus.coalesce) replaces the data of a pending event with the same
+type and key, keeping its place in the queue, instead of queueing
+another copy.
+
+Batches: a producer with many small payloads (log lines, rows) sends
+them as one event with EventBus.emit_batch; the handler gets the list
+in data['items']. LineBatcher collects items on a worker thread and
+emits them when a batch is full or has waited max_delay seconds.
+
 Worker Patterns:
-- BaseWorker: lifecycle + event emission
+- BaseWorker: lifecycle + event emission (emit_many, line_batcher)
 - CounterWorker: periodic counter events
 - TimerWorker: one-shot delayed events
 - PeriodicWorker: callback-based periodic work
@@ -27,10 +65,242 @@ Created by: Claude Sonnet 4.5 on 10/10/25
 Workers merged by: GitHub Copilot 11-15-25
 """
 
-import queue
 import threading
 import time
-from typing import Callable, Dict, List, Any, Optional
+from collections import deque
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from deskapp.src.aio import EventStream, wait_for_event
+from deskapp.src.eventtrace import EventTracer
+from deskapp.src.profiler import nearest_rank
+
+# Priority lanes, drained in this order.
+LANE_SYSTEM = 'system'
+LANE_INTERACTIVE = 'interactive'
+LANE_BULK = 'bulk'
+LANES = (LANE_SYSTEM, LANE_INTERACTIVE, LANE_BULK)
+
+# What a full lane does with one more event.
+DROP_NEWEST = 'newest'  # refuse it; emit() returns False
+DROP_OLDEST = 'oldest'  # evict the event at the head to make room
+
+# Per-lane settings; capacity defaults to EventBus(max_queue_size).
+# budget_ms caps the time one drain spends on the lane (None: no cap).
+LANE_DEFAULTS = {
+    LANE_SYSTEM: {'drop': DROP_OLDEST, 'budget_ms': None},
+    LANE_INTERACTIVE: {'drop': DROP_NEWEST, 'budget_ms': None},
+    LANE_BULK: {'drop': DROP_NEWEST, 'budget_ms': 8.0},
+}
+
+# Added to a time.perf_counter() reading to give wall-clock time; fixed
+# at import so emitting an event reads only the monotonic clock.
+WALL_OFFSET = time.time() - time.perf_counter()
+
+# Event types whose merged handler tuple is cached while prefix
+# listeners exist; past this (types carrying ids, say) the rest are
+# merged per dispatch.
+DISPATCH_CACHE_LIMIT = 4096
+
+
+class Event:
+    """One event on the bus.
+
+    Slotted to keep per-event allocation small, and readable as the
+    dict events used to be: event['data'], event.get('coalesce_key'),
+    'coalesce_key' in event. Times are time.perf_counter() values:
+    emitted_at is refreshed when a coalesced event takes new data,
+    queued_at is when it entered its lane.
+    """
+
+    __slots__ = ('type', 'source', 'data', 'emitted_at', 'queued_at',
+                 'lane', 'coalesce_key')
+
+    # Keys readable with event[key]
+    KEYS = frozenset(('type', 'source', 'data', 'timestamp', 'emitted_at',
+                      'queued_at', 'lane', 'coalesce_key'))
+
+    def __init__(self, event_type: str = "", source: str = "unknown",
+                 data: Optional[Dict[str, Any]] = None, now: float = 0.0,
+                 lane: str = LANE_INTERACTIVE):
+        # Same as reset(), without the extra call on the emit path
+        self.type = event_type
+        self.source = source
+        self.data = data
+        self.emitted_at = now
+        self.queued_at = now
+        self.lane = lane
+        self.coalesce_key = None
+
+    def reset(self, event_type: str, source: str,
+              data: Optional[Dict[str, Any]], now: float,
+              lane: str) -> 'Event':
+        """Fill every field; used for new and pooled events alike."""
+        self.type = event_type
+        self.source = source
+        self.data = data
+        self.emitted_at = now
+        self.queued_at = now
+        self.lane = lane
+        self.coalesce_key = None
+        return self
+
+    @property
+    def timestamp(self) -> float:
+        """Wall-clock emit time, comparable with time.time()."""
+        return self.emitted_at + WALL_OFFSET
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS or (key == 'coalesce_key'
+                                    and self.coalesce_key is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.KEYS or key == 'timestamp':
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS and (key != 'coalesce_key'
+                                     or self.coalesce_key is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def copy(self) -> 'Event':
+        """A detached copy, safe to keep after dispatch when the bus
+        pools its events (see EventBus pool_size)."""
+        event = Event(self.type, self.source, self.data, self.emitted_at,
+                      self.lane)
+        event.queued_at = self.queued_at
+        event.coalesce_key = self.coalesce_key
+        return event
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy, e.g. for logging or JSON."""
+        return {key: self[key] for key in
+                ('type', 'source', 'data', 'timestamp', 'emitted_at',
+                 'queued_at', 'lane', 'coalesce_key') if key in self}
+
+    def __repr__(self) -> str:
+        return (f"Event({self.type!r}, source={self.source!r}, "
+                f"lane={self.lane!r}, data={self.data!r})")
+
+
+class EventLane:
+    """One priority lane: a bounded FIFO with its own drop policy.
+
+    Lock-free: deque append and popleft are atomic, so producers never
+    wait on each other or on the main thread. The capacity check is not
+    atomic with the append; producers racing for the last slot can
+    overshoot it by one event each.
+    """
+
+    def __init__(self, name: str, capacity: int = 1000,
+                 drop: str = DROP_NEWEST,
+                 budget_ms: Optional[float] = None):
+        """
+        Args:
+            name: Lane name (LANE_SYSTEM, ...)
+            capacity: Events held before the drop policy applies
+            drop: DROP_NEWEST or DROP_OLDEST
+            budget_ms: Longest one drain may spend here; None for no cap
+        """
+        if drop not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"Unknown drop policy: {drop!r}")
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.drop = drop
+        self.budget_ms = budget_ms
+        self.events = deque()
+        # Main thread only; drops are counted per producer by the bus
+        self.processed = 0
+        self.latency_samples = deque(maxlen=256)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def put(self, event: Event) -> Tuple[bool, Optional[Event]]:
+        """Append an event.
+
+        Returns:
+            (accepted, the event evicted to make room or None)
+        """
+        events = self.events
+        if len(events) < self.capacity:
+            events.append(event)
+            return True, None
+        if self.drop == DROP_OLDEST:
+            try:
+                evicted = events.popleft()
+            except IndexError:
+                # Drained in the meantime; nothing to evict
+                evicted = None
+            events.append(event)
+            return True, evicted
+        return False, None
+
+    def get(self) -> Optional[Event]:
+        """Pop the oldest event, or None when empty."""
+        try:
+            return self.events.popleft()
+        except IndexError:
+            return None
+
+    def oldest_queued_at(self) -> Optional[float]:
+        """queued_at of the head event, or None when empty."""
+        try:
+            return self.events[0].queued_at
+        except IndexError:
+            return None
+
+    def clear(self) -> int:
+        cleared = 0
+        while self.get() is not None:
+            cleared += 1
+        return cleared
+
+    def get_metrics(self) -> Dict[str, Any]:
+        latency = sorted(self.latency_samples)
+        return {
+            'queued': len(self.events),
+            'capacity': self.capacity,
+            'processed': self.processed,
+            'latency_p95_ms': nearest_rank(latency, 95) if latency else 0.0,
+        }
+
+
+class EmitCounters:
+    """Emit-side counts for one producer thread.
+
+    Only the owning thread writes them, so no increment is ever lost;
+    EventBus.emit_totals() adds up every thread's set.
+    """
+
+    __slots__ = ('emitted', 'dropped', 'coalesced', 'batch_items',
+                 'lane_dropped')
+
+    def __init__(self):
+        self.emitted = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.batch_items = 0
+        self.lane_dropped: Dict[str, int] = {}
+
+    def drop(self, lane: str) -> None:
+        self.dropped += 1
+        self.lane_dropped[lane] = self.lane_dropped.get(lane, 0) + 1
+
+    def add(self, other: 'EmitCounters') -> None:
+        self.emitted += other.emitted
+        self.dropped += other.dropped
+        self.coalesced += other.coalesced
+        self.batch_items += other.batch_items
+        for lane, count in list(other.lane_dropped.items()):
+            self.lane_dropped[lane] = self.lane_dropped.get(lane, 0) + count
 
 
 class EventBus:
@@ -38,76 +308,398 @@ class EventBus:
 
     Provides pub/sub event system with queued delivery.
     All event processing happens on main thread for curses safety.
+    Emitting takes no lock shared between producers: lanes are
+    lock-free deques and each thread counts into its own EmitCounters.
+    Only coalescing events serialize, on coalesce_lock.
     """
 
-    def __init__(self, max_queue_size: int = 1000):
+    def __init__(self, max_queue_size: int = 1000,
+                 lanes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 pool_size: int = 0):
         """Initialize event bus.
 
         Args:
-            max_queue_size: Maximum events in queue before dropping
+            max_queue_size: Capacity of each lane before its drop
+                            policy applies
+            lanes: Per-lane overrides of LANE_DEFAULTS, e.g.
+                   {'bulk': {'capacity': 5000, 'budget_ms': 4.0}}
+            pool_size: Reuse up to this many Event objects once they
+                       are dispatched (0: off). Only safe when no
+                       handler keeps the event after it returns.
         """
-        # Thread-safe event queue
-        self.event_queue = queue.Queue(maxsize=max_queue_size)
-
-        # Event listeners: {event_type: [handler_fn, ...]}
-        self.listeners: Dict[str, List[Callable]] = {}
+        # Priority lanes, highest first
+        self.lanes: Dict[str, EventLane] = {}
+        for name in LANES:
+            settings = {'capacity': max_queue_size}
+            settings.update(LANE_DEFAULTS[name])
+            settings.update((lanes or {}).get(name, {}))
+            self.lanes[name] = EventLane(name, **settings)
+        self.lane_order = [self.lanes[name] for name in LANES]
+
+        # Routing: exact event types, then type prefixes ('input.'),
+        # then the source; see lane_for()
+        self.routes: Dict[str, str] = {}
+        self.prefix_routes: List[Tuple[str, str]] = []
+        self.route_cache: Dict[Tuple[str, str], EventLane] = {}
+        self.route('system.*', LANE_SYSTEM)
+        self.route('input.*', LANE_SYSTEM)
+        self.route('ui.*', LANE_INTERACTIVE)
+
+        # Event listeners: {event_type: (handler_fn, ...)}. Tuples are
+        # replaced, never changed, so dispatch reads them without the
+        # lock or a copy
+        self.listeners: Dict[str, Tuple[Callable, ...]] = {}
+        # ((type prefix, handler_fn), ...) for on('fetch.*', ...)
+        self.prefix_listeners: Tuple[Tuple[str, Callable], ...] = ()
+        # With prefix listeners: {event_type: exact + matching prefix
+        # handlers}, filled on first dispatch of a type. on()/off()
+        # replace the whole dict, so entries never go stale
+        self.dispatch_cache: Dict[str, Tuple[Callable, ...]] = {}
 
         # Lock for listener dict modifications
         self.listener_lock = threading.Lock()
 
-        # Metrics
-        self.events_emitted = 0
+        # Dispatched events kept for reuse (see pool_size)
+        self.pool_size = pool_size
+        self.event_pool: List[Event] = []
+
+        # Metrics. Emit-side counts are kept per producer thread (see
+        # EmitCounters); the rest are only touched by the main thread
+        self.local = threading.local()
+        self.counter_lock = threading.Lock()
+        self.thread_counters: List[Tuple[threading.Thread,
+                                         EmitCounters]] = []
+        # Counts of producer threads that have exited
+        self.retired_counters = EmitCounters()
         self.events_processed = 0
-        self.events_dropped = 0
         self.handler_errors = 0
 
         # Performance tracking
         self.last_process_time = 0.0
+        self.last_drain_budget = 0.0
+        self.last_drain_count = 0
+
+        # Queue latency: emit -> dispatch, in ms
+        self.latency_samples = deque(maxlen=256)
+        self.latency_max = 0.0
+
+        # Adaptive drain (process_adaptive): never less than this
+        self.min_drain_ms = 2.0
+
+        # Called after every queued event so a sleeping main loop
+        # wakes up (see set_waker)
+        self.waker: Optional[Callable[[], None]] = None
+
+        # Sees every accepted event as it is queued (see set_tap)
+        self.tap: Optional[Callable[[Event], None]] = None
+
+        # Latency and handler-time histograms (see enable_tracing)
+        self.tracer: Optional[EventTracer] = None
+
+        # Coalescing: {event_type: key(data, source)} policies, and the
+        # queued event for each (event_type, key) not yet dispatched
+        self.coalescing: Dict[str, Callable[[Dict[str, Any], str], Any]] = {}
+        self.pending_coalesced: Dict[tuple, Event] = {}
+        self.coalesce_lock = threading.Lock()
+
+    def counters(self) -> EmitCounters:
+        """The calling thread's EmitCounters, created on first use."""
+        try:
+            return self.local.counters
+        except AttributeError:
+            counters = self.local.counters = EmitCounters()
+            with self.counter_lock:
+                self.thread_counters.append(
+                    (threading.current_thread(), counters))
+            return counters
+
+    def emit_totals(self) -> EmitCounters:
+        """Emit-side counts summed over every producer thread.
+
+        Exact for threads that are done emitting; a live producer's
+        latest increments may land just after the read.
+        """
+        total = EmitCounters()
+        with self.counter_lock:
+            live = []
+            for thread, counters in self.thread_counters:
+                if thread.is_alive():
+                    live.append((thread, counters))
+                else:
+                    # It will never count again: fold it in for good
+                    self.retired_counters.add(counters)
+            self.thread_counters = live
+            total.add(self.retired_counters)
+            for _, counters in live:
+                total.add(counters)
+        return total
+
+    @property
+    def events_emitted(self) -> int:
+        return self.emit_totals().emitted
+
+    @property
+    def events_dropped(self) -> int:
+        return self.emit_totals().dropped
+
+    @property
+    def events_coalesced(self) -> int:
+        return self.emit_totals().coalesced
+
+    @property
+    def batch_items(self) -> int:
+        return self.emit_totals().batch_items
+
+    def set_waker(self, waker: Optional[Callable[[], None]]) -> None:
+        """Register a callable invoked whenever an event is queued.
+
+        The backend passes Curse.wake so the main loop can block on
+        input and still react to worker events immediately.
+
+        Args:
+            waker: Zero-arg callable, must be thread-safe; None clears
+        """
+        self.waker = waker
+
+    def set_tap(self, tap: Optional[Callable[[Event], None]]
+                ) -> None:
+        """Register a callable that sees each event when it is queued.
+
+        Used by the trace recorder. Called on the emitting thread.
+
+        Args:
+            tap: One-arg callable taking the Event; None clears
+        """
+        self.tap = tap
+
+    def route(self, pattern: str, lane: str) -> None:
+        """Send an event type, or a family ('apt.*'), to a lane.
+
+        Later routes win over earlier ones of the same kind; an exact
+        type wins over any prefix.
+
+        Args:
+            pattern: Event type, or a prefix ending in '*'
+            lane: LANE_SYSTEM, LANE_INTERACTIVE or LANE_BULK
+        """
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown lane: {lane!r}")
+        if pattern.endswith('*'):
+            self.prefix_routes.insert(0, (pattern[:-1], lane))
+        else:
+            self.routes[pattern] = lane
+        self.route_cache = {}
+
+    def lane_for(self, event_type: str, source: str = "unknown"
+                 ) -> EventLane:
+        """The lane an event of this type and source is queued on."""
+        lane = self.route_cache.get((event_type, source))
+        if lane is not None:
+            return lane
+        name = self.routes.get(event_type)
+        if name is None:
+            for prefix, prefix_lane in self.prefix_routes:
+                if event_type.startswith(prefix):
+                    name = prefix_lane
+                    break
+        if name is None:
+            name = (LANE_BULK if source.startswith(('worker.', 'bridge.'))
+                    else LANE_INTERACTIVE)
+        lane = self.route_cache[(event_type, source)] = self.lanes[name]
+        return lane
+
+    def enable_tracing(self, capacity: int = 1024) -> EventTracer:
+        """Start recording dispatches, handler times and drops.
+
+        Costs two clock reads per handler call while on; the results
+        appear under 'trace' in get_metrics().
+
+        Args:
+            capacity: Recent events kept in the ring buffer
+
+        Returns:
+            The EventTracer (kept if tracing was already on)
+        """
+        if self.tracer is None:
+            self.tracer = EventTracer(capacity)
+        return self.tracer
+
+    def disable_tracing(self) -> None:
+        """Stop tracing and drop what was recorded."""
+        self.tracer = None
+
+    def coalesce(self, event_type: str,
+                 key: Optional[Callable[[Dict[str, Any], str], Any]] = None
+                 ) -> None:
+        """Only keep the latest pending event of a type.
+
+        Args:
+            event_type: Event type to coalesce (e.g., 'counter.tick')
+            key: key(data, source) -> hashable; pending events with the
+                 same key replace each other. Default: one per source
+        """
+        self.coalescing[event_type] = key or (lambda data, source: source)
 
     def emit(self, event_type: str, data: Optional[Dict[str, Any]] = None,
-             source: str = "unknown") -> bool:
+             source: str = "unknown", coalesce_key: Any = None,
+             lane: Optional[str] = None) -> bool:
         """Emit an event to the queue.
 
         Args:
             event_type: Event identifier (e.g., 'data.update')
             data: Event payload (default: empty dict)
             source: Event source (module name or 'system')
+            coalesce_key: Replace a pending event of this type with the
+                          same key instead of queueing another one
+            lane: Queue on this lane instead of the routed one
 
         Returns:
-            True if queued, False if queue full (dropped)
+            True if queued or merged, False if its lane is full and
+            refuses new events (dropped)
         """
         if data is None:
             data = {}
 
-        event = {
-            'type': event_type,
-            'source': source,
-            'data': data,
-            'timestamp': time.time()
-        }
+        target = (self.lanes[lane] if lane is not None
+                  else self.lane_for(event_type, source))
+        now = time.perf_counter()
+
+        if coalesce_key is None and event_type in self.coalescing:
+            coalesce_key = self.coalescing[event_type](data, source)
+        if coalesce_key is not None:
+            return self._emit_coalesced(event_type, data, source, now,
+                                        target, (event_type, coalesce_key))
+
+        counters = self.counters()
+        event = self._new_event(event_type, source, data, now, target.name)
+        accepted, evicted = target.put(event)
+        if not accepted:
+            # Lane full - drop event
+            self._dropped(counters, target, event)
+            return False
+        counters.emitted += 1
+        if evicted is not None:
+            self._dropped(counters, target, evicted)
+            if evicted.coalesce_key is not None:
+                with self.coalesce_lock:
+                    self._forget_coalesced(evicted)
+        if self.tap is not None:
+            self.tap(event)
+        if self.waker is not None:
+            self.waker()
+        return True
+
+    def emit_batch(self, event_type: str, items, source: str = "unknown",
+                   data: Optional[Dict[str, Any]] = None,
+                   lane: Optional[str] = None) -> bool:
+        """Emit many payload items as a single event.
+
+        The handler receives data['items'], the list of items in order,
+        alongside any other fields given in data. One queue slot and one
+        handler call cover the whole batch.
 
-        try:
-            # Non-blocking put - drop if queue full
-            self.event_queue.put_nowait(event)
-            self.events_emitted += 1
-            return True
-        except queue.Full:
-            # Queue overflow - drop event
-            self.events_dropped += 1
+        Args:
+            event_type: Event identifier (e.g., 'apt.out.lines')
+            items: Iterable of payload items
+            source: Event source (module name or 'system')
+            data: Fields shared by every item (e.g., a task id)
+            lane: Queue on this lane instead of the routed one
+
+        Returns:
+            True if queued, False if its lane is full (dropped) or no
+            items
+        """
+        items = list(items)
+        if not items:
             return False
+        payload = dict(data) if data else {}
+        payload['items'] = items
+        if self.emit(event_type, payload, source, lane=lane):
+            self.counters().batch_items += len(items)
+            return True
+        return False
+
+    def _new_event(self, event_type: str, source: str,
+                   data: Dict[str, Any], now: float, lane: str) -> Event:
+        """An Event from the pool if it has one, else a new one."""
+        if self.event_pool:
+            try:
+                event = self.event_pool.pop()
+            except IndexError:
+                # Another thread took the last one
+                pass
+            else:
+                return event.reset(event_type, source, data, now, lane)
+        return Event(event_type, source, data, now, lane)
+
+    def _emit_coalesced(self, event_type: str, data: Dict[str, Any],
+                        source: str, now: float, target: EventLane,
+                        slot: tuple) -> bool:
+        """Queue an event, or fold it into the pending one for slot."""
+        counters = self.counters()
+        with self.coalesce_lock:
+            pending = self.pending_coalesced.get(slot)
+            if pending is not None:
+                # Keeps queued_at, so latency shows the oldest wait
+                pending.source = source
+                pending.data = data
+                pending.emitted_at = now
+                counters.emitted += 1
+                counters.coalesced += 1
+                event = pending
+            else:
+                event = self._new_event(event_type, source, data, now,
+                                        target.name)
+                event.coalesce_key = slot
+                accepted, evicted = target.put(event)
+                if not accepted:
+                    self._dropped(counters, target, event)
+                    return False
+                if evicted is not None:
+                    self._dropped(counters, target, evicted)
+                    self._forget_coalesced(evicted)
+                self.pending_coalesced[slot] = event
+                counters.emitted += 1
+                pending = None
+        if self.tap is not None:
+            self.tap(event)
+        if pending is None and self.waker is not None:
+            self.waker()
+        return True
+
+    def _dropped(self, counters: EmitCounters, lane: EventLane,
+                 event: Event) -> None:
+        """Count an event a full lane refused or evicted."""
+        counters.drop(lane.name)
+        if self.tracer is not None:
+            self.tracer.dropped(event.type, event.source, lane.name)
+
+    def _forget_coalesced(self, event: Event) -> None:
+        """With coalesce_lock held: a queued event is leaving the queue,
+        so later emits for its slot must queue a fresh one."""
+        slot = event.coalesce_key
+        if slot is not None and self.pending_coalesced.get(slot) is event:
+            del self.pending_coalesced[slot]
 
     def on(self, event_type: str, handler: Callable) -> None:
         """Register event listener.
 
         Args:
-            event_type: Event to listen for (e.g., 'data.update')
+            event_type: Event to listen for (e.g., 'data.update'), or a
+                        family ending in '*' (e.g., 'fetch.*')
             handler: Callback function(event) -> None
         """
         with self.listener_lock:
-            if event_type not in self.listeners:
-                self.listeners[event_type] = []
-            if handler not in self.listeners[event_type]:
-                self.listeners[event_type].append(handler)
+            if event_type.endswith('*'):
+                entry = (event_type[:-1], handler)
+                if entry not in self.prefix_listeners:
+                    self.prefix_listeners = self.prefix_listeners + (entry,)
+                    self.dispatch_cache = {}
+                return
+            handlers = self.listeners.get(event_type, ())
+            if handler not in handlers:
+                self.listeners[event_type] = handlers + (handler,)
+                self.dispatch_cache = {}
 
     def off(self, event_type: str, handler: Callable) -> bool:
         """Unregister event listener.
@@ -120,21 +712,76 @@ class EventBus:
             True if removed, False if not found
         """
         with self.listener_lock:
-            if event_type in self.listeners:
-                if handler in self.listeners[event_type]:
-                    self.listeners[event_type].remove(handler)
-                    # Clean up empty listener lists
-                    if not self.listeners[event_type]:
-                        del self.listeners[event_type]
-                    return True
+            if event_type.endswith('*'):
+                entry = (event_type[:-1], handler)
+                if entry not in self.prefix_listeners:
+                    return False
+                self.prefix_listeners = tuple(
+                    other for other in self.prefix_listeners
+                    if other != entry)
+                self.dispatch_cache = {}
+                return True
+            handlers = self.listeners.get(event_type, ())
+            if handler in handlers:
+                remaining = tuple(h for h in handlers if h != handler)
+                # Clean up empty listener lists
+                if remaining:
+                    self.listeners[event_type] = remaining
+                else:
+                    del self.listeners[event_type]
+                self.dispatch_cache = {}
+                return True
         return False
 
+    async def wait_for(self, event_type: str,
+                       predicate: Optional[Callable[[Event], bool]] = None,
+                       timeout: Optional[float] = None) -> Event:
+        """Wait in a coroutine for the next matching event.
+
+        Run it on App.spawn()'s loop (or any asyncio loop); the event
+        is still dispatched by the main loop, which resumes the
+        coroutine.
+
+        Args:
+            event_type: Event type, or a family ending in '*'
+            predicate: Only accept events for which this is true
+            timeout: Seconds to wait; None waits forever
+
+        Returns:
+            The event
+
+        Raises:
+            asyncio.TimeoutError: No matching event within timeout
+        """
+        return await wait_for_event(self, event_type, predicate, timeout)
+
+    def stream(self, event_type: str,
+               predicate: Optional[Callable[[Event], bool]] = None,
+               maxsize: int = 0) -> EventStream:
+        """Async iterator over matching events, subscribed from now on.
+
+            async with app.events.stream('fetch.*') as events:
+                async for event in events:
+                    ...
+
+        Args:
+            event_type: Event type, or a family ending in '*'
+            predicate: Only yield events for which this is true
+            maxsize: Buffer at most this many (oldest dropped); 0 for
+                     no limit
+
+        Returns:
+            An EventStream; close() it (or use async with) when done
+        """
+        return EventStream(self, event_type, predicate, maxsize)
+
     def process_events(self, max_events: int = 10,
                       max_time_ms: float = 5.0) -> int:
         """Process queued events in main thread.
 
-        Calls registered handlers for each event.
-        Limits processing to prevent UI stutter.
+        Calls registered handlers for each event, draining the lanes
+        highest priority first; a lane's budget_ms further caps the time
+        spent on it. Limits processing to prevent UI stutter.
 
         Args:
             max_events: Maximum events to process this call
@@ -146,46 +793,146 @@ class EventBus:
         start_time = time.perf_counter()
         processed = 0
 
+        for lane in self.lane_order:
+            time_left = max_time_ms - (time.perf_counter() - start_time) * 1000
+            if processed >= max_events or time_left <= 0:
+                break
+            if lane.budget_ms is not None:
+                time_left = min(time_left, lane.budget_ms)
+            processed += self._drain(lane, max_events - processed, time_left)
+
+        # Track processing time
+        self.last_process_time = (
+            (time.perf_counter() - start_time) * 1000
+        )
+
+        return processed
+
+    def process_adaptive(self, time_left_ms: float) -> int:
+        """Process events with a budget sized to the backlog.
+
+        Each lane, highest priority first, gets its own budget: up to
+        half of what is left of the frame while it is short, growing to
+        the whole remainder and then past it as it fills, so a burst (a
+        long apt log) costs a few slower frames instead of dropped
+        events. A lane's budget_ms caps its share, which keeps a flooded
+        bulk lane from taking the frame; every lane gets at least
+        min_drain_ms, so it is never starved either.
+
+        Args:
+            time_left_ms: Milliseconds left in the current frame
+
+        Returns:
+            Number of events processed
+        """
+        start_time = time.perf_counter()
+        total_budget = 0.0
+        processed = 0
+        for lane in self.lane_order:
+            depth = len(lane)
+            if not depth:
+                continue
+            spent = (time.perf_counter() - start_time) * 1000
+            fill = depth / lane.capacity
+            budget = (max(self.min_drain_ms, time_left_ms - spent)
+                      * (0.5 + fill))
+            if lane.budget_ms is not None:
+                budget = min(budget, max(self.min_drain_ms, lane.budget_ms))
+            total_budget += budget
+            processed += self._drain(lane, depth, budget)
+        self.last_drain_budget = total_budget
+        self.last_drain_count = processed
+        if processed:
+            self.last_process_time = (
+                (time.perf_counter() - start_time) * 1000
+            )
+        return processed
+
+    def _drain(self, lane: EventLane, max_events: int,
+               max_time_ms: float) -> int:
+        """Dispatch up to max_events from one lane within max_time_ms."""
+        clock = time.perf_counter
+        deadline = clock() + max_time_ms / 1000
+        pool = self.event_pool if self.pool_size else None
+        processed = 0
+
         for _ in range(max_events):
-            # Check time budget
-            elapsed_ms = (time.perf_counter() - start_time) * 1000
-            if elapsed_ms >= max_time_ms:
+            # Check time budget; the same reading times the event
+            now = clock()
+            if now >= deadline:
                 break
 
-            # Get next event (non-blocking)
-            try:
-                event = self.event_queue.get_nowait()
-            except queue.Empty:
+            event = lane.get()
+            if event is None:
                 break
 
+            if event.coalesce_key is not None:
+                # From here on a new emit queues a fresh event
+                with self.coalesce_lock:
+                    self._forget_coalesced(event)
+
+            latency = (now - event.queued_at) * 1000
+            self.latency_samples.append(latency)
+            lane.latency_samples.append(latency)
+            if latency > self.latency_max:
+                self.latency_max = latency
+
             # Dispatch to handlers
-            self._dispatch_event(event)
+            handler_count = self._dispatch_event(event)
+            tracer = self.tracer
+            if tracer is not None:
+                tracer.dispatched(event, latency, (clock() - now) * 1000,
+                                  handler_count)
             processed += 1
-            self.events_processed += 1
 
-        # Track processing time
-        self.last_process_time = (
-            (time.perf_counter() - start_time) * 1000
-        )
+            if pool is not None and len(pool) < self.pool_size:
+                event.data = None
+                pool.append(event)
 
+        lane.processed += processed
+        self.events_processed += processed
         return processed
 
-    def _dispatch_event(self, event: Dict[str, Any]) -> None:
+    def queue_size(self) -> int:
+        """Events waiting on all lanes."""
+        return sum(len(lane) for lane in self.lane_order)
+
+    def oldest_event_age(self) -> float:
+        """Milliseconds the longest-waiting queued event has waited."""
+        heads = [queued_at for queued_at in
+                 (lane.oldest_queued_at() for lane in self.lane_order)
+                 if queued_at is not None]
+        if not heads:
+            return 0.0
+        return (time.perf_counter() - min(heads)) * 1000
+
+    def _dispatch_event(self, event: Event) -> int:
         """Dispatch event to registered handlers.
 
         Handles exceptions to prevent one bad handler crashing loop.
 
         Args:
-            event: Event dict to dispatch
+            event: Event to dispatch
+
+        Returns:
+            Number of handlers called, prefix listeners included
         """
-        event_type = event['type']
+        event_type = event.type
 
-        # Get handlers (with lock for thread safety)
-        with self.listener_lock:
-            handlers = self.listeners.get(event_type, []).copy()
+        # An immutable snapshot: on()/off() swap in a new tuple
+        if self.prefix_listeners:
+            handlers = self.dispatch_cache.get(event_type)
+            if handlers is None:
+                handlers = self._merge_handlers(event_type)
+        else:
+            handlers = self.listeners.get(event_type, ())
+
+        tracer = self.tracer
+        clock = time.perf_counter
 
         # Call each handler
         for handler in handlers:
+            start = clock() if tracer is not None else 0.0
             try:
                 handler(event)
             except Exception as e:
@@ -199,27 +946,75 @@ class EventBus:
                             'error': str(e),
                             'handler': handler.__name__,
                             'event_type': event_type,
-                            'original_event': event
+                            # A copy: the event itself may be pooled
+                            'original_event': event.to_dict()
                         },
                         source='event_bus'
                     )
-
-    def get_metrics(self) -> Dict[str, Any]:
+            if tracer is not None:
+                tracer.handler(handler, (clock() - start) * 1000)
+        return len(handlers)
+
+    def _merge_handlers(self, event_type: str) -> Tuple[Callable, ...]:
+        """Exact then prefix handlers for a type, cached until the next
+        on()/off()."""
+        # Take the cache before reading the listeners: on()/off() change
+        # the listeners first, so a fresh cache never gets old handlers
+        cache = self.dispatch_cache
+        handlers = self.listeners.get(event_type, ()) + tuple(
+            handler for prefix, handler in self.prefix_listeners
+            if event_type.startswith(prefix))
+        if len(cache) < DISPATCH_CACHE_LIMIT:
+            cache[event_type] = handlers
+        return handlers
+
+    def latency_p95(self) -> float:
+        """95th percentile queue latency (ms) over the last 256 events."""
+        latency = sorted(self.latency_samples)
+        return nearest_rank(latency, 95) if latency else 0.0
+
+    def get_metrics(self, trace: bool = False) -> Dict[str, Any]:
         """Get event bus metrics.
 
+        Args:
+            trace: Include the tracer's per-type and per-handler
+                   summary under 'trace'; it grows with the number of
+                   types and handlers, so it is only built on request
+
         Returns:
-            Dict with emitted, processed, dropped counts, etc.
+            Dict with emitted, processed, dropped counts, queue latency
+            (emit to dispatch, over the last 256 events), etc.
         """
+        latency = sorted(self.latency_samples)
+        totals = self.emit_totals()
+        lanes = {}
+        for lane in self.lane_order:
+            lanes[lane.name] = lane.get_metrics()
+            lanes[lane.name]['dropped'] = totals.lane_dropped.get(
+                lane.name, 0)
         return {
-            'events_emitted': self.events_emitted,
+            'events_emitted': totals.emitted,
             'events_processed': self.events_processed,
-            'events_dropped': self.events_dropped,
+            'events_dropped': totals.dropped,
+            'events_coalesced': totals.coalesced,
+            'batch_items': totals.batch_items,
             'handler_errors': self.handler_errors,
-            'queue_size': self.event_queue.qsize(),
+            'queue_size': self.queue_size(),
             'last_process_time_ms': self.last_process_time,
+            'last_drain_budget_ms': self.last_drain_budget,
+            'last_drain_count': self.last_drain_count,
+            'oldest_event_age_ms': self.oldest_event_age(),
+            'latency_last_ms': (self.latency_samples[-1]
+                                if self.latency_samples else 0.0),
+            'latency_p50_ms': nearest_rank(latency, 50) if latency else 0.0,
+            'latency_p95_ms': nearest_rank(latency, 95) if latency else 0.0,
+            'latency_max_ms': self.latency_max,
             'listener_count': sum(
                 len(handlers) for handlers in self.listeners.values()
-            )
+            ) + len(self.prefix_listeners),
+            'lanes': lanes,
+            'trace': (self.tracer.summary()
+                      if trace and self.tracer is not None else None)
         }
 
     def clear(self) -> int:
@@ -229,12 +1024,10 @@ class EventBus:
             Number of events cleared
         """
         cleared = 0
-        while not self.event_queue.empty():
-            try:
-                self.event_queue.get_nowait()
-                cleared += 1
-            except queue.Empty:
-                break
+        with self.coalesce_lock:
+            for lane in self.lane_order:
+                cleared += lane.clear()
+            self.pending_coalesced.clear()
         return cleared
 
     def shutdown(self) -> None:
@@ -242,6 +1035,124 @@ class EventBus:
         self.clear()
         with self.listener_lock:
             self.listeners.clear()
+            self.prefix_listeners = ()
+            self.dispatch_cache = {}
+
+
+class LineBatcher:
+    """Collects items from a producer thread and emits them in batches.
+
+    A batch goes out when it reaches max_items, or max_delay seconds
+    after its first item arrived, whichever comes first, so a fast
+    stream costs one event per max_items lines and a trickle still shows
+    up promptly. flush() sends whatever is waiting; close() flushes and
+    stops the flush thread. Safe to feed from several threads.
+
+        with worker.line_batcher('job.out.lines', {'id': job}) as lines:
+            for line in proc.stdout:
+                lines.add(line.rstrip())
+
+    add() takes no lock: items go on a deque, and one long-lived flush
+    thread per batcher, started by the first item, sends each batch that
+    is still partial when its delay runs out.
+    """
+
+    def __init__(self, emit_items: Callable[[List[Any]], Any],
+                 max_items: int = 256, max_delay: float = 0.05):
+        """
+        Args:
+            emit_items: Called with each batch (a non-empty list)
+            max_items: Emit once this many items are waiting
+            max_delay: Seconds a batch may wait for more items
+        """
+        self.emit_items = emit_items
+        self.max_items = max(1, max_items)
+        self.max_delay = max_delay
+        # Producers append, flush() pops from the left: both atomic
+        self.items: deque = deque()
+        # Serializes flushes so batches keep their order
+        self.send_lock = threading.Lock()
+        # True while the flush thread has a batch deadline pending
+        self.armed = False
+        self.arm_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closing = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+        self.batches = 0
+
+    def add(self, item: Any) -> None:
+        """Queue one item."""
+        items = self.items
+        items.append(item)
+        if len(items) >= self.max_items or self.closed:
+            self.flush()
+        elif not self.armed:
+            self._arm()
+
+    def extend(self, items) -> None:
+        """Queue several items."""
+        self.items.extend(items)
+        if len(self.items) >= self.max_items or self.closed:
+            self.flush()
+        elif not self.armed and self.items:
+            self._arm()
+
+    def flush(self) -> int:
+        """Emit whatever is waiting now. Returns the number of items."""
+        with self.send_lock:
+            items = self.items
+            popleft = items.popleft
+            # Items added meanwhile stay for the next batch
+            batch = [popleft() for _ in range(len(items))]
+            if batch:
+                self.batches += 1
+                self.emit_items(batch)
+        return len(batch)
+
+    def close(self) -> int:
+        """Flush and stop; later items are emitted immediately."""
+        with self.arm_lock:
+            self.closed = True
+        self.closing.set()
+        self.wakeup.set()
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        return self.flush()
+
+    def __enter__(self) -> 'LineBatcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _arm(self) -> None:
+        """Start a batch deadline on the flush thread."""
+        with self.arm_lock:
+            if self.closed:
+                return
+            self.armed = True
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._flush_loop, daemon=True,
+                    name="LineBatcher")
+                self.thread.start()
+        self.wakeup.set()
+
+    def _flush_loop(self) -> None:
+        """Flush thread: wait for a first item, give the batch max_delay
+        to fill, send what is there, repeat."""
+        while not self.closing.is_set():
+            self.wakeup.wait()
+            self.wakeup.clear()
+            if self.closing.wait(self.max_delay):
+                break
+            self.flush()
+            self.armed = False
+            # An item added while armed was True did not re-arm
+            if self.items:
+                self._arm()
 
 
 class BaseWorker(threading.Thread):
@@ -268,7 +1179,8 @@ class BaseWorker(threading.Thread):
         self.is_running = False
         self.error = None
 
-    def emit(self, event_type: str, data: Optional[Dict[str, Any]] = None
+    def emit(self, event_type: str, data: Optional[Dict[str, Any]] = None,
+             coalesce_key: Any = None
              ) -> bool:
         """Emit event from worker thread.
 
@@ -277,6 +1189,8 @@ class BaseWorker(threading.Thread):
         Args:
             event_type: Event identifier
             data: Event payload
+            coalesce_key: Replace a pending event with the same key
+                          (progress updates, see EventBus.emit)
 
         Returns:
             True if queued, False if dropped
@@ -284,7 +1198,41 @@ class BaseWorker(threading.Thread):
         if data is None:
             data = {}
         return self.app.emit(event_type, data,
-                             source=f"worker.{self.worker_name}")
+                             source=f"worker.{self.worker_name}",
+                             coalesce_key=coalesce_key)
+
+    def emit_many(self, event_type: str, items,
+                  data: Optional[Dict[str, Any]] = None) -> bool:
+        """Emit many items as one event (see EventBus.emit_batch).
+
+        Args:
+            event_type: Event identifier
+            items: Payload items; the handler gets them in data['items']
+            data: Fields shared by the whole batch
+
+        Returns:
+            True if queued, False if dropped or empty
+        """
+        return self.app.emit_batch(event_type, items,
+                                   source=f"worker.{self.worker_name}",
+                                   data=data)
+
+    def line_batcher(self, event_type: str,
+                     data: Optional[Dict[str, Any]] = None,
+                     max_items: int = 256,
+                     max_delay: float = 0.05) -> 'LineBatcher':
+        """LineBatcher that emits batches of event_type from this worker.
+
+        Args:
+            event_type: Event identifier for each batch
+            data: Fields sent with every batch
+            max_items: Emit once this many items are waiting
+            max_delay: Emit at most this many seconds after a batch's
+                       first item
+        """
+        return LineBatcher(
+            lambda items: self.emit_many(event_type, items, data),
+            max_items=max_items, max_delay=max_delay)
 
     def run(self) -> None:
         """Thread entry point.
@@ -0,0 +1,198 @@
+"""
+Event tracing for the DeskApp EventBus.
+
+With tracing on (EventBus.enable_tracing), the bus reports every
+dispatch, handler call and drop to an EventTracer, which keeps:
+
+- the last N events in a ring buffer, with their queue latency and
+  dispatch time
+- per event type: count, drops, and histograms of emit-to-dispatch
+  latency and of total handler time
+- per handler: a histogram of its execution time
+
+Histograms use fixed log-spaced buckets, so recording is a bisect and
+an increment whatever the traffic. A flooded queue shows up as high
+latency with cheap handlers; a slow handler as high handler time.
+deskapp.mods.EventViewer displays the summaries live;
+EventBus.get_metrics(trace=True) returns them.
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Bucket upper bounds in ms; the last bucket is everything above.
+BUCKET_BOUNDS_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0,
+                    10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+
+class Histogram:
+    """Counts of millisecond samples in log-spaced buckets."""
+
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile,
+        capped at the largest sample seen."""
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-pct * self.count // 100))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return min(BUCKET_BOUNDS_MS[index], self.max)
+                break
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max,
+            'total_ms': self.total,
+            'buckets': list(self.buckets),
+        }
+
+
+class TypeStats:
+    """Aggregates for one event type."""
+
+    __slots__ = ('latency', 'handler_time', 'dropped')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.handler_time = Histogram()
+        self.dropped = 0
+
+
+def handler_name(handler: Callable) -> str:
+    """Readable name for a handler: 'APT.OnCmdLines', 'setup.<lambda>'."""
+    return getattr(handler, '__qualname__', None) or repr(handler)
+
+
+class EventTracer:
+    """Ring buffer of recent events plus per-type and per-handler
+    histograms. Dispatch-side calls come from the main thread; drops
+    may be reported from any thread."""
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Events kept in the ring buffer
+        """
+        self.capacity = capacity
+        # (perf_counter at dispatch, type, source, lane, latency ms,
+        #  dispatch ms, handler count) or a 'dropped' entry, see drop()
+        self.ring: deque = deque(maxlen=capacity)
+        self.types: Dict[str, TypeStats] = {}
+        self.handlers: Dict[str, Histogram] = {}
+        self.drop_lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def type_stats(self, event_type: str) -> TypeStats:
+        stats = self.types.get(event_type)
+        if stats is None:
+            stats = self.types.setdefault(event_type, TypeStats())
+        return stats
+
+    def handler(self, handler: Callable, ms: float) -> None:
+        """One handler call took ms."""
+        name = handler_name(handler)
+        histogram = self.handlers.get(name)
+        if histogram is None:
+            histogram = self.handlers[name] = Histogram()
+        histogram.add(ms)
+
+    def dispatched(self, event, latency_ms: float, dispatch_ms: float,
+                   handler_count: int) -> None:
+        """An event went through all its handlers."""
+        stats = self.type_stats(event.type)
+        stats.latency.add(latency_ms)
+        stats.handler_time.add(dispatch_ms)
+        self.ring.append((time.perf_counter(), event.type, event.source,
+                          event.lane, latency_ms, dispatch_ms,
+                          handler_count))
+
+    def dropped(self, event_type: str, source: str, lane: str) -> None:
+        """An event was refused or evicted by a full lane."""
+        with self.drop_lock:
+            self.type_stats(event_type).dropped += 1
+        self.ring.append((time.perf_counter(), event_type, source, lane,
+                          None, None, 'dropped'))
+
+    def recent(self, count: Optional[int] = None) -> List[Tuple]:
+        """Newest ring entries last; all of them when count is None."""
+        entries = list(self.ring)
+        return entries if count is None else entries[-count:]
+
+    def hottest_types(self, sort_by: str = 'total_ms'
+                      ) -> List[Tuple[str, Dict[str, Any]]]:
+        """(type, summary) pairs, largest sort_by first.
+
+        sort_by is a key of summary(): 'total_ms' (handler time spent),
+        'count', 'dropped' or 'latency_p95_ms'.
+        """
+        rows = list(self.summary()['types'].items())
+        rows.sort(key=lambda row: row[1][sort_by], reverse=True)
+        return rows
+
+    def slowest_handlers(self, sort_by: str = 'p95_ms'
+                         ) -> List[Tuple[str, Dict[str, Any]]]:
+        """(handler name, histogram summary) pairs, slowest first."""
+        rows = [(name, histogram.summary())
+                for name, histogram in list(self.handlers.items())]
+        rows.sort(key=lambda row: row[1][sort_by], reverse=True)
+        return rows
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-type and per-handler aggregates, for get_metrics(trace=True)."""
+        types = {}
+        for event_type, stats in list(self.types.items()):
+            latency = stats.latency.summary()
+            handler_time = stats.handler_time.summary()
+            types[event_type] = {
+                'count': latency['count'],
+                'dropped': stats.dropped,
+                'total_ms': handler_time['total_ms'],
+                'latency_p50_ms': latency['p50_ms'],
+                'latency_p95_ms': latency['p95_ms'],
+                'latency_max_ms': latency['max_ms'],
+                'handler_p95_ms': handler_time['p95_ms'],
+                'handler_max_ms': handler_time['max_ms'],
+                'latency': latency,
+                'handler_time': handler_time,
+            }
+        return {
+            'capacity': self.capacity,
+            'recorded': len(self.ring),
+            'seconds': time.perf_counter() - self.started,
+            'types': types,
+            'handlers': {name: histogram.summary() for name, histogram
+                         in list(self.handlers.items())},
+        }
+
+    def reset(self) -> None:
+        self.ring.clear()
+        self.types = {}
+        self.handlers = {}
+        self.started = time.perf_counter()
@@ -0,0 +1,396 @@
+"""
+DeskApp Frame Buffer
+In-memory cell grid renderer that sits under Curse.
+
+Panels draw into CellWindow objects (same calls modules already use on
+curses windows: addstr, erase, box, getmaxyx ...). Each frame the
+visible panels are composed bottom-to-top into a FrameBuffer which
+records (char, attr) per cell, diffs it against the previous frame and
+returns only the changed runs. Curse writes those runs to the terminal;
+the headless front end keeps them in memory.
+
+Pieces:
+- CellWindow: curses-window look-alike backed by per-row lists
+- CellPanel / PanelStack: z-ordered stand-in for curses.panel
+- FrameBuffer: double-buffered composed screen with run diffing
+"""
+
+import curses
+import weakref
+from typing import List, Tuple
+
+# Box drawing used by CellWindow.box()
+BOX_H  = "─"
+BOX_V  = "│"
+BOX_TL = "┌"
+BOX_TR = "┐"
+BOX_BL = "└"
+BOX_BR = "┘"
+
+# A changed run: (row, col, text, attr)
+Run = Tuple[int, int, str, int]
+
+
+class CellWindow:
+    """In-memory window with the curses window calls DeskApp uses.
+
+    Writes follow curses rules closely enough for module code: text
+    wraps at the right edge and writing past the last cell raises
+    curses.error after drawing what fits.
+    """
+
+    def __init__(self, nlines: int, ncols: int, begin_y: int = 0,
+                 begin_x: int = 0):
+        self.h = max(1, nlines)
+        self.w = max(1, ncols)
+        self.y = begin_y
+        self.x = begin_x
+        self.cur_y = 0
+        self.cur_x = 0
+        self.scroll = False
+        self.chars = [[" "] * self.w for _ in range(self.h)]
+        self.attrs = [[0] * self.w for _ in range(self.h)]
+        # Set on any change; cleared by the frame buffer after compose
+        self.dirty = True
+
+    # -------------------------------------------------------------- #
+    # Drawing                                                          #
+    # -------------------------------------------------------------- #
+
+    def addstr(self, *args) -> None:
+        """addstr([y, x,] text[, attr])"""
+        if len(args) >= 3:
+            y, x, text = args[0], args[1], args[2]
+            attr = args[3] if len(args) > 3 else 0
+        else:
+            y, x = self.cur_y, self.cur_x
+            text = args[0]
+            attr = args[1] if len(args) > 1 else 0
+        self.put(int(y), int(x), str(text), attr)
+
+    def addnstr(self, *args) -> None:
+        """addnstr([y, x,] text, n[, attr])"""
+        if len(args) >= 4:
+            y, x, text, n = args[0], args[1], args[2], args[3]
+            attr = args[4] if len(args) > 4 else 0
+        else:
+            y, x = self.cur_y, self.cur_x
+            text, n = args[0], args[1]
+            attr = args[2] if len(args) > 2 else 0
+        self.put(int(y), int(x), str(text)[:max(0, n)], attr)
+
+    def addch(self, *args) -> None:
+        """addch([y, x,] ch[, attr])"""
+        if len(args) >= 3:
+            y, x, ch = args[0], args[1], args[2]
+            attr = args[3] if len(args) > 3 else 0
+        else:
+            y, x = self.cur_y, self.cur_x
+            ch = args[0]
+            attr = args[1] if len(args) > 1 else 0
+        if isinstance(ch, int):
+            ch = chr(ch & 0xFF)
+        self.put(int(y), int(x), ch[:1], attr)
+
+    def put(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        """Write text at (y, x), wrapping like curses addstr."""
+        if y < 0 or y >= self.h or x < 0 or x >= self.w:
+            raise curses.error("addstr() returned ERR")
+        attr = int(attr)
+        self.dirty = True
+        w = self.w
+        pos = 0
+        n = len(text)
+        while pos < n:
+            room = w - x
+            chunk = text[pos:pos + room]
+            end = x + len(chunk)
+            self.chars[y][x:end] = chunk
+            self.attrs[y][x:end] = [attr] * len(chunk)
+            pos += len(chunk)
+            x = end
+            if x >= w:
+                if y + 1 >= self.h:
+                    self.cur_y, self.cur_x = y, w - 1
+                    if pos < n or not self.scroll:
+                        # curses cannot move the cursor past the
+                        # bottom-right corner; it reports ERR.
+                        raise curses.error("addstr() returned ERR")
+                    return
+                y += 1
+                x = 0
+        self.cur_y, self.cur_x = y, x
+
+    def erase(self) -> None:
+        blank = [" "] * self.w
+        zero = [0] * self.w
+        for row in range(self.h):
+            self.chars[row][:] = blank
+            self.attrs[row][:] = zero
+        self.cur_y = self.cur_x = 0
+        self.dirty = True
+
+    def clear(self) -> None:
+        self.erase()
+
+    def box(self, *args) -> None:
+        h, w = self.h, self.w
+        if h < 2 or w < 2:
+            return
+        top = [BOX_TL] + [BOX_H] * (w - 2) + [BOX_TR]
+        bottom = [BOX_BL] + [BOX_H] * (w - 2) + [BOX_BR]
+        self.chars[0][:] = top
+        self.chars[h - 1][:] = bottom
+        self.attrs[0][:] = [0] * w
+        self.attrs[h - 1][:] = [0] * w
+        for row in range(1, h - 1):
+            self.chars[row][0] = BOX_V
+            self.chars[row][w - 1] = BOX_V
+            self.attrs[row][0] = 0
+            self.attrs[row][w - 1] = 0
+        self.dirty = True
+
+    # -------------------------------------------------------------- #
+    # Geometry                                                         #
+    # -------------------------------------------------------------- #
+
+    def getmaxyx(self) -> Tuple[int, int]:
+        return self.h, self.w
+
+    def getbegyx(self) -> Tuple[int, int]:
+        return self.y, self.x
+
+    def getyx(self) -> Tuple[int, int]:
+        return self.cur_y, self.cur_x
+
+    def move(self, y: int, x: int) -> None:
+        self.cur_y, self.cur_x = y, x
+
+    def resize(self, nlines: int, ncols: int) -> None:
+        """Resize in place, keeping overlapping content."""
+        nlines = max(1, nlines)
+        ncols = max(1, ncols)
+        chars = [[" "] * ncols for _ in range(nlines)]
+        attrs = [[0] * ncols for _ in range(nlines)]
+        keep_w = min(ncols, self.w)
+        for row in range(min(nlines, self.h)):
+            chars[row][:keep_w] = self.chars[row][:keep_w]
+            attrs[row][:keep_w] = self.attrs[row][:keep_w]
+        self.chars, self.attrs = chars, attrs
+        self.h, self.w = nlines, ncols
+        self.dirty = True
+
+    def mvwin(self, y: int, x: int) -> None:
+        self.y, self.x = y, x
+        self.dirty = True
+
+    # -------------------------------------------------------------- #
+    # curses no-ops                                                    #
+    # -------------------------------------------------------------- #
+
+    def scrollok(self, flag) -> None:
+        self.scroll = bool(flag)
+
+    def refresh(self, *args) -> None:
+        return None
+
+    def noutrefresh(self, *args) -> None:
+        return None
+
+    def touchwin(self) -> None:
+        self.dirty = True
+
+    def keypad(self, flag) -> None:
+        return None
+
+    def nodelay(self, flag) -> None:
+        return None
+
+    # -------------------------------------------------------------- #
+    # Inspection                                                       #
+    # -------------------------------------------------------------- #
+
+    def text(self) -> List[str]:
+        """Return the window content as a list of strings."""
+        return ["".join(row) for row in self.chars]
+
+
+class CellPanel:
+    """Stand-in for a curses.panel object."""
+
+    def __init__(self, stack: "PanelStack", win: CellWindow):
+        self.stack = stack
+        self.win = win
+        self.is_hidden = False
+
+    def show(self) -> None:
+        # Like show_panel(), showing also raises to the top
+        self.is_hidden = False
+        self.top()
+
+    def hide(self) -> None:
+        self.is_hidden = True
+
+    def hidden(self) -> bool:
+        return self.is_hidden
+
+    def top(self) -> None:
+        self.stack.raise_panel(self)
+
+    def bottom(self) -> None:
+        self.stack.lower_panel(self)
+
+    def move(self, y: int, x: int) -> None:
+        self.win.mvwin(y, x)
+
+    def window(self) -> CellWindow:
+        return self.win
+
+    def replace(self, win: CellWindow) -> None:
+        self.win = win
+        win.dirty = True
+
+
+class PanelStack:
+    """Z-ordered CellPanels, bottom first.
+
+    Holds weak references so a panel dropped by its owner leaves the
+    stack, the same way curses deletes a panel object on collection.
+    """
+
+    def __init__(self):
+        self.refs: List[weakref.ref] = []
+
+    @property
+    def panels(self) -> List[CellPanel]:
+        live = [ref() for ref in self.refs]
+        if None in live:
+            self.refs = [ref for ref in self.refs if ref() is not None]
+            live = [p for p in live if p is not None]
+        return live
+
+    def new_panel(self, win: CellWindow) -> CellPanel:
+        panel = CellPanel(self, win)
+        self.refs.append(weakref.ref(panel))
+        return panel
+
+    def raise_panel(self, panel: CellPanel) -> None:
+        if self.refs and self.refs[-1]() is panel:
+            return
+        self.remove(panel)
+        self.refs.append(weakref.ref(panel))
+
+    def lower_panel(self, panel: CellPanel) -> None:
+        if self.refs and self.refs[0]() is panel:
+            return
+        self.remove(panel)
+        self.refs.insert(0, weakref.ref(panel))
+
+    def remove(self, panel: CellPanel) -> None:
+        self.refs = [ref for ref in self.refs
+                     if ref() is not panel and ref() is not None]
+
+    def visible(self) -> List[CellPanel]:
+        return [p for p in self.panels if not p.is_hidden]
+
+
+class FrameBuffer:
+    """Double-buffered (char, attr) grid of the composed screen.
+
+    compose() paints the visible panels into the back buffer, diff()
+    returns the runs that differ from the front buffer (what is on the
+    terminal) and promotes the back buffer to the front.
+    """
+
+    def __init__(self, h: int, w: int):
+        self.resize(h, w)
+
+    def resize(self, h: int, w: int) -> None:
+        """Resize both buffers; the next diff repaints everything."""
+        self.h = max(1, h)
+        self.w = max(1, w)
+        self.back_chars = [[" "] * self.w for _ in range(self.h)]
+        self.back_attrs = [[0] * self.w for _ in range(self.h)]
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Forget what is on screen so the next diff is a full frame."""
+        self.front_chars = [[None] * self.w for _ in range(self.h)]
+        self.front_attrs = [[None] * self.w for _ in range(self.h)]
+        self.needs_compose = True
+        # Weak refs to the panels in the last composed frame
+        self.last_order: List[weakref.ref] = []
+
+    def compose(self, stack: PanelStack) -> bool:
+        """Paint visible panels bottom-to-top into the back buffer.
+
+        Returns:
+            False if nothing changed since the last compose
+        """
+        panels = stack.visible()
+        last = [ref() for ref in self.last_order]
+        if not (self.needs_compose or panels != last or
+                any(p.win.dirty for p in panels)):
+            return False
+        blank = [" "] * self.w
+        zero = [0] * self.w
+        for row in range(self.h):
+            self.back_chars[row][:] = blank
+            self.back_attrs[row][:] = zero
+        for panel in panels:
+            self.blit(panel.win)
+        for panel in stack.panels:
+            panel.win.dirty = False
+        self.last_order = [weakref.ref(p) for p in panels]
+        self.needs_compose = False
+        return True
+
+    def blit(self, win: CellWindow) -> None:
+        """Copy a window into the back buffer, clipped to the screen."""
+        col0 = max(0, win.x)
+        col1 = min(self.w, win.x + win.w)
+        if col1 <= col0:
+            return
+        src0 = col0 - win.x
+        src1 = src0 + (col1 - col0)
+        for row in range(win.h):
+            y = win.y + row
+            if y < 0:
+                continue
+            if y >= self.h:
+                break
+            self.back_chars[y][col0:col1] = win.chars[row][src0:src1]
+            self.back_attrs[y][col0:col1] = win.attrs[row][src0:src1]
+
+    def diff(self) -> List[Run]:
+        """Return changed runs and make the back buffer current.
+
+        A run is a maximal stretch of changed cells on one row that
+        share an attribute.
+        """
+        runs: List[Run] = []
+        for y in range(self.h):
+            bc, ba = self.back_chars[y], self.back_attrs[y]
+            fc, fa = self.front_chars[y], self.front_attrs[y]
+            if bc == fc and ba == fa:
+                continue
+            x = 0
+            w = self.w
+            while x < w:
+                if bc[x] == fc[x] and ba[x] == fa[x]:
+                    x += 1
+                    continue
+                start = x
+                attr = ba[x]
+                x += 1
+                while x < w and ba[x] == attr and (
+                        bc[x] != fc[x] or ba[x] != fa[x]):
+                    x += 1
+                runs.append((y, start, "".join(bc[start:x]), attr))
+            fc[:] = bc
+            fa[:] = ba
+        return runs
+
+    def text(self) -> List[str]:
+        """Return the last composed frame as strings."""
+        return ["".join(row) for row in self.back_chars]
@@ -0,0 +1,241 @@
+"""
+Headless front end for DeskApp.
+
+HeadlessCurse stands in for Curse without touching a terminal: panels
+are CellWindows composed into an in-memory FrameBuffer, input comes
+from a script fed by the caller, and snapshot() returns the screen as
+text. Used for tests, CI and benchmarks:
+
+    app = App(modules=[MyMod], headless=True, autostart=False)
+    app.front.feed_keys(Keys.PG_DOWN, "q")
+    app.start()
+    print(app.front.snapshot())
+"""
+
+import curses
+import time
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+from deskapp import Keys
+from deskapp.src.curse import Curse
+from deskapp.src.framebuffer import CellWindow
+
+
+def color_pair(number: int) -> int:
+    """Attribute bits for a color pair, as curses.color_pair() returns."""
+    return number << 8
+
+
+class HeadlessCurse(Curse):
+    """Curse without a TTY: in-memory screen, scripted input."""
+
+    def __init__(self, h: int = 24, w: int = 80, use_mouse=False,
+                 use_focus=False, frame_buffer=True, event_driven=False,
+                 realtime=False, escape_timeout=0):
+        """
+        Args:
+            h: Screen height in rows
+            w: Screen width in columns
+            use_mouse: Report fed mouse clicks to the app
+            use_focus: Report focus keys to the app
+            frame_buffer: Accepted for parity with Curse; the headless
+                          screen is always a frame buffer
+            event_driven: Accepted for parity with Curse
+            realtime: Honor frame timeouts in wait_for_input(); by
+                      default frames run back to back
+            escape_timeout: Wait for the rest of an escape sequence;
+                            only matters when realtime
+        """
+        self.setup_state(use_mouse, use_focus, True, event_driven)
+        self.realtime = realtime
+        self.setup_color()
+        self.escape_timeout = escape_timeout
+        h, w = max(1, h), max(1, w)
+        self.screen = CellWindow(h, w, 0, 0)
+        self.frames = 0
+        self.inputs = deque()
+        self.pending_click = None
+        self.pending_size = None
+        self.setup_frame(h, w, watch_terminal=False)
+
+    def setup_color(self):
+        """Same color names as Curse, backed by plain attribute bits."""
+        self.color_white = color_pair(1)
+        self.color_black = color_pair(11)
+        self.color_magenta = color_pair(2)
+        self.color_green = color_pair(3)
+        self.chess_black = color_pair(4)
+        self.chess_white = color_pair(5)
+        self.color_cyan = color_pair(6)
+        self.color_yellow = color_pair(7)
+        self.color_red = color_pair(8)
+        self.color_blue = color_pair(9)
+        self.color_select = color_pair(10)
+
+        self.color_bold = curses.A_BOLD
+        self.color_blink = curses.A_BLINK
+        self.color_error = self.color_bold | self.color_blink | self.color_red
+        self.palette = [color_pair(i) for i in range(8)]
+
+    # -------------------------------------------------------------- #
+    # scripted input                                                   #
+    # -------------------------------------------------------------- #
+
+    def feed_keys(self, *keys) -> None:
+        """Queue key presses; a frame drains everything queued before it.
+
+        Use feed_idle() between keys to spread them over frames.
+
+        Args:
+            keys: Key codes (ints or Keys members) or strings, which are
+                  queued one character at a time
+        """
+        for key in keys:
+            if isinstance(key, str):
+                self.inputs.extend(ord(char) for char in key)
+            else:
+                self.inputs.append(int(key))
+        self.wake()
+
+    def feed_text(self, text: str, submit: bool = True) -> None:
+        """Type text into the footer: TAB, the text, then ENTER."""
+        self.feed_keys(Keys.TAB, text)
+        if submit:
+            self.feed_keys(Keys.ENTER)
+
+    def feed_paste(self, text: str) -> None:
+        """Queue text as a terminal would send a bracketed paste."""
+        self.inputs.append(Keys.ESC)
+        self.inputs.extend(b"[200~")
+        self.inputs.extend(text.encode('utf-8'))
+        self.inputs.extend(b"\x1b[201~")
+        self.wake()
+
+    def feed_mouse(self, x: int, y: int,
+                   button: int = curses.BUTTON1_CLICKED) -> None:
+        """Queue a mouse event at screen column x, row y."""
+        self.inputs.append(('mouse', (x, y), button))
+        self.wake()
+
+    def feed_resize(self, h: int, w: int) -> None:
+        """Queue a terminal resize to h rows by w columns."""
+        self.inputs.append(('resize', h, w))
+        self.wake()
+
+    def feed_idle(self, frames: int = 1) -> None:
+        """Queue frames that see no input."""
+        self.inputs.extend([-1] * frames)
+
+    def feed_call(self, func: Callable[[], None]) -> None:
+        """Queue a callable, run when its turn comes (e.g. app.close)."""
+        self.inputs.append(func)
+        self.wake()
+
+    def pending_input(self) -> int:
+        """Number of scripted entries not yet delivered."""
+        return len(self.inputs)
+
+    def read_key(self):
+        if not self.inputs:
+            return -1
+        entry = self.inputs.popleft()
+        if isinstance(entry, int):
+            if self.recorder is not None and entry != -1:
+                self.recorder.key(entry)
+            return entry
+        if callable(entry):
+            entry()
+            return -1
+        if entry[0] == 'mouse':
+            self.pending_click = (entry[1], entry[2])
+            if self.recorder is not None:
+                self.recorder.mouse(entry[1][0], entry[1][1], entry[2])
+            return curses.KEY_MOUSE
+        if entry[0] == 'resize':
+            self.pending_size = (entry[1], entry[2])
+            self.apply_terminal_size()
+            return Keys.RESIZE
+        return -1
+
+    def read_escape_key(self, wait=True):
+        """Next queued key of a sequence; frame boundaries end it."""
+        entry = self.inputs[0] if self.inputs else -1
+        if isinstance(entry, int) and entry != -1:
+            return self.read_key()
+        return -1
+
+    def unget_key(self, key):
+        if self.recorder is not None:
+            self.recorder.unget(key)
+        self.inputs.appendleft(key)
+
+    def set_terminal_mode(self, mode, enabled):
+        return
+
+    def get_click(self):
+        click, self.pending_click = self.pending_click, None
+        if click is None:
+            raise curses.error("no mouse event")
+        return click
+
+    def apply_terminal_size(self):
+        if self.pending_size is None:
+            return
+        self.h, self.w = (max(1, n) for n in self.pending_size)
+        self.pending_size = None
+
+    def resized(self):
+        self.screen.resize(self.h, self.w)
+        self.frame.resize(self.h, self.w)
+        self.has_resized_happened = True
+
+    def wait_for_input(self, timeout=None):
+        """Return at once unless realtime; scripted input never waits."""
+        if self.inputs:
+            return True
+        if not self.realtime:
+            return False
+        return super().wait_for_input(timeout)
+
+    # -------------------------------------------------------------- #
+    # output                                                           #
+    # -------------------------------------------------------------- #
+
+    def present(self):
+        """Compose visible panels into the in-memory screen."""
+        self.frames += 1
+        clock = time.perf_counter
+        start = clock()
+        if not self.frame.compose(self.stack):
+            self._record_present('compose', start, clock())
+            return
+        mid = clock()
+        # Promote the frame; the runs are what a terminal would receive.
+        self.frame.diff()
+        self._record_present('compose', start, mid, clock())
+
+    def snapshot(self, lines: bool = False):
+        """Return the screen as of the last present().
+
+        Args:
+            lines: Return a list of rows instead of one string
+        """
+        rows = self.frame.text()
+        if lines:
+            return rows
+        return "\n".join(rows)
+
+    def find(self, text: str) -> Optional[Tuple[int, int]]:
+        """Return (row, col) of the first occurrence of text, or None."""
+        for row, line in enumerate(self.frame.text()):
+            col = line.find(text)
+            if col >= 0:
+                return row, col
+        return None
+
+    def splash_screen(self):
+        return
+
+    def end_safely(self):
+        self.close_wakeups()
@@ -20,6 +20,7 @@ class Keys(enum.IntEnum):
     HOME  = 262
     END   = 360
     ESC   = 27
+    DELETE = 330
     Q = 113
     q = 81
     W = 119
@@ -97,4 +98,8 @@ class Keys(enum.IntEnum):
     # SIGNALS
     RESIZE = 410
     FOCUS = 589
-    LOST_FOCUS = 588
\ No newline at end of file
+    LOST_FOCUS = 588
+    # Synthetic: a bracketed paste was read whole (see Curse.read_paste).
+    PASTE = 0x10000
+    # Flag: ALT | key is Alt+key (see deskapp.src.escapes.alt).
+    ALT = 0x20000
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Line editor behind the footer's key_mode input.
+
+LineEditor keeps the text as a list of characters with a cursor, so
+typing, inserting and deleting cost the size of the edit rather than
+the size of the line. Every change bumps `version`; the footer uses it
+as its damage key and only repaints when the line actually changed.
+
+Wrapping is by character at a fixed width, which makes any screen row
+computable on its own: the footer renders only the rows around the
+cursor, however long the line gets.
+"""
+
+from typing import List, Optional, Tuple
+
+
+class LineEditor:
+    """Editable single line with a cursor and submit history."""
+
+    def __init__(self, history_size: int = 100):
+        """
+        Args:
+            history_size: Submitted lines remembered for UP/DOWN recall
+        """
+        self.chars: List[str] = []
+        self.cursor = 0
+        self.version = 0
+        self.history: List[str] = []
+        self.history_size = history_size
+        # Position while browsing history; None when editing a draft.
+        self.history_index: Optional[int] = None
+        self.draft = ""
+        self._text = ""
+        self._text_version = 0
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    @property
+    def text(self) -> str:
+        """The line as a string; joined at most once per change."""
+        if self._text_version != self.version:
+            self._text = "".join(self.chars)
+            self._text_version = self.version
+        return self._text
+
+    def set_text(self, text: str) -> None:
+        """Replace the line and put the cursor at its end."""
+        self.chars = list(text)
+        self.cursor = len(self.chars)
+        self.version += 1
+
+    def clear(self) -> None:
+        """Empty the line and leave history browsing."""
+        self.set_text("")
+        self.history_index = None
+
+    # -------------------------------------------------------------- #
+    # editing                                                          #
+    # -------------------------------------------------------------- #
+
+    def insert(self, text: str) -> None:
+        """Insert text at the cursor and move past it."""
+        if not text:
+            return
+        cursor = self.cursor
+        if cursor == len(self.chars):
+            self.chars.extend(text)
+        else:
+            self.chars[cursor:cursor] = text
+        self.cursor += len(text)
+        self.version += 1
+
+    def backspace(self) -> bool:
+        """Delete the character before the cursor."""
+        if self.cursor == 0:
+            return False
+        self.cursor -= 1
+        del self.chars[self.cursor]
+        self.version += 1
+        return True
+
+    def delete(self) -> bool:
+        """Delete the character under the cursor."""
+        if self.cursor >= len(self.chars):
+            return False
+        del self.chars[self.cursor]
+        self.version += 1
+        return True
+
+    def move(self, offset: int) -> None:
+        """Move the cursor by offset characters, clamped to the line."""
+        self.move_to(self.cursor + offset)
+
+    def move_to(self, position: int) -> None:
+        """Put the cursor at position, clamped to the line."""
+        position = max(0, min(position, len(self.chars)))
+        if position != self.cursor:
+            self.cursor = position
+            self.version += 1
+
+    def home(self) -> None:
+        self.move_to(0)
+
+    def end(self) -> None:
+        self.move_to(len(self.chars))
+
+    # -------------------------------------------------------------- #
+    # history                                                          #
+    # -------------------------------------------------------------- #
+
+    def submit(self) -> str:
+        """Return the line, record it in history and clear the editor."""
+        text = self.text
+        if text and (not self.history or self.history[-1] != text):
+            self.history.append(text)
+            if len(self.history) > self.history_size:
+                del self.history[0]
+        self.clear()
+        return text
+
+    def history_prev(self) -> bool:
+        """Recall the previous history entry (UP)."""
+        if not self.history:
+            return False
+        if self.history_index is None:
+            self.draft = self.text
+            self.history_index = len(self.history)
+        if self.history_index == 0:
+            return False
+        self.history_index -= 1
+        self.set_text(self.history[self.history_index])
+        return True
+
+    def history_next(self) -> bool:
+        """Step forward in history, back to the draft at the end (DOWN)."""
+        if self.history_index is None:
+            return False
+        self.history_index += 1
+        if self.history_index >= len(self.history):
+            self.history_index = None
+            self.set_text(self.draft)
+        else:
+            self.set_text(self.history[self.history_index])
+        return True
+
+    # -------------------------------------------------------------- #
+    # wrapping                                                         #
+    # -------------------------------------------------------------- #
+
+    def row_count(self, width: int, prefix: str = "") -> int:
+        """Rows the prefixed line needs at width, with a cell for the
+        cursor after the last character."""
+        if width <= 0:
+            return 0
+        cells = len(prefix) + len(self.chars) + 1
+        return (cells + width - 1) // width
+
+    def cursor_cell(self, width: int, prefix: str = "") -> Tuple[int, int]:
+        """(row, col) of the cursor in the wrapped, prefixed line."""
+        return divmod(len(prefix) + self.cursor, max(1, width))
+
+    def row(self, index: int, width: int, prefix: str = "") -> str:
+        """Text of one wrapped row, built without joining the line."""
+        start = index * width
+        stop = start + width
+        lead = len(prefix)
+        head = prefix[start:stop] if start < lead else ""
+        body = self.chars[max(0, start - lead):max(0, stop - lead)]
+        return head + "".join(body)
+
+    def visible_rows(self, width: int, max_rows: int,
+                     prefix: str = "") -> Tuple[int, List[str]]:
+        """Rows to show in a window of max_rows, keeping the cursor in
+        view. Returns (index of the first row, row texts)."""
+        rows = self.row_count(width, prefix)
+        shown = min(rows, max_rows)
+        cursor_row = self.cursor_cell(width, prefix)[0]
+        top = max(0, min(cursor_row - shown + 1, rows - shown))
+        return top, [self.row(i, width, prefix)
+                     for i in range(top, top + shown)]
@@ -1,4 +1,4 @@
-from deskapp import SubClass, Keys, callbacks, callback
+from deskapp import SubClass, Keys, callback
 
 class Logic(SubClass):
     def __init__(self, app):
@@ -22,8 +22,23 @@ class Logic(SubClass):
         mod = self.current_mod()
         mod.string_decider(input_string)
 
-    def decider(self, keypress):
-        """Callback decider system."""
+    def coalesces(self, keypress):
+        """True if the current module's binding for a key coalesces."""
+        if not isinstance(keypress, int) or keypress <= 0:
+            return False
+        if not self.available_panels:
+            return False
+        binding = self.app.callbacks.lookup(
+            self.current_mod().class_id, keypress
+        )
+        return binding is not None and binding['coalesce']
+
+    def decider(self, keypress, repeat=1):
+        """Callback decider system.
+
+        repeat > 1 delivers a burst of the same key: one call with
+        repeat=n for coalescing bindings, otherwise n calls.
+        """
         # Do we have a good keypress?
         if isinstance(keypress, int):
             if 0 >= keypress: return
@@ -35,22 +50,25 @@ class Logic(SubClass):
         mod_panel = cur_mod[1]
 
         if isinstance(keypress, str):
-            mod_class.string_decider(self.front.key_buffer)
-            self.front.key_buffer = ""
+            mod_class.string_decider(keypress)
 
         elif isinstance(keypress, tuple):
             mod_class.mouse_decider(keypress)
 
         elif isinstance(keypress, int):
             try:
-                global callbacks
-                all_calls_for_button = list(filter(lambda callback: callback['key'] in [int(keypress)], callbacks))
-                if not all_calls_for_button:
+                # module binding, then Module base (0), then App (1)
+                binding = self.app.callbacks.lookup(
+                    mod_class.class_id, keypress
+                )
+                if binding is None:
                     self.print(f"{keypress} has no function")
                     return
-                call_for_button = list(filter(lambda callback: callback['classID'] in [mod_class.class_id,0,1], all_calls_for_button))  # [0]
-                callback = call_for_button[-1]['func']  # TODO: come back for this 0, cant be right.
-                callback(mod_class, mod_panel)
+                if binding['coalesce']:
+                    binding['func'](mod_class, mod_panel, repeat=repeat)
+                else:
+                    for _ in range(repeat):
+                        binding['func'](mod_class, mod_panel)
 
             except Exception as e:
                 self.print(e)
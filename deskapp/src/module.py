@@ -18,6 +18,19 @@ from deskapp import SubClass, Keys, callback, callbacks
 
 class Module(SubClass):
     name = "Basic Module"
+    # Paint this module every frame even when it is not the visible one.
+    # Off by default; only the current module is rendered.
+    background_render = False
+    # Repaint every frame. Set False for modules whose page() only
+    # changes on input, events or app.data updates; those repaint when
+    # invalidated.
+    animated = True
+    # Timed repaints per second. None follows `animated` (every frame
+    # when animated, otherwise on change only); 0 repaints on change
+    # only; a positive rate repaints at most that often, e.g. 30 for a
+    # 30 fps widget or 1 for a once-a-second status page.
+    refresh_rate = None
+
     def __init__(self, app, class_id):
         super().__init__(app)
         self.class_id = class_id
@@ -39,6 +52,10 @@ class Module(SubClass):
         # Added by Claude Sonnet 4.5 10-10-25
         self._event_handlers = []
 
+        # Damage tracking: page() is skipped while clean unless the
+        # module is animated.
+        self.dirty = True
+
     @property
     def h(self):
         return self.app.logic.current_dims()[0]
@@ -106,7 +123,8 @@ class Module(SubClass):
     ## EVENT SYSTEM HELPERS
     ## Added by: Claude Sonnet 4.5 10-10-25
 
-    def emit_event(self, event_type: str, data: dict = None) -> bool:
+    def emit_event(self, event_type: str, data: dict = None,
+                   coalesce_key=None) -> bool:
         """Emit an event from this module.
 
         Automatically includes source=self.name.
@@ -114,11 +132,18 @@ class Module(SubClass):
         Args:
             event_type: Event identifier (e.g., 'data.update')
             data: Event payload
+            coalesce_key: Replace a pending event of this type with the
+                          same key instead of queueing another one
 
         Returns:
             True if queued, False if dropped
         """
-        return self.app.emit(event_type, data, source=self.name)
+        return self.app.emit(event_type, data, source=self.name,
+                             coalesce_key=coalesce_key)
+
+    def spawn(self, coro):
+        """Run a coroutine on the app's asyncio loop (see App.spawn)."""
+        return self.app.spawn(coro)
 
     def on_event(self, event_type: str, handler) -> None:
         """Register event listener for this module.
@@ -166,6 +191,32 @@ class Module(SubClass):
     def page(self, panel):
         self.write(panel, 2, 2, "This is working!")
 
+    def invalidate(self):
+        """Request a repaint of this module on the next frame."""
+        self.dirty = True
+
+    def refresh_interval(self):
+        """Seconds between timed repaints.
+
+        Returns:
+            0.0 to repaint every frame, a positive interval, or None to
+            repaint only when invalidated
+        """
+        rate = self.refresh_rate
+        if rate is None:
+            return 0.0 if self.animated else None
+        if rate <= 0:
+            return None
+        return 1.0 / rate
+
+    def tick(self):
+        """Optional background hook, called once per frame.
+
+        Runs for every loaded module whether or not it is visible.
+        Keep it cheap; drawing belongs in page().
+        """
+        return None
+
     # Added by GPT5 10-07-25
     # Optional secondary/right side panel content.
     def PageRight(self, panel):
@@ -0,0 +1,102 @@
+"""
+Frame profiler for DeskApp.
+
+Backend records how long each phase of a frame takes (event processing,
+input, each module's page(), each built-in panel, update_panels,
+refresh, sleep) into fixed-size rolling windows. Percentiles are only
+computed when someone asks for them, so recording stays a dict lookup
+and a deque append.
+"""
+
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class FrameProfiler:
+    """Rolling per-phase timings for the main loop."""
+
+    def __init__(self, window: int = 240, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self.samples: Dict[str, Deque[float]] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Add one timing sample for a phase.
+
+        Args:
+            phase: Phase name, e.g. 'events' or 'mod:About'
+            seconds: Elapsed time in seconds
+        """
+        if not self.enabled:
+            return
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    @contextmanager
+    def timer(self, phase: str):
+        """Time a block: `with profiler.timer('load'): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def percentile(self, phase: str, pct: float) -> float:
+        """Return the pct-th percentile (nearest rank) in milliseconds."""
+        samples = self.samples.get(phase)
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return nearest_rank(ordered, pct) * 1000
+
+    def stats(self, phase: str) -> Optional[Dict[str, float]]:
+        """Summarize one phase.
+
+        Returns:
+            Dict with last, mean, p50, p95, p99, max (milliseconds) and
+            count, or None if the phase has no samples
+        """
+        samples = self.samples.get(phase)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return {
+            'last': samples[-1] * 1000,
+            'mean': sum(ordered) / len(ordered) * 1000,
+            'p50': nearest_rank(ordered, 50) * 1000,
+            'p95': nearest_rank(ordered, 95) * 1000,
+            'p99': nearest_rank(ordered, 99) * 1000,
+            'max': ordered[-1] * 1000,
+            'count': len(ordered),
+        }
+
+    def report(self, sort_by: str = 'p95') -> List[Tuple[str, Dict]]:
+        """Return (phase, stats) pairs, slowest first by sort_by."""
+        rows = []
+        for phase in list(self.samples):
+            stats = self.stats(phase)
+            if stats is not None:
+                rows.append((phase, stats))
+        rows.sort(key=lambda row: row[1][sort_by], reverse=True)
+        return rows
+
+    def phases(self) -> List[str]:
+        return list(self.samples)
+
+    def reset(self, phase: Optional[str] = None) -> None:
+        """Drop samples for one phase, or for all phases."""
+        if phase is None:
+            self.samples.clear()
+        else:
+            self.samples.pop(phase, None)
+
+
+def nearest_rank(ordered: List[float], pct: float) -> float:
+    """pct-th percentile of an already sorted, non-empty list."""
+    index = math.ceil(pct / 100.0 * len(ordered)) - 1
+    return ordered[min(max(index, 0), len(ordered) - 1)]
@@ -0,0 +1,56 @@
+"""
+Screen region index for mouse hit-testing.
+
+RegionIndex paints the visible panels, topmost last, into a grid with
+one byte per screen cell. Resolving a click is then a single lookup
+instead of testing every panel in turn. The backend rebuilds it only
+when the panel layout changes.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+# (region name, (h, w, top_y, top_x)) as stored in the index.
+Region = Tuple[str, Tuple[int, int, int, int]]
+
+
+class RegionIndex:
+    """Cell -> panel map for one layout."""
+
+    def __init__(self, h: int, w: int, rects: Sequence[Region] = ()):
+        """
+        Args:
+            h: Screen height in rows
+            w: Screen width in columns
+            rects: (name, dims) pairs, topmost first; dims are
+                   [h, w, top_y, top_x] as on Panel
+        """
+        self.h = max(0, h)
+        self.w = max(0, w)
+        self.regions: List[Region] = []
+        self.cells = [bytearray(self.w) for _ in range(self.h)]
+        self.build(rects)
+
+    def build(self, rects: Sequence[Region]) -> None:
+        """Repaint the grid from (name, dims) pairs, topmost first."""
+        for row in self.cells:
+            row[:] = bytes(self.w)
+        self.regions = [(name, tuple(dims)) for name, dims in rects][:255]
+        # Paint bottom-up so the topmost panel owns shared cells
+        for slot in range(len(self.regions), 0, -1):
+            h, w, top_y, top_x = self.regions[slot - 1][1]
+            left = max(0, top_x)
+            right = min(self.w, top_x + w)
+            if right <= left:
+                continue
+            fill = bytes([slot]) * (right - left)
+            for y in range(max(0, top_y), min(self.h, top_y + h)):
+                self.cells[y][left:right] = fill
+
+    def lookup(self, col: int, row: int) -> Optional[Region]:
+        """Return (name, dims) of the panel at a screen cell, or None."""
+        if not (0 <= row < self.h and 0 <= col < self.w):
+            return None
+        slot = self.cells[row][col]
+        if not slot:
+            return None
+        return self.regions[slot - 1]
@@ -0,0 +1,214 @@
+"""
+Input traces for DeskApp: record a live session, replay it headless.
+
+A trace is a JSON-lines file (gzip-compressed when the name ends in
+.gz). The first line is a header naming the modules and screen size;
+every other line is one compact entry, time in ms since recording
+started:
+
+    [t, "k", code]          raw key code, as read from curses
+    [t, "m", x, y, button]  mouse report
+    [t, "r", h, w]          terminal resize
+    [t, "f"]                end of a frame that had input
+    [t, "e", type, source, data]   event emitted on the EventBus
+
+Keys are the raw codes curses returned, escape-sequence bytes and typed
+footer text included, so a replay runs them through the same
+get_input / Logic.decider / _handle_mouse_input path as the live loop.
+Events are recorded for comparison and are not replayed; the replayed
+app emits its own.
+
+    App(modules=[MyMod], record_trace="session.trace.gz")
+
+    app = replay_trace("session.trace.gz")   # headless, not started
+    app.start()
+"""
+
+import curses
+import gzip
+import importlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from deskapp import Keys
+
+TRACE_VERSION = 1
+
+
+def open_trace(path: str, mode: str):
+    """Open a trace file for text I/O, gzip if the name says so."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def module_path(cls) -> str:
+    """'package.module:Class' for a module class."""
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def resolve_module(path: str):
+    """Import a module class from its module_path()."""
+    module_name, _, qualname = path.partition(":")
+    target = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class TraceRecorder:
+    """Writes a live app's input and events to a trace file."""
+
+    def __init__(self, path: str, app):
+        """
+        Args:
+            path: Trace file to create (.gz to compress)
+            app: The App being recorded
+        """
+        self.path = path
+        self.handle = open_trace(path, "w")
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        # Input since the last frame marker; unget() may retract one
+        self.pending: List[list] = []
+        self.write({
+            'deskapp_trace': TRACE_VERSION,
+            'size': [app.front.h, app.front.w],
+            # The full menu, demo modules included
+            'modules': [module_path(cls) for cls in app.menu],
+            'use_mouse': app.front.use_mouse,
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        })
+
+    def now(self) -> int:
+        return int((time.perf_counter() - self.start) * 1000)
+
+    def write(self, entry: Any) -> None:
+        line = json.dumps(entry, separators=(",", ":"), default=repr)
+        with self.lock:
+            if self.handle is not None:
+                self.handle.write(line + "\n")
+
+    def key(self, code: int) -> None:
+        """Record a raw key code; mouse and resize are recorded whole."""
+        if code in (curses.KEY_MOUSE, Keys.RESIZE):
+            return
+        self.pending.append([self.now(), "k", int(code)])
+
+    def unget(self, code: int) -> None:
+        """Retract a key pushed back to be read again."""
+        if self.pending and self.pending[-1][1:] == ["k", int(code)]:
+            self.pending.pop()
+
+    def mouse(self, x: int, y: int, button: int) -> None:
+        self.pending.append([self.now(), "m", x, y, button])
+
+    def resize(self, h: int, w: int) -> None:
+        self.pending.append([self.now(), "r", h, w])
+
+    def frame(self) -> None:
+        """Close the current frame's input group."""
+        pending, self.pending = self.pending, []
+        for entry in pending:
+            self.write(entry)
+        self.write([self.now(), "f"])
+
+    def event(self, event: Dict[str, Any]) -> None:
+        """EventBus tap; may be called from any thread."""
+        self.write([self.now(), "e", event['type'], event['source'],
+                    event['data']])
+
+    def close(self) -> None:
+        if self.pending:
+            self.frame()
+        with self.lock:
+            if self.handle is not None:
+                self.handle.close()
+                self.handle = None
+
+
+def load_trace(path: str) -> Tuple[Dict[str, Any], List[list]]:
+    """Read a trace file into (header, entries)."""
+    with open_trace(path, "r") as handle:
+        header = json.loads(handle.readline())
+        if header.get('deskapp_trace') != TRACE_VERSION:
+            raise ValueError(f"{path} is not a DeskApp trace")
+        entries = [json.loads(line) for line in handle if line.strip()]
+    return header, entries
+
+
+def feed_trace(front, entries: List[list], realtime: bool = False) -> int:
+    """Queue trace input on a HeadlessCurse.
+
+    Args:
+        front: HeadlessCurse to feed
+        entries: Entries from load_trace()
+        realtime: Hold each frame's input until its recorded time
+                  instead of running frames back to back
+
+    Returns:
+        Number of input frames queued
+    """
+    clock = {}
+
+    def wait_until(ms: int) -> Callable[[], None]:
+        def wait():
+            now = time.perf_counter()
+            start = clock.setdefault('start', now - ms / 1000)
+            delay = start + ms / 1000 - now
+            if delay > 0:
+                time.sleep(delay)
+        return wait
+
+    frames = 0
+    group_start = True
+    for entry in entries:
+        kind = entry[1]
+        if kind == "e":
+            continue
+        if kind == "f":
+            front.feed_idle()
+            frames += 1
+            group_start = True
+            continue
+        if realtime and group_start:
+            front.feed_call(wait_until(entry[0]))
+        group_start = False
+        if kind == "k":
+            front.inputs.append(entry[2])
+        elif kind == "m":
+            front.inputs.append(('mouse', (entry[2], entry[3]), entry[4]))
+        elif kind == "r":
+            front.inputs.append(('resize', entry[2], entry[3]))
+    front.wake()
+    return frames
+
+
+def replay_trace(path: str, realtime: bool = False,
+                 modules: Optional[List] = None, **app_kwargs):
+    """Build a headless App that replays a trace, then closes.
+
+    Args:
+        path: Trace written by TraceRecorder
+        realtime: Keep the recorded pacing; default is flat out
+        modules: Module classes to use instead of the recorded ones
+        app_kwargs: Extra App() arguments
+
+    Returns:
+        The App, not yet started; call app.start()
+    """
+    # Imported here: the backend imports this module
+    from deskapp.src.app import App
+
+    header, entries = load_trace(path)
+    if modules is None:
+        modules = [resolve_module(name) for name in header['modules']]
+    app_kwargs.setdefault('headless_size', tuple(header['size']))
+    app_kwargs.setdefault('use_mouse', header.get('use_mouse', True))
+    app = App(modules=modules, demo_mode=False, headless=True,
+              autostart=False, **app_kwargs)
+    feed_trace(app.front, entries, realtime)
+    app.front.feed_call(app.close)
+    return app
@@ -45,14 +45,14 @@ class ScrollList:
         self.Cursor    = max(0, min(self.Cursor, len(self.Items) - 1))
         self._Clamp()
 
-    def MoveUp(self):
+    def MoveUp(self, Steps=1):
         if self.Cursor > 0:
-            self.Cursor -= 1
+            self.Cursor = max(0, self.Cursor - Steps)
             self._Clamp()
 
-    def MoveDown(self):
+    def MoveDown(self, Steps=1):
         if self.Cursor < len(self.Items) - 1:
-            self.Cursor += 1
+            self.Cursor = min(len(self.Items) - 1, self.Cursor + Steps)
             self._Clamp()
 
     def JumpTop(self):
@@ -162,13 +162,13 @@ class ResultGrid:
         self.HScroll = 0
         self._ComputeWidths()
 
-    def MoveUp(self):
+    def MoveUp(self, Steps=1):
         if self.Cursor > 0:
-            self.Cursor -= 1
+            self.Cursor = max(0, self.Cursor - Steps)
 
-    def MoveDown(self):
+    def MoveDown(self, Steps=1):
         if self.Cursor < len(self.Rows) - 1:
-            self.Cursor += 1
+            self.Cursor = min(len(self.Rows) - 1, self.Cursor + Steps)
 
     def ScrollLeft(self):
         if self.HScroll > 0:
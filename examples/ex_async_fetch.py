@@ -52,7 +52,7 @@ class DataFetchWorker(BaseWorker):
                 'step': step + 1,
                 'total_steps': self.steps,
                 'progress': progress
-            })
+            }, coalesce_key=self.fetch_id)
 
             # Simulate work
             time.sleep(step_duration)
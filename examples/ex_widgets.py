@@ -223,19 +223,19 @@ class WidgetsDemo(Module):
     # Key callbacks                                                   #
     # -------------------------------------------------------------- #
 
-    @callback(DEMO_ID, Keys.UP)
+    @callback(DEMO_ID, Keys.UP, coalesce=True)
     def OnUp(self, *a, **k):
         if self.Focus == FOCUS_LIST:
-            self.List.MoveUp()
+            self.List.MoveUp(k["repeat"])
         else:
-            self.Grid.MoveUp()
+            self.Grid.MoveUp(k["repeat"])
 
-    @callback(DEMO_ID, Keys.DOWN)
+    @callback(DEMO_ID, Keys.DOWN, coalesce=True)
     def OnDown(self, *a, **k):
         if self.Focus == FOCUS_LIST:
-            self.List.MoveDown()
+            self.List.MoveDown(k["repeat"])
         else:
-            self.Grid.MoveDown()
+            self.Grid.MoveDown(k["repeat"])
 
     @callback(DEMO_ID, Keys.HOME)
     def OnHome(self, *a, **k):
@@ -0,0 +1,128 @@
+"""
+Unit tests for DeskApp key dispatch.
+Tests CallbackRegistry precedence and per-App isolation.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+from deskapp import App, Module, Keys, callback
+from deskapp.src.callback import APP_ID, MODULE_ID, CallbackRegistry
+
+Mine_ID = random.random()
+
+
+class Mine(Module):
+    name = "Mine"
+    animated = False
+
+    def __init__(self, app):
+        super().__init__(app, Mine_ID)
+        self.hits = []
+
+    @callback(Mine_ID, Keys.PG_DOWN)
+    def on_pg_down(self, *args, **kwargs):
+        self.hits.append('module')
+
+
+def test_precedence():
+    """Test module > Module base (0) > App (1) precedence."""
+    print("\n=== Test: Precedence ===")
+
+    reg = CallbackRegistry()
+    reg.register(APP_ID, Keys.X, 'app')
+    reg.register(MODULE_ID, Keys.X, 'base')
+    reg.register(42, Keys.X, 'module')
+    reg.register(APP_ID, Keys.Y, 'app')
+
+    assert reg.lookup(42, Keys.X)['func'] == 'module'
+    assert reg.lookup(7, Keys.X)['func'] == 'base'
+    assert reg.lookup(42, Keys.Y)['func'] == 'app'
+    assert reg.lookup(42, Keys.Z) is None
+    print("✓ Precedence order is fixed")
+
+
+def test_rebind_replaces():
+    """Test that rebinding a (classID, key) pair does not grow the table."""
+    print("\n=== Test: Rebind Replaces ===")
+
+    reg = CallbackRegistry()
+    reg.register(5, Keys.A, 'first')
+    reg.register(5, Keys.A, 'second')
+
+    assert len(reg) == 1
+    assert reg.lookup(5, Keys.A)['func'] == 'second'
+    print("✓ Rebinding replaces")
+
+
+def test_module_overrides_app_key():
+    """Test that a module binding wins over the App-level binding."""
+    print("\n=== Test: Module Overrides App Key ===")
+
+    app = App(modules=[Mine], demo_mode=False, headless=True,
+              autostart=False)
+    app.front.feed_keys(Keys.PG_DOWN, "q")
+    app.start()
+
+    assert app.logic.available_panels['Mine'][0].hits == ['module']
+    print("✓ Module binding dispatched")
+
+
+def test_per_app_bind():
+    """Test that App.bind() only affects that app."""
+    print("\n=== Test: Per-App Bind ===")
+
+    calls = []
+    first = App(modules=[Mine], demo_mode=False, headless=True,
+                autostart=False)
+    second = App(modules=[Mine], demo_mode=False, headless=True,
+                 autostart=False)
+    first.bind(Keys.Z, lambda mod, panel: calls.append('first'))
+
+    assert first.callbacks.lookup(Mine_ID, Keys.Z) is not None
+    assert second.callbacks.lookup(Mine_ID, Keys.Z) is None
+    first.front.feed_keys(Keys.Z, "q")
+    first.start()
+    assert calls == ['first']
+    print("✓ Bindings are per app")
+
+
+def run_all_tests():
+    """Run all dispatch tests."""
+    print("=" * 60)
+    print("DeskApp Key Dispatch Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_precedence,
+        test_rebind_replaces,
+        test_module_overrides_app_key,
+        test_per_app_bind,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__} FAILED: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} ERROR: {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    exit(0 if success else 1)
@@ -10,8 +10,11 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import time
+import tempfile
 import threading
-from deskapp.src.events import EventBus
+from deskapp.src.events import Event, EventBus, LineBatcher
+from deskapp.src.bridge import (BridgeClient, EventBridge, FrameDecoder,
+                                encode_frame)
 
 
 def test_basic_emit_and_listen():
@@ -138,7 +141,7 @@ def test_thread_safety():
         t.join()
 
     # Process all events
-    while bus.event_queue.qsize() > 0:
+    while bus.queue_size() > 0:
         bus.process_events(max_events=100)
 
     assert len(received) == 30  # 3 workers * 10 events
@@ -228,6 +231,477 @@ def test_queue_overflow():
     print("✓ Queue overflow handling works")
 
 
+def test_adaptive_drain():
+    """Test that the drain budget grows with the backlog."""
+    print("\n=== Test: Adaptive Drain ===")
+
+    bus = EventBus(max_queue_size=1000)
+    received = []
+    bus.on('apt.out.line', lambda event: received.append(event))
+
+    for i in range(900):
+        bus.emit('apt.out.line', {'line': i}, source='test')
+
+    # A near-full queue gets more than the time left in the frame
+    processed = bus.process_adaptive(time_left_ms=20.0)
+    metrics = bus.get_metrics()
+    assert processed == 900
+    assert metrics['last_drain_budget_ms'] > 20.0
+    assert metrics['queue_size'] == 0
+    assert metrics['oldest_event_age_ms'] == 0.0
+    assert 0.0 < metrics['latency_p50_ms'] <= metrics['latency_max_ms']
+
+    bus.emit('apt.out.line', {'line': 'late'}, source='test')
+    time.sleep(0.02)
+    assert bus.get_metrics()['oldest_event_age_ms'] >= 20.0
+    assert bus.process_adaptive(time_left_ms=0.0) == 1
+    assert bus.get_metrics()['latency_last_ms'] >= 20.0
+
+    print("✓ Drain budget adapts; latency tracked")
+
+
+def test_coalescing():
+    """Test that state-style events replace pending copies."""
+    print("\n=== Test: Coalescing ===")
+
+    bus = EventBus()
+    received = []
+    bus.on('counter.tick', lambda event: received.append(event))
+    bus.on('fetch.progress', lambda event: received.append(event))
+    bus.coalesce('counter.tick')
+
+    for i in range(100):
+        bus.emit('counter.tick', {'count': i}, source='worker.A')
+    bus.emit('counter.tick', {'count': 7}, source='worker.B')
+    for fetch_id in (1, 2):
+        for pct in (10, 50, 90):
+            bus.emit('fetch.progress', {'id': fetch_id, 'pct': pct},
+                     source='test', coalesce_key=fetch_id)
+
+    # One pending event per (type, key), holding the newest data
+    assert bus.get_metrics()['queue_size'] == 4
+    assert bus.get_metrics()['events_coalesced'] == 101 - 2 + 6 - 2
+    bus.process_events(max_events=100)
+    # Worker ticks are on the bulk lane, drained after interactive
+    assert [e['data'] for e in received] == [
+        {'id': 1, 'pct': 90}, {'id': 2, 'pct': 90},
+        {'count': 99}, {'count': 7}]
+
+    # Once dispatched, the next emit queues a fresh event
+    bus.emit('counter.tick', {'count': 100}, source='worker.A')
+    assert bus.process_events() == 1
+    assert received[-1]['data'] == {'count': 100}
+
+    print("✓ Pending events coalesced")
+
+
+def test_emit_batch_and_line_batcher():
+    """Test batched emission and the size/time-bounded line batcher."""
+    print("\n=== Test: Batched Emission ===")
+
+    bus = EventBus()
+    batches = []
+    bus.on('job.out.lines', lambda event: batches.append(event['data']))
+
+    assert bus.emit_batch('job.out.lines', ['a', 'b'], 'test', {'id': 3})
+    assert not bus.emit_batch('job.out.lines', [], 'test')
+    assert bus.process_events() == 1
+    assert batches == [{'id': 3, 'items': ['a', 'b']}]
+    assert bus.get_metrics()['batch_items'] == 2
+
+    # Full batches go out at max_items, the remainder on close()
+    batcher = LineBatcher(
+        lambda items: bus.emit_batch('job.out.lines', items, 'test'),
+        max_items=100, max_delay=10.0)
+    with batcher:
+        for i in range(250):
+            batcher.add(i)
+        assert bus.get_metrics()['queue_size'] == 2
+    bus.process_events(max_events=10)
+    sizes = [len(data['items']) for data in batches[1:]]
+    assert sizes == [100, 100, 50]
+    assert [i for data in batches[1:] for i in data['items']] == \
+        list(range(250))
+
+    # A trickle is flushed by the timer
+    sent = []
+    batcher = LineBatcher(sent.append, max_items=100, max_delay=0.02)
+    batcher.add('x')
+    batcher.extend(['y', 'z'])
+    assert sent == []
+    time.sleep(0.1)
+    assert sent == [['x', 'y', 'z']]
+    # Later trickles reuse the same flush thread
+    flusher = batcher.thread
+    threads = threading.active_count()
+    for item in range(5):
+        batcher.add(item)
+        time.sleep(0.04)
+    assert batcher.thread is flusher
+    assert threading.active_count() == threads
+    assert [i for batch in sent[1:] for i in batch] == list(range(5))
+    assert batcher.close() == 0
+    assert not flusher.is_alive()
+
+    print("✓ Batches emitted by size and by time")
+
+
+def test_priority_lanes():
+    """Test that input overtakes a flooded bulk lane."""
+    print("\n=== Test: Priority Lanes ===")
+
+    bus = EventBus(max_queue_size=50,
+                   lanes={'system': {'capacity': 3}})
+    received = []
+    for event_type in ('apt.out.lines', 'input.mouse', 'ui.menu.select',
+                       'system.resize', 'job.log'):
+        bus.on(event_type, lambda event: received.append(event['type']))
+    bus.route('job.*', 'bulk')
+
+    # A worker fills the bulk lane; further bulk events are refused
+    for i in range(60):
+        bus.emit('apt.out.lines', {'items': [i]}, source='worker.APT')
+    assert not bus.emit('job.log', {}, source='test')
+    bus.emit('ui.menu.select', {}, source='app')
+    # The system lane evicts its oldest event instead
+    for i in range(5):
+        assert bus.emit('input.mouse', {'i': i}, source='backend')
+    bus.emit('system.resize', {}, source='backend')
+
+    metrics = bus.get_metrics()['lanes']
+    assert metrics['bulk']['queued'] == 50
+    assert metrics['bulk']['dropped'] == 11
+    assert metrics['system']['dropped'] == 3
+    assert bus.get_metrics()['events_dropped'] == 14
+
+    assert bus.process_events(max_events=4) == 4
+    assert received == ['input.mouse', 'input.mouse', 'system.resize',
+                        'ui.menu.select']
+    assert bus.process_adaptive(time_left_ms=10.0) == 50
+    assert bus.get_metrics()['lanes']['bulk']['processed'] == 50
+
+    print("✓ Lanes drained by priority with their own drop policy")
+
+
+def test_event_objects():
+    """Test slotted events, pooling and copy-on-write handler lists."""
+    print("\n=== Test: Event Objects ===")
+
+    bus = EventBus(pool_size=4)
+    seen = []
+
+    def once(event):
+        seen.append((event['type'], event['data'], event.get('lane'),
+                     'coalesce_key' in event, id(event)))
+        # Removing a handler mid-dispatch leaves this dispatch alone
+        bus.off('obj.event', once)
+
+    bus.on('obj.event', once)
+    bus.on('obj.event', lambda event: seen.append(event.source))
+    before = time.time()
+    bus.emit('obj.event', {'n': 1}, source='test')
+    bus.process_events()
+    assert seen[0][:4] == ('obj.event', {'n': 1}, 'interactive', False)
+    assert seen[1] == 'test'
+    assert len(bus.listeners['obj.event']) == 1
+
+    # Dispatched events are reused; timestamps stay wall-clock
+    first_id = seen[0][4]
+    bus.emit('obj.event', {'n': 2}, source='test')
+    event = bus.lanes['interactive'].events[0]
+    assert isinstance(event, Event) and id(event) == first_id
+    assert abs(event['timestamp'] - before) < 1.0
+    assert event.emitted_at == event['queued_at']
+    assert event.to_dict()['data'] == {'n': 2}
+    try:
+        event['nope']
+        assert False, "unknown key should raise KeyError"
+    except KeyError:
+        pass
+
+    print("✓ Events are slotted, pooled and dict-readable")
+
+
+def test_counters_under_load():
+    """Test that metrics stay exact with many producer threads."""
+    print("\n=== Test: Counters Under Load ===")
+
+    bus = EventBus(max_queue_size=2000)
+    received = []
+    bus.on('load.event', lambda event: received.append(1))
+    producers, per_producer = 8, 5000
+    accepted = [0] * producers
+
+    def produce(index):
+        for i in range(per_producer):
+            if bus.emit('load.event', {'i': i}, source='worker.load'):
+                accepted[index] += 1
+
+    threads = [threading.Thread(target=produce, args=(i,))
+               for i in range(producers)]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        bus.process_events(max_events=500)
+    for t in threads:
+        t.join()
+    while bus.queue_size():
+        bus.process_events(max_events=500)
+
+    metrics = bus.get_metrics()
+    assert metrics['events_emitted'] == sum(accepted) == len(received)
+    assert metrics['events_processed'] == len(received)
+    assert (metrics['events_emitted'] + metrics['events_dropped'] ==
+            producers * per_producer)
+    assert metrics['lanes']['bulk']['dropped'] == metrics['events_dropped']
+
+    print("✓ Emit counters exact across producer threads")
+
+
+def test_tracing():
+    """Test trace ring buffer, histograms and slow-handler ranking."""
+    print("\n=== Test: Tracing ===")
+
+    bus = EventBus(max_queue_size=5)
+    tracer = bus.enable_tracing(capacity=4)
+
+    def slow_handler(event):
+        time.sleep(0.005)
+
+    def fast_handler(event):
+        pass
+
+    def any_handler(event):
+        pass
+
+    bus.on('trace.slow', slow_handler)
+    bus.on('trace.fast', fast_handler)
+    bus.on('trace.*', any_handler)
+    for _ in range(2):
+        bus.emit('trace.slow', {}, source='test')
+    for _ in range(5):
+        bus.emit('trace.fast', {}, source='test')
+    while bus.queue_size():
+        bus.process_events(max_events=10, max_time_ms=100.0)
+
+    assert bus.get_metrics()['trace'] is None
+    types = bus.get_metrics(trace=True)['trace']['types']
+    assert types['trace.slow']['count'] == 2
+    assert types['trace.fast']['count'] == 3
+    assert types['trace.fast']['dropped'] == 2
+    assert types['trace.slow']['handler_p95_ms'] >= 5.0
+    assert types['trace.fast']['handler_p95_ms'] < 5.0
+    assert sum(types['trace.slow']['latency']['buckets']) == 2
+    assert tracer.slowest_handlers()[0][0].endswith('slow_handler')
+    assert tracer.hottest_types()[0][0] == 'trace.slow'
+    assert tracer.hottest_types('dropped')[0][0] == 'trace.fast'
+    # The ring keeps the newest 4 of 5 dispatches and 2 drops
+    recent = tracer.recent()
+    assert len(recent) == 4 and recent[-1][1] == 'trace.fast'
+    assert recent[-1][4] is not None and recent[0][6] != 'dropped'
+    # Prefix listeners count among the handlers dispatched
+    assert recent[-1][6] == 2
+
+    bus.disable_tracing()
+    assert bus.get_metrics(trace=True)['trace'] is None
+
+    print("✓ Trace histograms point at the slow handler")
+
+
+def test_prefix_listener_cache():
+    """Test that cached prefix dispatch follows on() and off()."""
+    print("\n=== Test: Prefix Listener Cache ===")
+
+    bus = EventBus()
+    calls = []
+
+    def exact(event):
+        calls.append('exact')
+
+    def family(event):
+        calls.append('family')
+
+    bus.on('fetch.done', exact)
+    bus.on('fetch.*', family)
+    bus.emit('fetch.done', {}, source='test')
+    bus.process_events()
+    assert calls == ['exact', 'family']
+    assert 'fetch.done' in bus.dispatch_cache
+
+    # Later registrations are seen, the cache is rebuilt
+    bus.off('fetch.done', exact)
+    bus.emit('fetch.done', {}, source='test')
+    bus.process_events()
+    assert calls[2:] == ['family']
+    bus.on('fetch.done', exact)
+    bus.off('fetch.*', family)
+    bus.emit('fetch.done', {}, source='test')
+    bus.process_events()
+    assert calls[3:] == ['exact']
+    assert not bus.dispatch_cache
+
+    print("✓ Prefix dispatch cache invalidated by on()/off()")
+
+
+def test_pooled_events_awaited():
+    """Test that awaited events survive the bus recycling them."""
+    print("\n=== Test: Pooled Events Awaited ===")
+    import asyncio
+
+    bus = EventBus(pool_size=8)
+
+    async def main():
+        waiter = asyncio.ensure_future(bus.wait_for('job.done'))
+        stream = bus.stream('fetch.*')
+        await asyncio.sleep(0)
+        bus.emit('fetch.chunk', {'n': 1}, source='test')
+        bus.emit('fetch.chunk', {'n': 2}, source='test')
+        bus.emit('job.done', {'id': 7}, source='test')
+        # Dispatch recycles all three events before any coroutine runs
+        assert bus.process_events() == 3
+        bus.emit('other.event', {'reused': True}, source='test')
+        bus.process_events()
+        done = await asyncio.wait_for(waiter, 1.0)
+        seen = [await stream.__anext__(), await stream.__anext__()]
+        stream.close()
+        return done, seen
+
+    done, seen = asyncio.run(main())
+    assert done['type'] == 'job.done' and done['data'] == {'id': 7}
+    assert [event['data']['n'] for event in seen] == [1, 2]
+
+    print("✓ wait_for() and stream() keep copies of pooled events")
+
+
+def test_event_bridge():
+    """Test emitting and subscribing from another process's socket."""
+    print("\n=== Test: Event Bridge ===")
+
+    # Frames split anywhere decode whole
+    stream = encode_frame({'op': 'emit', 'n': 1}) + encode_frame({'n': 2})
+    decoder = FrameDecoder()
+    messages = decoder.feed(stream[:3]) + decoder.feed(stream[3:9])
+    messages += decoder.feed(stream[9:])
+    assert [m.get('n') for m in messages] == [1, 2]
+
+    bus = EventBus()
+    received = []
+    bus.on('remote.ping', lambda event: received.append(event))
+    bus.on('remote.lines', lambda event: received.append(event))
+
+    def pump(until):
+        deadline = time.time() + 5.0
+        while not until() and time.time() < deadline:
+            bus.process_events(max_events=100, max_time_ms=50.0)
+            time.sleep(0.005)
+        assert until(), "timed out waiting for the bridge"
+
+    path = os.path.join(tempfile.mkdtemp(), 'bus.sock')
+    bridge = EventBridge(bus, path).start()
+    try:
+        client = BridgeClient(path, name='collector')
+        client.emit('remote.ping', {'n': 1})
+        client.emit_batch('remote.lines', ['a', 'b', 'c'])
+        pump(lambda: len(received) == 2)
+        assert received[0]['source'] == 'bridge.collector'
+        assert received[0]['data'] == {'n': 1}
+        assert received[0].lane == 'bulk'
+        assert received[1]['data']['items'] == ['a', 'b', 'c']
+
+        # Types routed to higher lanes still arrive on bulk
+        lanes = []
+        for event_type in ('input.key', 'system.resize', 'ui.lines'):
+            bus.on(event_type, lambda event: lanes.append(
+                (event.type, event.lane)))
+        client.emit('input.key', {'key': 27})
+        client.emit('system.resize', {})
+        client.emit_batch('ui.lines', ['x'])
+        pump(lambda: len(lanes) == 3)
+        assert lanes == [('input.key', 'bulk'), ('system.resize', 'bulk'),
+                         ('ui.lines', 'bulk')]
+
+        got = []
+        client.on('ui.*', got.append)
+        client.start()
+        pump(lambda: bridge.connections and next(iter(
+            bridge.connections.values())).subscriptions)
+        bus.emit('ui.selected', {'row': 3}, source='test')
+        bus.emit('other.event', {}, source='test')
+        pump(lambda: got)
+        assert got[0]['type'] == 'ui.selected'
+        assert got[0]['data'] == {'row': 3}
+
+        # A closed client is unsubscribed from the bus
+        client.close()
+        pump(lambda: not bridge.connections)
+        assert not bus.prefix_listeners
+    finally:
+        bridge.stop()
+    assert not os.path.exists(path)
+
+    print("✓ Bridge clients emit into and subscribe to the bus")
+
+
+def test_event_bridge_bad_clients():
+    """Test that malformed frames drop only the sender."""
+    print("\n=== Test: Event Bridge Bad Clients ===")
+    import socket
+
+    bus = EventBus()
+    received = []
+    bus.on('remote.ping', lambda event: received.append(event))
+
+    directory = tempfile.mkdtemp()
+    # A regular file at the path is never replaced
+    path = os.path.join(directory, 'important.txt')
+    with open(path, 'w') as handle:
+        handle.write('keep me')
+    try:
+        EventBridge(bus, path).start()
+        assert False, "bridge replaced a regular file"
+    except FileExistsError:
+        pass
+    with open(path) as handle:
+        assert handle.read() == 'keep me'
+
+    path = os.path.join(directory, 'bus.sock')
+    bridge = EventBridge(bus, path).start()
+    try:
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        bad_frames = [
+            encode_frame({'op': 'emit'}),
+            encode_frame([1, 2, 3]),
+            encode_frame(42),
+            encode_frame({'op': 'sub', 'type': 7}),
+            encode_frame({'op': 'emit', 'type': 'remote.ping',
+                          'key': {'a': 1}}),
+            encode_frame({'op': 'emit', 'type': 'remote.ping',
+                          'key': [[1]]}),
+            b'\x00\x00\x00\x03{{{',
+        ]
+        for frame in bad_frames:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(path)
+            sock.sendall(frame)
+            sock.settimeout(5.0)
+            assert sock.recv(1) == b'', "bad client was not disconnected"
+            sock.close()
+        assert bridge.thread.is_alive()
+
+        with BridgeClient(path, name='good') as client:
+            client.emit('remote.ping', {'n': 1}, coalesce_key=['ping', 1])
+            deadline = time.time() + 5.0
+            while not received and time.time() < deadline:
+                bus.process_events(max_events=100, max_time_ms=50.0)
+                time.sleep(0.005)
+        assert received and received[0]['source'] == 'bridge.good'
+        assert bus.get_metrics()['events_emitted'] == 1
+    finally:
+        bridge.stop()
+
+    print("✓ Malformed frames disconnect the client, bridge keeps serving")
+
+
 def run_all_tests():
     """Run all event bus tests."""
     print("=" * 60)
@@ -242,7 +716,18 @@ def run_all_tests():
         test_thread_safety,
         test_error_handling,
         test_metrics,
-        test_queue_overflow
+        test_queue_overflow,
+        test_adaptive_drain,
+        test_coalescing,
+        test_emit_batch_and_line_batcher,
+        test_priority_lanes,
+        test_event_objects,
+        test_counters_under_load,
+        test_tracing,
+        test_prefix_listener_cache,
+        test_pooled_events_awaited,
+        test_event_bridge,
+        test_event_bridge_bad_clients
     ]
 
     passed = 0
@@ -0,0 +1,519 @@
+"""
+Unit tests for the DeskApp headless front end.
+Runs full apps against HeadlessCurse: no TTY, scripted input.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import curses
+import random
+import tempfile
+import time
+from deskapp import App, Module, Keys, callback
+
+Probe_ID = random.random()
+
+
+class Probe(Module):
+    name = "Probe"
+    animated = False
+
+    def __init__(self, app):
+        super().__init__(app, Probe_ID)
+        self.presses = 0
+        self.text = None
+        self.moves = []
+        self.texts = []
+
+    def page(self, panel):
+        self.write(panel, 1, 1, f"presses={self.presses}")
+
+    def string_decider(self, string):
+        self.text = string
+        self.texts.append(string)
+
+    @callback(Probe_ID, Keys.ENTER)
+    def on_enter(self, *args, **kwargs):
+        self.presses += 1
+
+    @callback(Probe_ID, Keys.PG_DOWN, coalesce=True)
+    def on_page_down(self, *args, **kwargs):
+        self.moves.append(kwargs['repeat'])
+
+
+def make_app(**kwargs):
+    return App(modules=[Probe], demo_mode=False, headless=True,
+               autostart=False, **kwargs)
+
+
+def probe(app):
+    return app.logic.available_panels['Probe'][0]
+
+
+def test_snapshot_shows_panels():
+    """Test that a headless app renders into the snapshot."""
+    print("\n=== Test: Snapshot Shows Panels ===")
+
+    app = make_app(headless_size=(24, 80))
+    app.front.feed_keys(Keys.ENTER, Keys.ENTER, "q")
+    app.start()
+
+    rows = app.front.snapshot(lines=True)
+    assert len(rows) == 24
+    assert all(len(row) == 80 for row in rows)
+    assert app.front.find("| Probe |") is not None
+    assert app.front.find("presses=2") is not None
+    print("✓ Snapshot shows rendered panels")
+
+
+def test_scripted_text_input():
+    """Test that fed text reaches the module's string_decider."""
+    print("\n=== Test: Scripted Text Input ===")
+
+    app = make_app()
+    app.front.feed_text("hello")
+    app.front.feed_keys("q")
+    app.start()
+
+    assert probe(app).text == "hello"
+    assert app.front.pending_input() == 0
+    print("✓ Text input delivered")
+
+
+def test_line_editing():
+    """Test cursor movement, deletion and history in the footer line."""
+    print("\n=== Test: Line Editing ===")
+
+    app = make_app()
+    front = app.front
+    front.feed_keys(Keys.TAB, "helo", Keys.LEFT, "l", Keys.END, "!?",
+                    Keys.BACKSPACE, Keys.HOME, Keys.DELETE, "H", Keys.ENTER)
+    front.feed_idle()
+    # UP recalls the last submitted line
+    front.feed_keys(Keys.TAB, Keys.UP, Keys.ENTER)
+    front.feed_idle()
+    front.feed_keys("q")
+    app.start()
+
+    assert probe(app).texts == ["Hello!", "Hello!"]
+    assert front.line.history == ["Hello!"]
+    print("✓ Line edited and recalled")
+
+
+def test_long_line_footer():
+    """Test that a long footer line shows the rows at the cursor."""
+    print("\n=== Test: Long Line Footer ===")
+
+    app = make_app(headless_size=(24, 80))
+    front = app.front
+    front.feed_keys(Keys.TAB, "x" * 5000 + "END")
+    front.feed_idle(2)
+    front.feed_call(app.close)
+    app.start()
+
+    rows = front.snapshot(lines=True)
+    assert app.back.footer_height == 5
+    assert "xEND" in rows[-2]
+    assert front.key_buffer.endswith("END")
+    print("✓ Footer wraps to the cursor")
+
+
+def test_bracketed_paste():
+    """Test that a paste lands in one piece and emits input.paste."""
+    print("\n=== Test: Bracketed Paste ===")
+
+    app = make_app()
+    front = app.front
+    pastes = []
+    app.on('input.paste', lambda event: pastes.append(event['data']))
+    front.feed_keys(Keys.TAB, "> ")
+    front.feed_paste("grep -r 'caf\u00e9'\n" + "x" * 2000)
+    front.feed_keys(Keys.ENTER)
+    front.feed_idle()
+    # Outside key_mode only the event sees it; a bare ESC stays a key
+    front.feed_paste("raw")
+    front.feed_keys(Keys.ESC, "[2")
+    front.feed_idle(2)
+    front.feed_keys("q")
+    app.start()
+
+    text = probe(app).text
+    assert text == "> grep -r 'caf\u00e9' " + "x" * 2000
+    assert [p['key_mode'] for p in pastes] == [True, False]
+    assert pastes[1]['text'] == "raw"
+    assert front.pending_input() == 0
+    print("✓ Paste delivered whole")
+
+
+def test_escape_sequences():
+    """Test that escape sequences curses left raw are decoded."""
+    print("\n=== Test: Escape Sequences ===")
+
+    app = make_app()
+    front = app.front
+    front.feed_keys("\x1b[1;3A", "\x1bx", "\x1bOP", "\x1b[5~", "\x1b[I")
+    front.feed_keys(Keys.ESC)
+    front.feed_idle()
+    front.feed_keys(Keys.ESC, Keys.ESC, "\x1b[99~", "k")
+
+    keys = []
+    while front.pending_input():
+        key = front.get_input()
+        if key not in (0, -1):
+            keys.append(key)
+    # Focus reports are dropped unless use_focus; bad sequences vanish
+    assert keys == [Keys.ALT | Keys.UP, Keys.ALT | ord("x"), curses.KEY_F1,
+                    Keys.PG_UP, Keys.ESC, Keys.ESC, Keys.ESC, ord("k")]
+    app.front.end_safely()
+    print("✓ Sequences decoded, lone ESC delivered")
+
+
+def test_mouse_regions_and_motion():
+    """Test click regions and that motion reports coalesce per frame."""
+    print("\n=== Test: Mouse Regions And Motion ===")
+
+    app = make_app(use_mouse=True, headless_size=(24, 80))
+    front = app.front
+    events = []
+    app.on('input.mouse', lambda event: events.append(event['data']))
+    for x in range(20, 30):
+        front.feed_mouse(x, 8, curses.REPORT_MOUSE_POSITION)
+    front.feed_mouse(1, 4)
+    front.feed_mouse(30, 8, curses.REPORT_MOUSE_POSITION)
+    front.feed_mouse(31, 8, curses.REPORT_MOUSE_POSITION)
+    front.feed_idle(2)
+    front.feed_keys("q")
+    app.start()
+
+    # One motion before the click, one after it
+    assert [(e['col'], e['region']) for e in events] == [
+        (29, 'main'), (1, 'menu'), (31, 'main')]
+    main = app.logic.current_panel().dims
+    assert events[0]['local_row'] == 8 - main[2]
+    assert events[0]['local_col'] == 29 - main[3]
+    assert app.back._classify_click(1, 4)['menu_index'] == 0
+    assert app.back._classify_click(79, 23)['region'] == 'footer'
+    print("✓ Regions resolved, motion coalesced")
+
+
+def test_trace_record_and_replay():
+    """Test that a recorded session replays to the same state."""
+    print("\n=== Test: Trace Record And Replay ===")
+    from deskapp.src.trace import load_trace, replay_trace
+
+    path = os.path.join(tempfile.mkdtemp(), "session.trace.gz")
+    app = make_app(record_trace=path, use_mouse=True)
+    front = app.front
+    front.feed_keys(Keys.ENTER)
+    front.feed_idle()
+    front.feed_text("hi \x1b[D!")
+    front.feed_idle()
+    front.feed_mouse(40, 8)
+    front.feed_resize(30, 100)
+    front.feed_idle()
+    front.feed_keys(Keys.PG_DOWN, Keys.PG_DOWN, Keys.ENTER)
+    front.feed_idle()
+    front.feed_call(app.close)
+    app.start()
+
+    header, entries = load_trace(path)
+    assert [name.split(":")[1] for name in header["modules"]] == ["Probe"]
+    kinds = [entry[1] for entry in entries]
+    assert kinds.count("f") == 4
+    assert "r" in kinds and "m" in kinds
+
+    replay = replay_trace(path)
+    replay.start()
+    original, replayed = probe(app), probe(replay)
+    assert replayed.text == original.text == "hi! "
+    assert replayed.presses == original.presses == 2
+    assert replayed.moves == original.moves == [2]
+    assert (replay.front.h, replay.front.w) == (30, 100)
+    print("✓ Replay reproduced the session")
+
+
+def test_resize():
+    """Test that a fed resize relayouts to the new size."""
+    print("\n=== Test: Resize ===")
+
+    app = make_app(headless_size=(24, 80))
+    app.front.feed_resize(30, 100)
+    app.front.feed_idle(2)
+    app.front.feed_keys("q")
+    app.start()
+
+    rows = app.front.snapshot(lines=True)
+    assert len(rows) == 30
+    assert len(rows[0]) == 100
+    assert rows[0].rstrip().endswith("┐")
+    print("✓ Resize relayouts panels")
+
+
+def test_reused_panel_label():
+    """Test that a relayout keeps panel labels current."""
+    print("\n=== Test: Reused Panel Label ===")
+
+    app = make_app(headless_size=(24, 80), title="Before")
+
+    def retitle():
+        app.title = "After"
+
+    app.front.feed_call(retitle)
+    app.front.feed_resize(26, 90)
+    app.front.feed_idle(2)
+    app.front.feed_keys("q")
+    app.start()
+
+    assert app.back.header_panel.label == "After"
+    assert app.front.find("| After |") is not None
+    assert app.front.find("| Before |") is None
+    print("✓ Reused panels take the new label")
+
+
+def test_headless_options():
+    """Test that HeadlessCurse takes Curse's options and rejects typos."""
+    print("\n=== Test: Headless Options ===")
+    from deskapp.src.headless import HeadlessCurse
+
+    front = HeadlessCurse(10, 40, frame_buffer=False, escape_timeout=0.02)
+    assert front.use_frame_buffer
+    try:
+        HeadlessCurse(10, 40, frame_bufer=True)
+        assert False, "misspelled option was accepted"
+    except TypeError:
+        pass
+    print("✓ Unknown options raise TypeError")
+
+
+def test_feed_call():
+    """Test that a queued callable can stop the app."""
+    print("\n=== Test: Feed Call ===")
+
+    app = make_app()
+    app.front.feed_idle(5)
+    app.front.feed_call(app.close)
+    app.start()
+
+    assert app.front.frames == 6
+    print("✓ Queued callable ran in order")
+
+
+def test_input_drain_and_coalesce():
+    """Test that a frame drains all input and coalesces key repeats."""
+    print("\n=== Test: Input Drain And Coalesce ===")
+
+    app = make_app()
+    app.front.feed_keys(Keys.PG_DOWN, Keys.PG_DOWN, Keys.PG_DOWN,
+                        Keys.ENTER, Keys.ENTER, Keys.PG_DOWN)
+    app.front.feed_idle()
+    app.front.feed_keys(Keys.PG_DOWN)
+    app.front.feed_idle()
+    app.front.feed_keys("q")
+    app.start()
+
+    mod = probe(app)
+    # Non-coalescing bindings still run once per press
+    assert mod.presses == 2
+    # A burst is one call; a different key in between splits it
+    assert mod.moves == [3, 1, 1]
+    print("✓ Bursts coalesced, other keys kept in order")
+
+
+class Counter(Module):
+    """Counts page() calls; refresh_rate set per test."""
+    name = "Counter"
+
+    def __init__(self, app):
+        super().__init__(app, random.random())
+        self.pages = 0
+
+    def page(self, panel):
+        self.pages += 1
+
+
+def count_pages(refresh_rate, animated=True, frames=20):
+    Rated = type("Rated", (Counter,), {
+        'refresh_rate': refresh_rate, 'animated': animated,
+    })
+    app = App(modules=[Rated], demo_mode=False, headless=True,
+              autostart=False)
+    app.front.feed_idle(frames)
+    app.front.feed_keys("q")
+    app.start()
+    return app.logic.available_panels['Counter'][0].pages
+
+
+def test_refresh_rates():
+    """Test that refresh_rate limits how often page() runs."""
+    print("\n=== Test: Refresh Rates ===")
+
+    # Input ('q') invalidates once, so on-change modules paint twice
+    assert count_pages(None, animated=True) >= 20
+    assert count_pages(None, animated=False) == 2
+    assert count_pages(0) == 2
+    # Headless frames run back to back, well inside one second
+    assert count_pages(1) == 2
+    print("✓ refresh_rate honored")
+
+
+def test_event_viewer():
+    """Test that the EventViewer lists traced event types."""
+    print("\n=== Test: Event Viewer ===")
+
+    from deskapp.mods import EventViewer
+    app = App(modules=[EventViewer], demo_mode=False, headless=True,
+              autostart=False, headless_size=(30, 100))
+    app.on('viewer.ping', lambda event: None)
+    app.front.feed_call(lambda: app.emit('viewer.ping', {}))
+    app.front.feed_idle(3)
+    app.front.feed_keys("q")
+    app.start()
+
+    assert app.events.tracer is not None
+    assert app.front.find("EVENT TRACE") is not None
+    assert app.front.find("viewer.ping") is not None
+    print("✓ EventViewer shows traced events")
+
+
+def test_async_tasks():
+    """Test coroutines awaiting events inside the main loop."""
+    print("\n=== Test: Async Tasks ===")
+
+    import asyncio
+    app = make_app()
+    log = []
+
+    async def wait_job():
+        event = await app.events.wait_for(
+            'job.done', lambda e: e['data']['id'] == 2)
+        log.append(('done', event['data']['id']))
+
+    async def watch_fetches():
+        async with app.events.stream('fetch.*') as events:
+            async for event in events:
+                log.append((event['type'], event['data']['n']))
+                if event['type'] == 'fetch.end':
+                    break
+
+    async def time_out():
+        try:
+            await app.events.wait_for('never', timeout=0.01)
+        except asyncio.TimeoutError:
+            log.append('timeout')
+
+    app.front.feed_call(lambda: [app.spawn(wait_job()),
+                                 app.spawn(watch_fetches()),
+                                 app.spawn(time_out())])
+    app.front.feed_idle()
+    for event_type, data in (('fetch.chunk', {'n': 1}),
+                             ('job.done', {'id': 1}),
+                             ('fetch.chunk', {'n': 2}),
+                             ('job.done', {'id': 2}),
+                             ('fetch.end', {'n': 3}),
+                             ('fetch.chunk', {'n': 4})):
+        app.front.feed_call(lambda t=event_type, d=data: app.emit(t, d))
+        app.front.feed_idle()
+    # Let the 10 ms timeout expire
+    app.front.feed_call(lambda: time.sleep(0.02))
+    app.front.feed_idle(3)
+    app.front.feed_keys("q")
+    app.start()
+
+    assert [entry for entry in log if entry != 'timeout'] == [
+        ('fetch.chunk', 1), ('fetch.chunk', 2), ('done', 2),
+        ('fetch.end', 3)]
+    assert 'timeout' in log
+    # Finished tasks are gone; the stream unsubscribed on exit
+    assert not app.tasks.tasks and app.tasks.loop.is_closed()
+    assert app.events.prefix_listeners == ()
+    print("✓ Coroutines resumed by events, streams and timeouts")
+
+
+def test_idle_with_tasks():
+    """Test that waiting tasks don't keep an idle app at frame rate."""
+    print("\n=== Test: Idle With Tasks ===")
+
+    import asyncio
+    app = make_app()
+    timeouts = []
+
+    async def consume():
+        async for event in app.events.stream('feed.*'):
+            pass
+
+    async def nap():
+        await asyncio.sleep(0.3)
+
+    def measure():
+        timeouts.append(app.back.frame_timeout(0))
+
+    app.front.feed_call(lambda: app.spawn(consume()))
+    app.front.feed_idle()
+    app.front.feed_call(measure)
+    app.front.feed_call(lambda: app.spawn(nap()))
+    app.front.feed_idle()
+    app.front.feed_call(measure)
+    app.front.feed_keys("q")
+    app.start()
+
+    assert app.tasks.io_watched
+    interval = app.back.frame_interval()
+    # A stream consumer alone: sleep the full idle timeout
+    assert timeouts[0] == app.back.idle_timeout
+    # A pending timer: wake for it, not every frame
+    assert interval < timeouts[1] <= 0.3
+    print("✓ Idle sleep capped by task timers only")
+
+
+def run_all_tests():
+    """Run all headless tests."""
+    print("=" * 60)
+    print("DeskApp Headless Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_snapshot_shows_panels,
+        test_scripted_text_input,
+        test_line_editing,
+        test_long_line_footer,
+        test_bracketed_paste,
+        test_escape_sequences,
+        test_mouse_regions_and_motion,
+        test_trace_record_and_replay,
+        test_resize,
+        test_reused_panel_label,
+        test_headless_options,
+        test_feed_call,
+        test_input_drain_and_coalesce,
+        test_refresh_rates,
+        test_event_viewer,
+        test_async_tasks,
+        test_idle_with_tasks,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__} FAILED: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} ERROR: {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    exit(0 if success else 1)